@@ -6,6 +6,19 @@ from .core.options import options, get_option, options_context
 
 __version__ = "0.15.7"
 
+# Namespaces that are imported when first accessed as `datar.<namespace>`.
+# Importing any of them loads and sets up all the backends.
+_NAMESPACES = {
+    "all",
+    "base",
+    "data",
+    "dplyr",
+    "forcats",
+    "misc",
+    "tibble",
+    "tidyr",
+}
+
 
 def get_versions(prnt: bool = True) -> _Mapping[str, str]:
     """Return/Print the versions of the dependencies.
@@ -45,3 +58,13 @@ def get_versions(prnt: bool = True) -> _Mapping[str, str]:
             print(f"{' ' * keylen}  {verline}")
 
     return None
+
+
+def __getattr__(name: str):
+    """Import the namespace (e.g. `datar.dplyr`) when it's first accessed"""
+    if name in _NAMESPACES:
+        from importlib import import_module
+
+        return import_module(f"{__name__}.{name}")
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,30 +1,92 @@
-"""Import all constants, verbs and functions"""
+"""Import all constants, verbs and functions
+
+The names are resolved lazily, so that `from datar.all import mutate` only
+imports `datar.dplyr`, where `mutate` comes from.
+"""
 
 from .core import load_plugins as _
 from .core.defaults import f
+from .core.options import get_option as _get_option
+from .core.api_index import (
+    API_INDEX as _API_INDEX,
+    CONFLICT_NAMES as _CONFLICT_NAMES,
+    NAMESPACES as _NAMESPACES,
+    public_names as _public_names,
+)
+
+_conflict_names = set().union(*_CONFLICT_NAMES.values())
+
+
+def _namespace(namespace):
+    """Import the namespace module"""
+    from importlib import import_module
+
+    return import_module(f"{__package__}.{namespace}")
+
+
+def _get_all():
+    """Get the names that `from datar.all import *` imports,
+    which imports all the namespaces"""
+    names = {"f": None}
+    for namespace in _NAMESPACES:
+        names.update(dict.fromkeys(_public_names(_namespace(namespace))))
+
+    if _get_option("allow_conflict_names"):
+        names.update(dict.fromkeys(_conflict_names))
+
+    return list(names)
+
+
+def _overridable(namespace):
+    """Check if the backends add names to the namespace with its *_api()
+    hook, which may override the names from the earlier namespaces"""
+    from .core.plugin import _resolve_all
 
-from .base import _conflict_names as _base_conflict_names
-from .dplyr import _conflict_names as _dplyr_conflict_names
+    return bool(_resolve_all(f"{namespace}_api", None))
 
-from .base import *
-from .dplyr import *
-from .forcats import *
-from .tibble import *
-from .tidyr import *
-from .misc import *
 
-__all__ = [key for key in locals() if not key.startswith("_")]
+def _resolve(name):
+    """Get the object of a non-conflict name from the namespaces
 
-if get_option("allow_conflict_names"):  # noqa: F405
-    __all__.extend(_base_conflict_names | _dplyr_conflict_names)
-    for name in _base_conflict_names | _dplyr_conflict_names:
-        locals()[name] = locals()[name + "_"]
+    Like `from datar.all import *`, the names from the later namespaces take
+    precedence, including those added by the backends with the *_api()
+    hooks, so the later namespaces are checked if the backends implement
+    their hooks.
+    """
+    namespace = _API_INDEX.get(name)
+    if namespace is None:
+        # Not indexed, may be added by the backends with the *_api() hooks
+        later = _NAMESPACES
+    else:
+        later = [
+            ns
+            for ns in _NAMESPACES[_NAMESPACES.index(namespace) + 1:]
+            if _overridable(ns)
+        ]
+
+    for ns in reversed(later):
+        module = _namespace(ns)
+        if name in _public_names(module):
+            return getattr(module, name)
+
+    if namespace is not None:
+        return getattr(_namespace(namespace), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def __getattr__(name):
-    """Even when allow_conflict_names is False, datar.base.sum should be fine
+    """Resolve the names lazily
+
+    Even when allow_conflict_names is False, datar.all.sum should be fine
     """
-    if name in _base_conflict_names | _dplyr_conflict_names:
+    if name == "__all__":
+        return _get_all()
+
+    if name in _conflict_names:
+        if _get_option("allow_conflict_names"):
+            return _resolve(name + "_")
+
         import sys
         import ast
         from executing import Source
@@ -32,6 +94,16 @@ def __getattr__(name):
         if isinstance(node, (ast.Call, ast.Attribute)):
             # import datar.all as d
             # d.sum(...) or getattr(d, "sum")(...)
-            return globals()[name + "_"]
+            return _resolve(name + "_")
+
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    out = globals()[name] = _resolve(name)
+    return out
+
 
-    raise AttributeError
+def __dir__():
+    return sorted(set(globals()) | set(_get_all()))
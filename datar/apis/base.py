@@ -2693,3 +2693,19 @@ def which_min(x) -> Any:
         The index of the minimum value
     """
     raise _NotImplementedByCurrentBackendError("which_min", x)
+
+
+# The results are not determined by the arguments, so they are not shared
+# when identical calls are evaluated together
+for _func in (
+    set_seed,
+    sample,
+    rnorm,
+    runif,
+    rpois,
+    rbinom,
+    rcauchy,
+    rchisq,
+    rexp,
+):
+    _func.volatile = True
@@ -1,5 +1,6 @@
 # import the variables with _ so that they are not imported by *
 from __future__ import annotations as _
+from concurrent.futures import Executor as _Executor
 from typing import (
     Any,
     Callable as _Callable,
@@ -1049,7 +1050,15 @@ def n_groups(_data) -> int:
 
 
 @_register_verb()
-def group_map(_data, _f, *args, _keep: bool = False, **kwargs) -> Any:
+def group_map(
+    _data,
+    _f,
+    *args,
+    _keep: bool = False,
+    _executor: str | _Executor = None,
+    _n_jobs: int = None,
+    **kwargs,
+) -> Any:
     """Apply a function to each group
 
     The original API:
@@ -1060,6 +1069,14 @@ def group_map(_data, _f, *args, _keep: bool = False, **kwargs) -> Any:
         _f: A function to apply to each group.
         *args: Additional arguments to pass to `func`.
         _keep: If `True`, keep the grouping variables in the output.
+        _executor: `"thread"`, `"process"` or a
+            `concurrent.futures.Executor` to run the groups with.
+            Defaults to the `executor` option if `_n_jobs` is given.
+            `_f` must be picklable for the processes.
+        _n_jobs: The number of workers to run the groups in parallel.
+            The groups are run serially if it's `None` or `1`, unless
+            an executor instance is passed. The results are in the
+            order of the groups either way.
         **kwargs: Additional keyword arguments to pass to `func`.
 
     Returns:
@@ -1069,7 +1086,15 @@ def group_map(_data, _f, *args, _keep: bool = False, **kwargs) -> Any:
 
 
 @_register_verb()
-def group_modify(_data, _f, *args, _keep: bool = False, **kwargs) -> Any:
+def group_modify(
+    _data,
+    _f,
+    *args,
+    _keep: bool = False,
+    _executor: str | _Executor = None,
+    _n_jobs: int = None,
+    **kwargs,
+) -> Any:
     """Apply a function to each group
 
     The original API:
@@ -1080,6 +1105,14 @@ def group_modify(_data, _f, *args, _keep: bool = False, **kwargs) -> Any:
         _f: A function to apply to each group.
         *args: Additional arguments to pass to `func`.
         _keep: If `True`, keep the grouping variables in the output.
+        _executor: `"thread"`, `"process"` or a
+            `concurrent.futures.Executor` to run the groups with.
+            Defaults to the `executor` option if `_n_jobs` is given.
+            `_f` must be picklable for the processes.
+        _n_jobs: The number of workers to run the groups in parallel.
+            The groups are run serially if it's `None` or `1`, unless
+            an executor instance is passed. The results are in the
+            order of the groups either way.
         **kwargs: Additional keyword arguments to pass to `func`.
 
     Returns:
@@ -1125,7 +1158,15 @@ def group_trim(_data, _drop=None) -> Any:
 
 
 @_register_verb()
-def group_walk(_data, _f, *args, _keep: bool = False, **kwargs) -> Any:
+def group_walk(
+    _data,
+    _f,
+    *args,
+    _keep: bool = False,
+    _executor: str | _Executor = None,
+    _n_jobs: int = None,
+    **kwargs,
+) -> Any:
     """Apply a function to each group
 
     The original API:
@@ -1135,6 +1176,14 @@ def group_walk(_data, _f, *args, _keep: bool = False, **kwargs) -> Any:
         _data: A grouped frame
         _f: A function to apply to each group.
         *args: Additional arguments to pass to `func`.
+        _executor: `"thread"`, `"process"` or a
+            `concurrent.futures.Executor` to run the groups with.
+            Defaults to the `executor` option if `_n_jobs` is given.
+            `_f` must be picklable for the processes.
+        _n_jobs: The number of workers to run the groups in parallel.
+            The groups are run serially if it's `None` or `1`, unless
+            an executor instance is passed. The results are in the
+            order of the groups either way.
         **kwargs: Additional keyword arguments to pass to `func`.
 
     Returns:
@@ -2459,3 +2508,19 @@ def any_of(_data, x, vars=None) -> Any:
             in `_data` columns
     """
     raise _NotImplementedByCurrentBackendError("any_of", _data)
+
+
+# The verbs of the lazy pipelines, implemented in `datar.core.plan`,
+# which is only imported when they are used
+_LAZY_VERBS = ("lazy", "collect")
+
+
+def __getattr__(name: str):
+    """Import `lazy()` and `collect()` from `datar.core.plan` when they are
+    first accessed"""
+    if name in _LAZY_VERBS:
+        from ..core import plan
+
+        return getattr(plan, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,11 @@
-from contextlib import contextmanager
-
 from pipda import register_func
 
+from ..core.backends import use_backend
+
 
-@contextmanager
 def _array_ufunc_with_backend(backend: str):
-    """Use a backend for the operator"""
-    old_backend = array_ufunc.backend
-    array_ufunc.backend = backend
-    yield
-    array_ufunc.backend = old_backend
+    """Use a backend for the numpy ufuncs in the current context"""
+    return use_backend(backend, "array_ufunc")
 
 
 @register_func(cls=object, dispatchable="first")
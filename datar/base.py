@@ -1,10 +1,11 @@
 
 from .core.load_plugins import plugin as _plugin
+from .core.api_index import CONFLICT_NAMES as _CONFLICT_NAMES
 from .apis.base import *
 
 locals().update(_plugin.hooks.base_api())
 __all__ = [key for key in locals() if not key.startswith("_")]
-_conflict_names = {"min", "max", "sum", "abs", "round", "all", "any", "re"}
+_conflict_names = _CONFLICT_NAMES["base"]
 
 if get_option("allow_conflict_names"):  # noqa: F405
     __all__.extend(_conflict_names)
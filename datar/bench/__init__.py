@@ -0,0 +1,4 @@
+"""Benchmarks for datar
+
+Run `python -m datar.bench --help` to see the available benchmarks.
+"""
@@ -0,0 +1,206 @@
+"""Command line interface for the benchmarks
+
+    python -m datar.bench startup [--repeat N] [--backends B ...] [-o FILE]
+    python -m datar.bench verbs [--benchmarks NAME ...] [--sizes N ...]
+        [--repeat N] [--backends B ...] [--baseline FILE] [--factor F]
+        [-o FILE]
+    python -m datar.bench dispatch [--cases NAME ...] [--repeat N]
+        [--budget [FILE]] [--threads N ...] [-o FILE]
+"""
+import sys
+import json
+import argparse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m datar.bench",
+        description="Benchmarks for datar, results are printed as JSON.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--output",
+        "-o",
+        type=argparse.FileType("w"),
+        default=sys.stdout,
+        help="Where to write the results, default stdout",
+    )
+
+    startup = subparsers.add_parser(
+        "startup",
+        parents=[common],
+        help=(
+            "Time and memory to import datar and its dependencies, "
+            "load the backends and run the API hooks"
+        ),
+    )
+    startup.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of fresh interpreters to measure the time in",
+    )
+    startup.add_argument(
+        "--backends",
+        nargs="*",
+        help="The backends to load, default from the configuration files",
+    )
+
+    verbs = subparsers.add_parser(
+        "verbs",
+        parents=[common],
+        help="Time and peak memory of the main verbs against the backends",
+    )
+    verbs.add_argument(
+        "--benchmarks",
+        nargs="+",
+        help="The benchmarks to run, default all",
+    )
+    verbs.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        help="The numbers of rows of the data, default 1e3, 1e5 and 1e6",
+    )
+    verbs.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of runs to measure the time in",
+    )
+    verbs.add_argument(
+        "--backends",
+        nargs="+",
+        help="The backends to run against, default all installed",
+    )
+    verbs.add_argument(
+        "--baseline",
+        type=argparse.FileType("r"),
+        help=(
+            "Results of a previous run to compare with. "
+            "Exit with 1 if there are regressions."
+        ),
+    )
+    verbs.add_argument(
+        "--factor",
+        type=float,
+        default=1.5,
+        help=(
+            "How many times of the baseline time or peak memory is "
+            "a regression"
+        ),
+    )
+
+    dispatch = subparsers.add_parser(
+        "dispatch",
+        parents=[common],
+        help="Time per call of the dispatching of verbs, functions, "
+        "operators and hooks",
+    )
+    dispatch.add_argument(
+        "--cases",
+        nargs="+",
+        help="The cases to run, default all",
+    )
+    dispatch.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of runs to measure the time in",
+    )
+    dispatch.add_argument(
+        "--budget",
+        nargs="?",
+        type=argparse.FileType("r"),
+        const=True,
+        help=(
+            "Check the time per call against the budgets, from a JSON file "
+            "of case => nanoseconds, or the default budgets if no file "
+            "given. Exit with 1 if any case is over budget."
+        ),
+    )
+
+    dispatch.add_argument(
+        "--threads",
+        nargs="+",
+        type=int,
+        help=(
+            "Run the cases in these numbers of threads instead, "
+            "to measure how the throughput scales"
+        ),
+    )
+    dispatch.add_argument(
+        "--scaling",
+        nargs="?",
+        type=float,
+        const=True,
+        help=(
+            "With --threads, check that the throughput scales with the "
+            "threads, at least by this efficiency (the speedup relative to "
+            "the ratio of the numbers of threads, 0.625 if not given). "
+            "Exit with 1 if it doesn't. Only for free-threaded Python."
+        ),
+    )
+
+    args = parser.parse_args(argv)
+    status = 0
+    if args.command == "startup":
+        from .startup import profile_startup
+
+        out = profile_startup(repeat=args.repeat, backends=args.backends)
+
+    elif args.command == "verbs":
+        from .verbs import SIZES, compare_results, run_benchmarks
+
+        out = run_benchmarks(
+            benchmarks=args.benchmarks,
+            sizes=args.sizes or SIZES,
+            backends=args.backends,
+            repeat=args.repeat,
+        )
+        if args.baseline is not None:
+            out["regressions"] = compare_results(
+                json.load(args.baseline),
+                out,
+                factor=args.factor,
+            )
+            status = int(bool(out["regressions"]))
+
+    elif args.command == "dispatch":
+        from .dispatch import (
+            SCALING_EFFICIENCY,
+            check_budgets,
+            check_scaling,
+            run_dispatch_benchmarks,
+            run_thread_scaling,
+        )
+
+        if args.threads:
+            out = run_thread_scaling(threads=args.threads, cases=args.cases)
+            if args.scaling is not None:
+                out["not_scaling"] = check_scaling(
+                    out,
+                    SCALING_EFFICIENCY if args.scaling is True
+                    else args.scaling,
+                )
+                status = int(bool(out["not_scaling"]))
+        else:
+            out = run_dispatch_benchmarks(
+                cases=args.cases,
+                repeat=args.repeat,
+            )
+        if args.budget is not None and not args.threads:
+            budgets = None if args.budget is True else json.load(args.budget)
+            out["over_budget"] = check_budgets(out, budgets)
+            status = int(bool(out["over_budget"]))
+
+    json.dump(out, args.output, indent=2)
+    args.output.write("\n")
+    if args.output is not sys.stdout:
+        args.output.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Measure the steps to start datar in a fresh interpreter
+
+Run as a script by `datar.bench.startup`, so that nothing from datar is
+imported before it's measured. Prints the steps as a JSON list.
+
+Usage:
+    python _startup_probe.py <trace_memory> <backends as JSON or null>
+"""
+import sys
+import json
+import tracemalloc
+from importlib import import_module, metadata
+from time import perf_counter
+
+NAMESPACES = ("base", "dplyr", "tibble", "forcats", "tidyr", "misc")
+DEPENDENCIES = ("pipda", "executing", "simplug", "simpleconf")
+
+
+def _measure(steps, trace_memory, name, kind, func, *args):
+    """Run func(*args) and record the time and memory it takes"""
+    if trace_memory:
+        tracemalloc.reset_peak()
+        mem_before = tracemalloc.get_traced_memory()[0]
+
+    start = perf_counter()
+    out = func(*args)
+    step = {"name": name, "kind": kind, "time": perf_counter() - start}
+
+    if trace_memory:
+        mem_after, peak = tracemalloc.get_traced_memory()
+        step["memory"] = mem_after - mem_before
+        step["peak_memory"] = peak - mem_before
+
+    steps.append(step)
+    return out
+
+
+def main(trace_memory, backends):
+    if trace_memory:
+        tracemalloc.start()
+
+    steps = []
+    for dep in DEPENDENCIES:
+        _measure(steps, trace_memory, dep, "dependency", import_module, dep)
+
+    _measure(steps, trace_memory, "datar", "import", import_module, "datar")
+
+    from datar.core.options import options, get_option
+
+    if backends is not None:
+        options(backends=backends)
+
+    only = get_option("backends")
+    if isinstance(only, str):  # pragma: no cover
+        only = [only]
+    try:
+        eps = metadata.entry_points(group="datar")
+    except TypeError:  # pragma: no cover, python < 3.10
+        eps = metadata.entry_points().get("datar", [])
+
+    # Import the entrypoints in advance, load_plugins loads them from
+    # sys.modules then
+    for ep in eps:
+        if only and ep.name not in only:
+            continue
+        _measure(steps, trace_memory, ep.name, "entrypoint", ep.load)
+
+    plugin = _measure(
+        steps,
+        trace_memory,
+        "load_plugins",
+        "setup",
+        lambda: import_module("datar.core.load_plugins").plugin,
+    )
+
+    for namespace in NAMESPACES:
+        _measure(
+            steps,
+            trace_memory,
+            f"datar.apis.{namespace}",
+            "import",
+            import_module,
+            f"datar.apis.{namespace}",
+        )
+        _measure(
+            steps,
+            trace_memory,
+            f"{namespace}_api",
+            "hook",
+            getattr(plugin.hooks, f"{namespace}_api"),
+        )
+
+    print(json.dumps(steps))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] == "1", json.loads(sys.argv[2]))
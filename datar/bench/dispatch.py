@@ -0,0 +1,318 @@
+"""Benchmark the fixed overhead of datar per call
+
+The cases call trivial implementations, registered for a private class by
+a private backend, so that only the dispatching is measured:
+
+- `verb_call`, `verb_pipe`, `verb_expr`: a verb called directly, piped
+  with `>>`, and piped with an f-expression argument
+- `func_call`, `func_expr`: a registered function called with a value, and
+  with an f-expression evaluated against the data
+- `operator`, `operator_hook`: an operator resolved from the operator
+  table, and through the `operate()` hook
+- `c_getitem`: `c[...]`, by `CollectionFunction.__getitem__`
+- `hook_dispatch`, `hook_simplug`: a hook called by `dispatch()`, with the
+  cached resolution, and by simplug directly
+
+The time per call of each case is the minimum of the repeated runs.
+
+`run_thread_scaling()` runs the cases as independent workloads in more and
+more threads, to show how the throughput scales, which it only does on the
+free-threaded builds of Python. `check_scaling()` finds the numbers of
+threads that don't scale well enough.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import timeit
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Mapping, Sequence
+
+from pipda import Context, register_func, register_verb
+
+from ..core.plugin import plugin
+
+BACKEND = "_benchdispatch"
+
+# The budgets of the time per call in nanoseconds. They are generous, so
+# that they only catch the regressions of magnitude on usual hardware.
+BUDGETS = {
+    "verb_call": 200_000,
+    "verb_pipe": 200_000,
+    "verb_expr": 300_000,
+    "func_call": 100_000,
+    "func_expr": 300_000,
+    "operator": 20_000,
+    "operator_hook": 50_000,
+    "c_getitem": 20_000,
+    "hook_dispatch": 20_000,
+    "hook_simplug": 100_000,
+}
+# The minimum speedup of the throughput with more threads, relative to the
+# ratio of the numbers of threads, e.g. 2.5x with 4 threads over 1
+SCALING_EFFICIENCY = 0.625
+
+
+class _Frame(dict):
+    """The data of the cases"""
+
+
+class _Value(int):
+    """The operand of the operator cases"""
+
+
+@register_verb(context=Context.EVAL)
+def _touch(_data, value):
+    """A verb to benchmark, implemented by the private backend"""
+
+
+@register_func(dispatchable="args")
+def _identity(x):
+    """A function to benchmark, implemented by the private backend"""
+
+
+class _BenchPlugin:
+    """The private backend"""
+
+    name = BACKEND
+
+    @plugin.impl
+    def c_getitem(item):
+        return item
+
+    @plugin.impl
+    def operate(op, x, y=None):
+        return x
+
+
+@contextmanager
+def _bench_backend() -> Iterator[None]:
+    """Register the private backend and its implementations for the private
+    classes, select it, and remove them all on exit"""
+    from ..core.backends import unregister_backend, use_backend
+    from ..core.operator import DatarOperator
+
+    _touch.register(_Frame, backend=BACKEND)(lambda _data, value: _data)
+    _identity.register(object, backend=BACKEND)(lambda x: x)
+    DatarOperator.register("add", _Value, object, backend=BACKEND)(
+        lambda x, y: x
+    )
+    try:
+        with plugin.plugins_context([_BenchPlugin]), use_backend(BACKEND):
+            yield
+    finally:
+        unregister_backend(_touch, BACKEND)
+        unregister_backend(_identity, BACKEND)
+        DatarOperator.unregister("add", _Value, object, backend=BACKEND)
+
+
+def _cases() -> Mapping[str, Callable[[], Any]]:
+    """The functions to time"""
+    from .. import f
+    from ..core.operator import DatarOperator
+    from ..core.plugin import dispatch
+    from ..core.utils import CollectionFunction
+
+    data = _Frame(x=1)
+    value = _Value(1)
+    # bound to the private backend, so that the operate() hooks of the other
+    # backends are not involved, even in the threads of
+    # run_thread_scaling(), which don't see the backend selected
+    operator = type("_BenchOperator", (DatarOperator, ), {"backend": BACKEND})()
+    c = CollectionFunction(lambda *args: args)
+    c.backend = BACKEND
+
+    return {
+        "verb_call": lambda: _touch(data, 1, __ast_fallback="normal"),
+        "verb_pipe": lambda: data >> _touch(1),
+        "verb_expr": lambda: data >> _touch(f["x"]),
+        "func_call": lambda: _identity(1),
+        "func_expr": lambda: data >> _touch(_identity(f["x"])),
+        "operator": lambda: operator.add(value, 1),
+        "operator_hook": lambda: operator.sub(value, 1),
+        "c_getitem": lambda: c[1:3],
+        "hook_dispatch": lambda: dispatch("c_getitem", 1, __plugin=BACKEND),
+        "hook_simplug": lambda: plugin.hooks.c_getitem(1, __plugin=BACKEND),
+    }
+
+
+def _time(func: Callable[[], Any], repeat: int, number: int | None) -> float:
+    """The minimum time per call in nanoseconds"""
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def run_dispatch_benchmarks(
+    cases: Sequence[str] | None = None,
+    repeat: int = 5,
+    number: int = None,
+) -> Mapping[str, Any]:
+    """Run the dispatch benchmarks
+
+    Args:
+        cases: The names of the cases, all by default
+        repeat: Number of runs to measure the time in.
+            The minimum time is reported.
+        number: Number of calls in each run. By default, it's determined
+            so that each run takes at least 0.2 seconds.
+
+    Returns:
+        A dict with `python`, `datar`, `repeat`, the `total` time per call
+        of all cases and the `results`, each with `case` and `time` per
+        call in nanoseconds.
+    """
+    from .. import __version__
+    from ..core import load_plugins as _  # noqa: F401
+
+    with _bench_backend():
+        funcs = _cases()
+        names = list(funcs) if cases is None else cases
+        unknown = set(names) - set(funcs)
+        if unknown:
+            raise ValueError(f"Unknown cases: {sorted(unknown)}")
+
+        results = [
+            {"case": name, "time": _time(funcs[name], repeat, number)}
+            for name in names
+        ]
+
+    return {
+        "python": sys.version.split()[0],
+        "datar": __version__,
+        "repeat": repeat,
+        "total": sum(result["time"] for result in results),
+        "results": results,
+    }
+
+
+def run_thread_scaling(
+    threads: Sequence[int] = (1, 2, 4),
+    calls: int = 1000,
+    cases: Sequence[str] | None = None,
+) -> Mapping[str, Any]:
+    """Run the cases in threads, to measure how the throughput scales
+
+    Args:
+        threads: The numbers of threads to run the cases in
+        calls: Number of calls of each case in each thread
+        cases: The names of the cases, all by default
+
+    Returns:
+        A dict with `python`, `datar`, `gil_enabled`, `calls` and the
+        `results`, each with `threads`, `time` in seconds, `throughput`
+        in calls per second and `speedup` of the throughput over that of
+        the first number of threads.
+    """
+    from .. import __version__
+    from ..core import load_plugins as _  # noqa: F401
+
+    def work(funcs, barrier):
+        barrier.wait()
+        for func in funcs:
+            for _call in range(calls):
+                func()
+
+    results = []
+    with _bench_backend():
+        funcs = _cases()
+        if cases is not None:
+            funcs = {name: funcs[name] for name in cases}
+        # warm up the caches
+        for func in funcs.values():
+            func()
+
+        for nthreads in threads:
+            barrier = threading.Barrier(nthreads + 1)
+            workers = [
+                threading.Thread(
+                    target=work,
+                    args=(list(funcs.values()), barrier),
+                )
+                for _thread in range(nthreads)
+            ]
+            for worker in workers:
+                worker.start()
+            barrier.wait()
+            start = timeit.default_timer()
+            for worker in workers:
+                worker.join()
+            elapsed = timeit.default_timer() - start
+            results.append(
+                {
+                    "threads": nthreads,
+                    "time": elapsed,
+                    "throughput": nthreads * calls * len(funcs) / elapsed,
+                }
+            )
+
+    for result in results:
+        result["speedup"] = result["throughput"] / results[0]["throughput"]
+
+    return {
+        "python": sys.version.split()[0],
+        "datar": __version__,
+        "gil_enabled": getattr(sys, "_is_gil_enabled", lambda: True)(),
+        "calls": calls,
+        "results": results,
+    }
+
+
+def check_budgets(
+    results: Mapping[str, Any],
+    budgets: Mapping[str, float] = None,
+) -> List[Mapping[str, Any]]:
+    """Find the cases over the budgets
+
+    Args:
+        results: The results of `run_dispatch_benchmarks()`
+        budgets: The budgets of the time per call in nanoseconds, by case.
+            `BUDGETS` by default.
+
+    Returns:
+        The cases over the budgets, each with `case`, `time` and `budget`.
+    """
+    budgets = BUDGETS if budgets is None else budgets
+    return [
+        {
+            "case": result["case"],
+            "time": result["time"],
+            "budget": budgets[result["case"]],
+        }
+        for result in results["results"]
+        if result["case"] in budgets
+        and result["time"] > budgets[result["case"]]
+    ]
+
+
+def check_scaling(
+    results: Mapping[str, Any],
+    efficiency: float = SCALING_EFFICIENCY,
+) -> List[Mapping[str, Any]]:
+    """Find the numbers of threads that the throughput doesn't scale with
+
+    Only meaningful on the free-threaded builds of Python.
+
+    Args:
+        results: The results of `run_thread_scaling()`
+        efficiency: The minimum speedup over the first number of threads,
+            relative to the ratio of the numbers of threads
+
+    Returns:
+        The results under the expected speedups, each with `threads`,
+        `speedup` and `expected`.
+    """
+    runs = results["results"]
+    out = []
+    for result in runs[1:]:
+        expected = efficiency * result["threads"] / runs[0]["threads"]
+        if result["speedup"] < expected:
+            out.append(
+                {
+                    "threads": result["threads"],
+                    "speedup": result["speedup"],
+                    "expected": expected,
+                }
+            )
+    return out
@@ -0,0 +1,82 @@
+"""Profile the time and memory that datar takes to start
+
+Each run happens in a fresh interpreter. The time is measured without
+tracing the memory, since tracemalloc slows the imports down, and the
+memory is measured in a separate run.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+from typing import Any, List, Mapping, Sequence
+
+PROBE = Path(__file__).with_name("_startup_probe.py")
+
+
+def _probe(trace_memory: bool, backends: Sequence[str] | None) -> List[dict]:
+    """Run the probe in a fresh interpreter"""
+    env = os.environ.copy()
+    # Make sure this datar is imported by the probe
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(PROBE.parent.parent.parent), env.get("PYTHONPATH")])
+    )
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            PROBE.read_text(),
+            "1" if trace_memory else "0",
+            json.dumps(None if backends is None else list(backends)),
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed to profile the startup:\n{proc.stderr}")
+
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def profile_startup(
+    repeat: int = 1,
+    backends: Sequence[str] | None = None,
+) -> Mapping[str, Any]:
+    """Profile the startup of datar
+
+    Args:
+        repeat: Number of fresh interpreters to measure the time in.
+            The minimum time of each step is reported.
+        backends: The backends to load. If `None`, the `backends` option
+            from the configuration files is used.
+
+    Returns:
+        A dict with `python`, `datar`, `repeat`, the `total` time and
+        memory, and the `steps`, each with `name`, `kind` (`dependency`,
+        `import`, `entrypoint`, `setup` or `hook`), `time` in seconds,
+        `memory` and `peak_memory` in bytes.
+    """
+    from .. import __version__
+
+    runs = [_probe(False, backends) for _ in range(repeat)]
+    steps = runs[0]
+    for i, step in enumerate(steps):
+        step["time"] = min(run[i]["time"] for run in runs)
+
+    for step, mem_step in zip(steps, _probe(True, backends)):
+        step["memory"] = mem_step["memory"]
+        step["peak_memory"] = mem_step["peak_memory"]
+
+    return {
+        "python": sys.version.split()[0],
+        "datar": __version__,
+        "repeat": repeat,
+        "total": {
+            "time": sum(step["time"] for step in steps),
+            "memory": sum(step["memory"] for step in steps),
+        },
+        "steps": steps,
+    }
@@ -0,0 +1,346 @@
+"""Benchmark the main verbs against the backends
+
+Each benchmark has a `setup`, which makes the data (not measured), and a
+`run`, which is measured, like the `time_*` and `peakmem_*` benchmarks of
+asv. The data is a larger version of `diamonds` (see
+`datar.data.synthesize()`), with an extra `id` column, constructed by
+`tibble()` of each backend. The verbs and the functions are called with
+`__backend`, and the operators are run with the backend selected (see
+`datar.core.backends.use_backend()`), so that each backend is measured
+regardless of the order of the installed plugins.
+
+The time is the minimum of the repeated runs, measured without tracing
+the memory. The peak memory is measured by `tracemalloc` in a separate
+run, relative to the memory before the run.
+"""
+from __future__ import annotations
+
+import sys
+import gc
+import tracemalloc
+from collections import namedtuple
+from time import perf_counter
+from typing import Any, Callable, List, Mapping, Sequence
+
+SIZES = (1_000, 100_000, 1_000_000)
+SEED = 8525
+DIMENSIONS = ("x", "y", "z")
+
+Benchmark = namedtuple("Benchmark", ["name", "setup", "run"])
+Benchmark.__doc__ = """A verb benchmark
+
+Attributes:
+    name: The name of the benchmark
+    setup: A function taking the size and the backend, and returning the
+        data passed to `run`
+    run: The function to measure, taking the data and the backend
+"""
+
+BENCHMARKS = {}  # type: dict
+
+
+def benchmark(name: str, setup: Callable = None) -> Callable:
+    """Register a function as the `run` of a benchmark
+
+    Args:
+        name: The name of the benchmark
+        setup: The setup function, `make_frame()` by default
+    """
+
+    def decorator(func: Callable) -> Callable:
+        BENCHMARKS[name] = Benchmark(name, setup or make_frame, func)
+        return func
+
+    return decorator
+
+
+def make_frame(size: int, backend: str | None) -> Any:
+    """Make a larger version of diamonds with an `id` column"""
+    import numpy as np
+    from ..data.cache import _to_frame
+    from ..data.synthetic import _synthesize
+
+    data, factors = _synthesize("diamonds", size, SEED, None)
+    return _to_frame(data, factors, backend, id=np.arange(size))
+
+
+def _run(run: Callable, data: Any, backend: str | None) -> Any:
+    """Run a benchmark function with the operators of the backend"""
+    if backend is None:
+        return run(data, backend)
+
+    from ..core.backends import use_backend
+
+    with use_backend(backend):
+        return run(data, backend)
+
+
+def _make_join(size: int, backend: str | None) -> tuple:
+    """Make the frame and a lookup table of cuts to join"""
+    from ..tibble import tibble
+
+    lookup = tibble(
+        cut=["Fair", "Good", "Very Good", "Premium", "Ideal"],
+        cut_rank=[1, 2, 3, 4, 5],
+        __backend=backend,
+    )
+    return make_frame(size, backend), lookup
+
+
+def _make_longer(size: int, backend: str | None) -> Any:
+    """Make the frame pivoted longer"""
+    return _run(pivot_longer, make_frame(size, backend), backend)
+
+
+def _make_nested(size: int, backend: str | None) -> Any:
+    """Make the frame nested by cut, color and clarity"""
+    return _run(nest, make_frame(size, backend), backend)
+
+
+@benchmark("mutate")
+def mutate(data: Any, backend: str | None) -> Any:
+    from .. import f
+    from ..dplyr import mutate
+
+    return data >> mutate(
+        price_per_carat=f.price / f.carat,
+        volume=f.x * f.y * f.z,
+        __backend=backend,
+    )
+
+
+@benchmark("filter")
+def filter_(data: Any, backend: str | None) -> Any:
+    from .. import f
+    from ..dplyr import filter_
+
+    return data >> filter_(f.carat > 1, f.cut == "Ideal", __backend=backend)
+
+
+@benchmark("group_by_summarise")
+def group_by_summarise(data: Any, backend: str | None) -> Any:
+    from .. import f
+    from ..base import mean
+    from ..dplyr import group_by, n, summarise
+
+    return (
+        data
+        >> group_by(f.cut, f.color, __backend=backend)
+        >> summarise(
+            price=mean(f.price, __backend=backend),
+            n=n(__backend=backend),
+            __backend=backend,
+        )
+    )
+
+
+@benchmark("arrange")
+def arrange(data: Any, backend: str | None) -> Any:
+    from .. import f
+    from ..dplyr import arrange, desc
+
+    return data >> arrange(
+        f.cut,
+        desc(f.price, __backend=backend),
+        __backend=backend,
+    )
+
+
+@benchmark("inner_join", setup=_make_join)
+def inner_join(data: tuple, backend: str | None) -> Any:
+    from ..dplyr import inner_join
+
+    return data[0] >> inner_join(data[1], by="cut", __backend=backend)
+
+
+@benchmark("left_join", setup=_make_join)
+def left_join(data: tuple, backend: str | None) -> Any:
+    from ..dplyr import left_join
+
+    return data[0] >> left_join(data[1], by="cut", __backend=backend)
+
+
+@benchmark("pivot_longer")
+def pivot_longer(data: Any, backend: str | None) -> Any:
+    from .. import f
+    from ..base import c
+    from ..tidyr import pivot_longer
+
+    return data >> pivot_longer(
+        c(f.x, f.y, f.z, __backend=backend),
+        names_to="dimension",
+        values_to="size",
+        __backend=backend,
+    )
+
+
+@benchmark("pivot_wider", setup=_make_longer)
+def pivot_wider(data: Any, backend: str | None) -> Any:
+    from .. import f
+    from ..tidyr import pivot_wider
+
+    return data >> pivot_wider(
+        names_from=f.dimension,
+        values_from=f.size,
+        __backend=backend,
+    )
+
+
+@benchmark("nest")
+def nest(data: Any, backend: str | None) -> Any:
+    from .. import f
+    from ..base import c
+    from ..tidyr import nest
+
+    return data >> nest(
+        data=c(
+            f.id, f.carat, f.depth, f.table, f.price, f.x, f.y, f.z,
+            __backend=backend,
+        ),
+        __backend=backend,
+    )
+
+
+@benchmark("unnest", setup=_make_nested)
+def unnest(data: Any, backend: str | None) -> Any:
+    from .. import f
+    from ..tidyr import unnest
+
+    return data >> unnest(f.data, __backend=backend)
+
+
+def _measure(
+    bench: Benchmark,
+    data: Any,
+    backend: str | None,
+    repeat: int,
+) -> Mapping[str, Any]:
+    """Measure the time and the peak memory of the run"""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        _run(bench.run, data, backend)
+        times.append(perf_counter() - start)
+
+    gc.collect()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    mem_before = tracemalloc.get_traced_memory()[0]
+    _run(bench.run, data, backend)
+    peak = tracemalloc.get_traced_memory()[1] - mem_before
+    if not tracing:
+        tracemalloc.stop()
+
+    return {"time": min(times), "peak_memory": peak}
+
+
+def installed_backends() -> List[str]:
+    """Get the names of the enabled backends"""
+    from ..core import load_plugins as _  # noqa: F401
+    from ..core.plugin import plugin
+
+    return plugin.get_enabled_plugin_names()
+
+
+def run_benchmarks(
+    benchmarks: Sequence[str] | None = None,
+    sizes: Sequence[int] = SIZES,
+    backends: Sequence[str] | None = None,
+    repeat: int = 3,
+) -> Mapping[str, Any]:
+    """Run the verb benchmarks
+
+    Args:
+        benchmarks: The names of the benchmarks, all by default
+        sizes: The numbers of rows of the data
+        backends: The backends to run against, all installed by default
+        repeat: Number of runs to measure the time in.
+            The minimum time is reported.
+
+    Returns:
+        A dict with `python`, `datar`, `repeat` and the `results`, each with
+        `benchmark`, `backend`, `size`, `time` in seconds and `peak_memory`
+        in bytes, or `error` if the benchmark failed for the backend.
+    """
+    from .. import __version__
+
+    if backends is None:
+        backends = installed_backends()
+    names = list(BENCHMARKS) if benchmarks is None else benchmarks
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {sorted(unknown)}")
+
+    results = []
+    for backend in backends:
+        for size in sizes:
+            for name in names:
+                bench = BENCHMARKS[name]
+                result = {"benchmark": name, "backend": backend, "size": size}
+                try:
+                    data = bench.setup(size, backend)
+                    result.update(_measure(bench, data, backend, repeat))
+                except Exception as exc:
+                    result["error"] = f"{type(exc).__name__}: {exc}"
+                results.append(result)
+
+    return {
+        "python": sys.version.split()[0],
+        "datar": __version__,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: Mapping[str, Any],
+    current: Mapping[str, Any],
+    factor: float = 1.5,
+) -> List[Mapping[str, Any]]:
+    """Find the regressions against the baseline results
+
+    Args:
+        baseline: The results of `run_benchmarks()` to compare with
+        current: The results of `run_benchmarks()` to check
+        factor: How many times of the baseline time or peak memory is
+            a regression
+
+    Returns:
+        The regressions, each with `benchmark`, `backend`, `size`,
+        `metric`, `baseline`, `current` and `ratio`. A benchmark that
+        fails (with `error`) or misses a metric that the baseline has is a
+        regression, with `current` as `None`, `ratio` as `inf` and the
+        `error` if any.
+    """
+
+    def key(result):
+        return result["benchmark"], result["backend"], result["size"]
+
+    base = {key(result): result for result in baseline["results"]}
+    out = []
+    for result in current["results"]:
+        old = base.get(key(result))
+        if old is None:
+            continue
+        for metric in ("time", "peak_memory"):
+            if not old.get(metric):
+                continue
+            current = result.get(metric)
+            ratio = float("inf") if current is None else current / old[metric]
+            if ratio <= factor:
+                continue
+            regression = {
+                "benchmark": result["benchmark"],
+                "backend": result["backend"],
+                "size": result["size"],
+                "metric": metric,
+                "baseline": old[metric],
+                "current": current,
+                "ratio": ratio,
+            }
+            if "error" in result:
+                regression["error"] = result["error"]
+            out.append(regression)
+    return out
@@ -0,0 +1,462 @@
+"""Index of the names provided by each namespace
+
+`datar.all` uses it to import only the namespace that a name comes from.
+Names that the backends add with the `*_api()` hooks are not indexed.
+
+Regenerate it when the APIs change:
+    python -m datar.core.api_index
+"""
+from types import ModuleType
+from typing import Dict, List, TypeVar
+
+# In the order of datar.all, names from later namespaces take precedence
+NAMESPACES = ("base", "dplyr", "forcats", "tibble", "tidyr", "misc")
+
+# Names that mask python builtins, available only
+# when `allow_conflict_names` is `True`
+CONFLICT_NAMES = {
+    "base": {"min", "max", "sum", "abs", "round", "all", "any", "re"},
+    "dplyr": {"filter", "slice"},
+}
+
+
+def public_names(module: ModuleType) -> List[str]:
+    """The names that `from <module> import *` imports, except the typing
+    objects imported or defined for the annotations (e.g. `Any`)"""
+    names = getattr(module, "__all__", None) or [
+        name for name in vars(module) if not name.startswith("_")
+    ]
+    out = []
+    for name in names:
+        obj = vars(module).get(name)
+        if isinstance(obj, TypeVar) or (
+            getattr(obj, "__module__", None) == "typing"
+        ):
+            continue
+        out.append(name)
+    return out
+
+
+def build_index() -> Dict[str, str]:
+    """Build the index from the namespaces, with no backends loaded"""
+    from importlib import import_module
+    from .options import options_context
+
+    index = {}
+    with options_context(backends=[None]):
+        for namespace in NAMESPACES:
+            module = import_module(f"datar.{namespace}")
+            for name in public_names(module):
+                if name not in CONFLICT_NAMES.get(namespace, ()):
+                    index[name] = namespace
+
+    return index
+
+
+API_INDEX = {
+    "options": "base",
+    "get_option": "base",
+    "options_context": "base",
+    "pi": "base",
+    "letters": "base",
+    "LETTERS": "base",
+    "month_name": "base",
+    "month_abb": "base",
+    "FALSE": "base",
+    "TRUE": "base",
+    "NA": "base",
+    "NULL": "base",
+    "NaN": "base",
+    "Inf": "base",
+    "ceiling": "base",
+    "cov": "base",
+    "floor": "base",
+    "mean": "base",
+    "median": "base",
+    "pmax": "base",
+    "pmin": "base",
+    "sqrt": "base",
+    "var": "base",
+    "scale": "base",
+    "col_sums": "base",
+    "col_means": "base",
+    "col_sds": "base",
+    "col_medians": "base",
+    "row_sums": "base",
+    "row_means": "base",
+    "row_sds": "base",
+    "row_medians": "base",
+    "min_": "base",
+    "max_": "base",
+    "round_": "base",
+    "sum_": "base",
+    "abs_": "base",
+    "prod": "base",
+    "sign": "base",
+    "signif": "base",
+    "trunc": "base",
+    "exp": "base",
+    "log": "base",
+    "log2": "base",
+    "log10": "base",
+    "log1p": "base",
+    "sd": "base",
+    "weighted_mean": "base",
+    "quantile": "base",
+    "bessel_i": "base",
+    "bessel_j": "base",
+    "bessel_k": "base",
+    "bessel_y": "base",
+    "as_double": "base",
+    "as_integer": "base",
+    "as_logical": "base",
+    "as_character": "base",
+    "as_factor": "forcats",
+    "as_ordered": "base",
+    "as_date": "base",
+    "as_numeric": "base",
+    "arg": "base",
+    "conj": "base",
+    "mod": "base",
+    "re_": "base",
+    "im": "base",
+    "as_complex": "base",
+    "is_complex": "base",
+    "cummax": "base",
+    "cummin": "base",
+    "cumprod": "base",
+    "cumsum": "base",
+    "droplevels": "base",
+    "levels": "base",
+    "set_levels": "base",
+    "is_factor": "base",
+    "is_ordered": "base",
+    "nlevels": "base",
+    "factor": "base",
+    "ordered": "base",
+    "cut": "base",
+    "diff": "base",
+    "expand_grid": "tidyr",
+    "outer": "base",
+    "make_names": "base",
+    "make_unique": "base",
+    "rank": "base",
+    "identity": "base",
+    "is_logical": "base",
+    "is_true": "base",
+    "is_false": "base",
+    "is_na": "base",
+    "is_finite": "base",
+    "is_infinite": "base",
+    "any_na": "base",
+    "as_null": "base",
+    "is_null": "base",
+    "set_seed": "base",
+    "rep": "base",
+    "c_": "base",
+    "c": "base",
+    "length": "base",
+    "lengths": "base",
+    "order": "base",
+    "sort": "base",
+    "rev": "base",
+    "sample": "base",
+    "seq": "base",
+    "seq_along": "base",
+    "seq_len": "base",
+    "match": "base",
+    "beta": "base",
+    "lgamma": "base",
+    "digamma": "base",
+    "trigamma": "base",
+    "choose": "base",
+    "factorial": "base",
+    "gamma": "base",
+    "lfactorial": "base",
+    "lchoose": "base",
+    "lbeta": "base",
+    "psigamma": "base",
+    "rnorm": "base",
+    "runif": "base",
+    "rpois": "base",
+    "rbinom": "base",
+    "rcauchy": "base",
+    "rchisq": "base",
+    "rexp": "base",
+    "is_character": "base",
+    "grep": "base",
+    "grepl": "base",
+    "sub": "base",
+    "gsub": "base",
+    "strsplit": "base",
+    "paste": "base",
+    "paste0": "base",
+    "sprintf": "base",
+    "substr": "base",
+    "substring": "base",
+    "startswith": "base",
+    "endswith": "base",
+    "strtoi": "base",
+    "trimws": "base",
+    "toupper": "base",
+    "tolower": "base",
+    "chartr": "base",
+    "nchar": "base",
+    "nzchar": "base",
+    "table": "base",
+    "tabulate": "base",
+    "is_atomic": "base",
+    "is_double": "base",
+    "is_element": "base",
+    "is_in": "base",
+    "is_integer": "base",
+    "is_numeric": "base",
+    "any_": "base",
+    "all_": "base",
+    "acos": "base",
+    "acosh": "base",
+    "asin": "base",
+    "asinh": "base",
+    "atan": "base",
+    "atanh": "base",
+    "cos": "base",
+    "cosh": "base",
+    "cospi": "base",
+    "sin": "base",
+    "sinh": "base",
+    "sinpi": "base",
+    "tan": "base",
+    "tanh": "base",
+    "tanpi": "base",
+    "atan2": "base",
+    "append": "base",
+    "colnames": "base",
+    "set_colnames": "base",
+    "rownames": "base",
+    "set_rownames": "base",
+    "dim": "base",
+    "diag": "base",
+    "duplicated": "base",
+    "intersect": "dplyr",
+    "ncol": "base",
+    "nrow": "base",
+    "proportions": "base",
+    "setdiff": "dplyr",
+    "setequal": "dplyr",
+    "unique": "base",
+    "t": "base",
+    "union": "dplyr",
+    "max_col": "base",
+    "complete_cases": "base",
+    "head": "base",
+    "tail": "base",
+    "which": "base",
+    "which_max": "base",
+    "which_min": "base",
+    "pick": "dplyr",
+    "across": "dplyr",
+    "c_across": "dplyr",
+    "if_any": "dplyr",
+    "if_all": "dplyr",
+    "symdiff": "dplyr",
+    "arrange": "dplyr",
+    "bind_rows": "dplyr",
+    "bind_cols": "dplyr",
+    "cur_column": "dplyr",
+    "cur_data": "dplyr",
+    "n": "dplyr",
+    "cur_data_all": "dplyr",
+    "cur_group": "dplyr",
+    "cur_group_id": "dplyr",
+    "cur_group_rows": "dplyr",
+    "count": "dplyr",
+    "tally": "dplyr",
+    "add_count": "dplyr",
+    "add_tally": "dplyr",
+    "desc": "dplyr",
+    "filter_": "dplyr",
+    "distinct": "dplyr",
+    "n_distinct": "dplyr",
+    "glimpse": "dplyr",
+    "slice_": "dplyr",
+    "slice_head": "dplyr",
+    "slice_tail": "dplyr",
+    "slice_sample": "dplyr",
+    "slice_min": "dplyr",
+    "slice_max": "dplyr",
+    "between": "dplyr",
+    "cummean": "dplyr",
+    "cumall": "dplyr",
+    "cumany": "dplyr",
+    "coalesce": "dplyr",
+    "consecutive_id": "dplyr",
+    "na_if": "dplyr",
+    "near": "dplyr",
+    "nth": "dplyr",
+    "first": "dplyr",
+    "last": "dplyr",
+    "group_by": "dplyr",
+    "ungroup": "dplyr",
+    "rowwise": "dplyr",
+    "group_by_drop_default": "dplyr",
+    "group_vars": "dplyr",
+    "group_indices": "dplyr",
+    "group_keys": "dplyr",
+    "group_size": "dplyr",
+    "group_rows": "dplyr",
+    "group_cols": "dplyr",
+    "group_data": "dplyr",
+    "n_groups": "dplyr",
+    "group_map": "dplyr",
+    "group_modify": "dplyr",
+    "group_split": "dplyr",
+    "group_trim": "dplyr",
+    "group_walk": "dplyr",
+    "with_groups": "dplyr",
+    "if_else": "dplyr",
+    "case_match": "dplyr",
+    "case_when": "dplyr",
+    "inner_join": "dplyr",
+    "left_join": "dplyr",
+    "right_join": "dplyr",
+    "full_join": "dplyr",
+    "semi_join": "dplyr",
+    "anti_join": "dplyr",
+    "nest_join": "dplyr",
+    "cross_join": "dplyr",
+    "lead": "dplyr",
+    "lag": "dplyr",
+    "mutate": "dplyr",
+    "transmute": "dplyr",
+    "order_by": "dplyr",
+    "with_order": "dplyr",
+    "pull": "dplyr",
+    "row_number": "dplyr",
+    "row_number_": "dplyr",
+    "ntile": "dplyr",
+    "ntile_": "dplyr",
+    "min_rank": "dplyr",
+    "min_rank_": "dplyr",
+    "dense_rank": "dplyr",
+    "dense_rank_": "dplyr",
+    "percent_rank": "dplyr",
+    "percent_rank_": "dplyr",
+    "cume_dist": "dplyr",
+    "cume_dist_": "dplyr",
+    "recode": "dplyr",
+    "recode_factor": "dplyr",
+    "relocate": "dplyr",
+    "rename": "dplyr",
+    "rename_with": "dplyr",
+    "rows_insert": "dplyr",
+    "rows_update": "dplyr",
+    "rows_patch": "dplyr",
+    "rows_upsert": "dplyr",
+    "rows_delete": "dplyr",
+    "rows_append": "dplyr",
+    "select": "dplyr",
+    "union_all": "dplyr",
+    "summarise": "dplyr",
+    "summarize": "dplyr",
+    "where": "dplyr",
+    "everything": "dplyr",
+    "last_col": "dplyr",
+    "starts_with": "dplyr",
+    "ends_with": "dplyr",
+    "contains": "dplyr",
+    "matches": "dplyr",
+    "num_range": "dplyr",
+    "all_of": "dplyr",
+    "any_of": "dplyr",
+    "lazy": "dplyr",
+    "collect": "dplyr",
+    "fct_relevel": "forcats",
+    "fct_inorder": "forcats",
+    "fct_infreq": "forcats",
+    "fct_inseq": "forcats",
+    "fct_reorder": "forcats",
+    "fct_reorder2": "forcats",
+    "fct_shuffle": "forcats",
+    "fct_rev": "forcats",
+    "fct_shift": "forcats",
+    "first2": "forcats",
+    "last2": "forcats",
+    "fct_anon": "forcats",
+    "fct_recode": "forcats",
+    "fct_collapse": "forcats",
+    "fct_lump": "forcats",
+    "fct_lump_min": "forcats",
+    "fct_lump_prop": "forcats",
+    "fct_lump_n": "forcats",
+    "fct_lump_lowfreq": "forcats",
+    "fct_other": "forcats",
+    "fct_relabel": "forcats",
+    "fct_expand": "forcats",
+    "fct_explicit_na": "forcats",
+    "fct_drop": "forcats",
+    "fct_unify": "forcats",
+    "fct_c": "forcats",
+    "fct_cross": "forcats",
+    "fct_count": "forcats",
+    "fct_match": "forcats",
+    "fct_unique": "forcats",
+    "lvls_reorder": "forcats",
+    "lvls_revalue": "forcats",
+    "lvls_expand": "forcats",
+    "lvls_union": "forcats",
+    "tibble": "tibble",
+    "tibble_": "tibble",
+    "tribble": "tibble",
+    "tibble_row": "tibble",
+    "as_tibble": "tibble",
+    "enframe": "tibble",
+    "deframe": "tibble",
+    "add_row": "tibble",
+    "add_column": "tibble",
+    "has_rownames": "tibble",
+    "remove_rownames": "tibble",
+    "rownames_to_column": "tibble",
+    "rowid_to_column": "tibble",
+    "column_to_rownames": "tibble",
+    "add_case": "tibble",
+    "has_index": "tibble",
+    "remove_index": "tibble",
+    "drop_index": "tibble",
+    "index_to_column": "tibble",
+    "column_to_index": "tibble",
+    "full_seq": "tidyr",
+    "chop": "tidyr",
+    "unchop": "tidyr",
+    "nest": "tidyr",
+    "unnest": "tidyr",
+    "pack": "tidyr",
+    "unpack": "tidyr",
+    "expand": "tidyr",
+    "nesting": "tidyr",
+    "crossing": "tidyr",
+    "complete": "tidyr",
+    "drop_na": "tidyr",
+    "extract": "tidyr",
+    "fill": "tidyr",
+    "pivot_longer": "tidyr",
+    "pivot_wider": "tidyr",
+    "separate": "tidyr",
+    "separate_rows": "tidyr",
+    "uncount": "tidyr",
+    "unite": "tidyr",
+    "replace_na": "tidyr",
+}
+
+
+if __name__ == "__main__":  # pragma: no cover
+    # Rewrite API_INDEX in this file
+    with open(__file__) as fsrc:
+        source = fsrc.read()
+    before, rest = source.split("\nAPI_INDEX = {\n", 1)
+    after = ("\n" + rest).split("\n}\n", 1)[1]
+    items = "".join(
+        f'    "{name}": "{namespace}",\n'
+        for name, namespace in build_index().items()
+    )
+    with open(__file__, "w") as fout:
+        fout.write(f"{before}\nAPI_INDEX = {{\n{items}}}\n{after}")
@@ -0,0 +1,95 @@
+"""The backends selected in the current context
+
+`DatarOperator.with_backend()`, `array_ufunc.with_backend()` and
+`c.with_backend()` push the backend onto a stack kept in a `ContextVar`,
+so that the selection is local to the thread or the asyncio task. The
+class or instance attributes (e.g. `DatarOperator.backend`) are still the
+process-wide defaults, used when no backend is selected in the context.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, FrozenSet, Generator, Tuple
+
+# The things that a backend can be selected for
+TARGETS = ("operator", "array_ufunc", "c")
+
+# (targets, backend) from the bottom to the top of the stack
+_STACK: ContextVar[Tuple[Tuple[FrozenSet[str], str], ...]] = ContextVar(
+    "datar_backends",
+    default=(),
+)
+
+
+@contextmanager
+def use_backend(backend: str, *targets: str) -> Generator:
+    """Select a backend in the current context
+
+    Examples:
+        >>> with use_backend("pandas"):
+        >>>     # operators, numpy ufuncs and c[] use the pandas backend
+        >>>     data >> mutate(z=np.sin(f.x) + c[1:3])
+
+    Args:
+        backend: The name of the backend
+        *targets: What to select the backend for, any of `operator`,
+            `array_ufunc` and `c`. All of them if not given.
+    """
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        raise ValueError(f"Unknown targets to select backend for: {unknown}")
+
+    token = _STACK.set(
+        (*_STACK.get(), (frozenset(targets or TARGETS), backend))
+    )
+    try:
+        yield
+    finally:
+        _STACK.reset(token)
+
+
+def current_backend(target: str, default: str = None) -> str | None:
+    """Get the backend selected in the current context
+
+    Args:
+        target: What the backend is selected for
+        default: The backend to use if none is selected in the context
+
+    Returns:
+        The backend selected most recently for the target, or `default`
+    """
+    for targets, backend in reversed(_STACK.get()):
+        if target in targets:
+            return backend
+    return default
+
+
+def unregister_backend(func: Callable, backend: str) -> None:
+    """Remove the implementations of a backend from a verb or a function
+    registered by pipda
+
+    pipda has no API to unregister, so the registries are taken from the
+    closure of `func.register()`. It's for the temporary backends, e.g. in
+    the tests and the benchmarks.
+
+    Args:
+        func: The verb or the function, e.g. `datar.apis.dplyr.mutate`
+        backend: The name of the backend
+    """
+    register = func.register
+    cells = dict(
+        zip(
+            register.__code__.co_freevars,
+            (cell.cell_contents for cell in register.__closure__),
+        )
+    )
+    registry = cells["registry"]
+    reg = registry.pop(backend, None)
+    cells["favorables"].pop(backend, None)
+    if reg is None:
+        return
+
+    impls = getattr(reg, "registry", {}).values() or (reg,)
+    for impl in impls:
+        cells["contexts"].pop(impl, None)
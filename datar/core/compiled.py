@@ -0,0 +1,498 @@
+"""Compile the pipda expressions into plain callables
+
+`evaluate_expr()` from pipda walks the expression tree and checks the type
+of every node each time an expression is evaluated, which happens once per
+group for grouped data. Here the tree is walked once, into nested closures
+that only do the evaluation. The compiled callables are cached by the
+structural keys of the expressions (see `datar.core.expr.expr_key`), so that
+the same expressions built again, for example, by the same `mutate()` called
+for another chunk of data, are compiled only once.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+
+from pipda import (
+    FunctionCall,
+    OperatorCall,
+    ReferenceAttr,
+    ReferenceItem,
+    Symbolic,
+    VerbCall,
+    evaluate_expr,
+)
+from pipda.context import ContextType
+from pipda.expression import Expression
+
+from .expr import expr_key
+
+# The max number of compiled expressions to keep
+COMPILED_CACHE_SIZE = 1024
+
+CompiledExpr = Callable[[Any, "ContextType | None"], Any]
+
+
+class _CompiledCache(OrderedDict):
+    """The least-recently-used compiled expressions"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def get_or_compile(
+        self,
+        key: Hashable,
+        compiler: Callable,
+        *args: Any,
+    ) -> Any:
+        """Get the compiled expression by key,
+        or compile it with `compiler(*args)`"""
+        with self._lock:
+            compiled = self.get(key)
+            if compiled is not None:
+                self.move_to_end(key)
+                return compiled
+
+        # compile outside of the lock, as it may compile the subexpressions
+        compiled = compiler(*args)
+        with self._lock:
+            self[key] = compiled
+            while len(self) > COMPILED_CACHE_SIZE:
+                self.popitem(last=False)
+        return compiled
+
+
+class _Memo(dict):
+    """The results of the common subexpressions, evaluated with `data`"""
+
+    def __init__(self, data: Any) -> None:
+        super().__init__()
+        self.data = data
+
+
+_COMPILED_CACHE = _CompiledCache()
+# The results of the common subexpressions in the current evaluate_exprs()
+# or evaluate_assignments()
+_MEMO: ContextVar[_Memo | None] = ContextVar("_MEMO", default=None)
+
+
+def _constant(value: Any) -> CompiledExpr:
+    return lambda data, context: value
+
+
+def _context_value(context: ContextType | None) -> ContextType | None:
+    return context.value if isinstance(context, Enum) else context
+
+
+def _compile_reference(
+    expr: ReferenceAttr | ReferenceItem,
+    common: FrozenSet,
+) -> CompiledExpr:
+    parent = _compile(expr._pipda_parent, common)
+    ref = expr._pipda_ref
+    level = expr._pipda_level
+
+    if isinstance(expr, ReferenceAttr):
+
+        def compiled(data, context):
+            context = _context_value(context)
+            if context is None:
+                # let pipda raise the error
+                return expr._pipda_eval(data, context)
+            return context.getattr(parent(data, context), ref, level)
+
+    else:
+        compiled_ref = _compile(ref, common)
+
+        def compiled(data, context):
+            context = _context_value(context)
+            if context is None:
+                return expr._pipda_eval(data, context)
+            return context.getitem(
+                parent(data, context),
+                compiled_ref(data, context.ref),
+                level,
+            )
+
+    return compiled
+
+
+def _compile_operator(expr: OperatorCall, common: FrozenSet) -> CompiledExpr:
+    op_func = expr._pipda_op_func
+    operands = tuple(
+        _compile(operand, common) for operand in expr._pipda_operands
+    )
+    if len(operands) == 1:
+        (x,) = operands
+        return lambda data, context: op_func(x(data, context))
+    if len(operands) == 2:
+        x, y = operands
+        return lambda data, context: op_func(
+            x(data, context),
+            y(data, context),
+        )
+    return lambda data, context: op_func(
+        *(operand(data, context) for operand in operands)
+    )
+
+
+def _compile_function(expr: FunctionCall, common: FrozenSet) -> CompiledExpr:
+    func = expr._pipda_func
+    functype = getattr(func, "_pipda_functype", None)
+    if functype == "verb":
+        # The arguments are evaluated with the data from the first one
+        return lambda data, context: expr._pipda_eval(data, context)
+
+    backend = expr._pipda_backend
+    args = tuple(_compile(arg, common) for arg in expr._pipda_args)
+    kwargs = {
+        key: _compile(val, common) for key, val in expr._pipda_kwargs.items()
+    }
+
+    def compiled(data, context):
+        context = _context_value(context)
+        argvals = tuple(arg(data, context) for arg in args)
+        kwargvals = {key: val(data, context) for key, val in kwargs.items()}
+        if functype == "func":
+            impl = func.dispatch(backend=backend)
+        elif functype == "dispatchable":
+            impl = func.dispatch(
+                *(arg.__class__ for arg in argvals),
+                backend=backend,
+            )
+        else:
+            impl = func
+        return impl(*argvals, **kwargvals)
+
+    return compiled
+
+
+def _shared(key: Hashable, compiled: CompiledExpr) -> CompiledExpr:
+    """Make the compiled expression evaluated once per `evaluate_exprs()`"""
+
+    def shared(data, context):
+        memo = _MEMO.get()
+        if memo is None or memo.data is not data:
+            # e.g. evaluated with each group of the data
+            return compiled(data, context)
+
+        mkey = (key, _context_value(context))
+        try:
+            return memo[mkey]
+        except KeyError:
+            out = memo[mkey] = compiled(data, context)
+            return out
+
+    return shared
+
+
+def _compile(expr: Any, common: FrozenSet = frozenset()) -> CompiledExpr:
+    """Compile the expression without caching
+
+    The subexpressions with keys in `common` are evaluated only once in
+    `evaluate_exprs()`.
+    """
+    if common and isinstance(expr, (OperatorCall, FunctionCall)):
+        key = expr_key(expr)
+        if key in common:
+            return _shared(key, _compile_node(expr, common))
+    return _compile_node(expr, common)
+
+
+def _compile_node(expr: Any, common: FrozenSet) -> CompiledExpr:
+    """Compile the expression by its type"""
+    if isinstance(expr, Symbolic):
+        return lambda data, context: data
+    if isinstance(expr, (ReferenceAttr, ReferenceItem)):
+        return _compile_reference(expr, common)
+    if isinstance(expr, OperatorCall):
+        return _compile_operator(expr, common)
+    if isinstance(expr, FunctionCall) and not isinstance(
+        expr._pipda_func, Expression
+    ):
+        return _compile_function(expr, common)
+    if hasattr(expr.__class__, "_pipda_eval"):
+        # Other expressions, or customized classes
+        return lambda data, context: expr._pipda_eval(
+            data,
+            _context_value(context),
+        )
+    if isinstance(expr, (tuple, list, set)):
+        cls = expr.__class__
+        items = tuple(_compile(item, common) for item in expr)
+        return lambda data, context: cls(
+            item(data, context) for item in items
+        )
+    if isinstance(expr, (dict, slice)):
+        return lambda data, context: evaluate_expr(expr, data, context)
+    return _constant(expr)
+
+
+def compile_expr(expr: Any) -> CompiledExpr:
+    """Compile an expression into a callable
+
+    Args:
+        expr: The expression, e.g. `f.x * 2 + log(f.y)`
+
+    Returns:
+        A callable `compiled(data, context)` that gives the same result as
+        `pipda.evaluate_expr(expr, data, context)`
+    """
+    key = expr_key(expr)
+    if key is None:
+        return _compile(expr)
+    return _COMPILED_CACHE.get_or_compile(key, _compile, expr)
+
+
+def evaluate_compiled(
+    expr: Any,
+    data: Any,
+    context: ContextType | None = None,
+) -> Any:
+    """Evaluate an expression with its compiled form
+
+    Args:
+        expr: The expression
+        data: The data to evaluate the expression with
+        context: The context
+
+    Returns:
+        The evaluated result
+    """
+    return compile_expr(expr)(data, context)
+
+
+def _is_volatile(expr: Any) -> bool:
+    """Check if an expression calls a function that gives different results
+    with the same arguments (marked with `volatile = True`), like `runif()`
+    """
+    if isinstance(expr, (FunctionCall, VerbCall)):
+        return (
+            getattr(expr._pipda_func, "volatile", False)
+            or _is_volatile(expr._pipda_func)
+            or any(map(_is_volatile, expr._pipda_args))
+            or any(map(_is_volatile, expr._pipda_kwargs.values()))
+        )
+    if isinstance(expr, OperatorCall):
+        return any(map(_is_volatile, expr._pipda_operands))
+    if isinstance(expr, (ReferenceAttr, ReferenceItem)):
+        return _is_volatile(expr._pipda_parent) or _is_volatile(expr._pipda_ref)
+    if isinstance(expr, (tuple, list, set)):
+        return any(map(_is_volatile, expr))
+    if isinstance(expr, dict):
+        return any(map(_is_volatile, expr.values()))
+    return False
+
+
+def _count_subexprs(
+    expr: Any,
+    counts: Counter,
+    found: Dict[Hashable, Any] = None,
+) -> None:
+    """Count the keys of the calls in the expression, and keep the first
+    call found for each key in `found`"""
+    if isinstance(expr, (OperatorCall, FunctionCall)):
+        key = expr_key(expr)
+        if key is not None and not _is_volatile(expr):
+            counts[key] += 1
+            if found is not None:
+                found.setdefault(key, expr)
+        if isinstance(expr, OperatorCall):
+            children = expr._pipda_operands
+        else:
+            children = (*expr._pipda_args, *expr._pipda_kwargs.values())
+    elif isinstance(expr, (ReferenceAttr, ReferenceItem)):
+        children = (expr._pipda_parent, expr._pipda_ref)
+    elif isinstance(expr, (tuple, list, set)):
+        children = expr
+    elif isinstance(expr, dict):
+        children = expr.values()
+    else:
+        return
+
+    for child in children:
+        _count_subexprs(child, counts, found)
+
+
+def _compile_exprs(
+    exprs: Sequence[Any],
+    common: FrozenSet,
+) -> List[CompiledExpr]:
+    return [_compile(expr, common) for expr in exprs]
+
+
+def evaluate_exprs(
+    exprs: Sequence[Any],
+    data: Any,
+    contexts: Sequence[ContextType | None],
+) -> List[Any]:
+    """Evaluate the expressions together, where the identical
+    subexpressions are evaluated only once
+
+    For example, `mean(f.x)` is evaluated only once for
+    `z1=(f.x - mean(f.x)) / sd(f.x)` and `z2=abs(f.x - mean(f.x))`. The
+    functions marked with `volatile = True` (e.g. `runif()`) are always
+    evaluated.
+
+    Args:
+        exprs: The expressions, e.g. the arguments of a verb
+        data: The data to evaluate the expressions with
+        contexts: The context for each expression
+
+    Returns:
+        The evaluated results
+    """
+    counts = Counter()  # type: Counter
+    for expr in exprs:
+        _count_subexprs(expr, counts)
+    common = frozenset(key for key, count in counts.items() if count > 1)
+    if not common:
+        return [
+            evaluate_compiled(expr, data, context)
+            for expr, context in zip(exprs, contexts)
+        ]
+
+    keys = tuple(map(expr_key, exprs))
+    if None in keys:
+        compiled = _compile_exprs(exprs, common)
+    else:
+        compiled = _COMPILED_CACHE.get_or_compile(
+            ("evaluate_exprs", keys),
+            _compile_exprs,
+            exprs,
+            common,
+        )
+
+    token = _MEMO.set(_Memo(data))
+    try:
+        return [
+            comp(data, context) for comp, context in zip(compiled, contexts)
+        ]
+    finally:
+        _MEMO.reset(token)
+
+
+def _union(*deps: FrozenSet | None) -> FrozenSet | None:
+    """Union the columns, where `None` means all the columns"""
+    if None in deps:
+        return None
+    return frozenset().union(*deps)
+
+
+def column_deps(expr: Any) -> FrozenSet[str] | None:
+    """Get the names of the columns of the data that an expression refers to
+
+    Args:
+        expr: The expression
+
+    Returns:
+        The names of the columns, or `None` if the expression may depend on
+        any of them, e.g. with `f` itself, a verb like `n()`, or a reference
+        by position.
+    """
+    if isinstance(expr, Symbolic):
+        return None
+    if isinstance(expr, (ReferenceAttr, ReferenceItem)):
+        parent, ref = expr._pipda_parent, expr._pipda_ref
+        if isinstance(parent, Symbolic):
+            return frozenset([ref]) if isinstance(ref, str) else None
+        return _union(column_deps(parent), column_deps(ref))
+    if isinstance(expr, OperatorCall):
+        return _union(*map(column_deps, expr._pipda_operands))
+    if isinstance(expr, FunctionCall) and (
+        getattr(expr._pipda_func, "_pipda_functype", None) != "verb"
+    ):
+        return _union(
+            column_deps(expr._pipda_func),
+            *map(column_deps, expr._pipda_args),
+            *map(column_deps, expr._pipda_kwargs.values()),
+        )
+    if isinstance(expr, Expression) or hasattr(
+        expr.__class__,
+        "_pipda_eval",
+    ):
+        return None
+    if isinstance(expr, (tuple, list, set)):
+        return _union(*map(column_deps, expr))
+    if isinstance(expr, dict):
+        return _union(*map(column_deps, expr.values()))
+    return frozenset()
+
+
+def evaluate_assignments(
+    exprs: Mapping[str, Any],
+    data: Any,
+    contexts: Sequence[ContextType | None],
+    assign: Callable[[Any, str, Any], Any],
+) -> Tuple[Any, Dict[str, Any]]:
+    """Evaluate the expressions one by one, each assigned to the data before
+    the next one is evaluated, like the arguments of `mutate()` and
+    `summarise()`, where the identical subexpressions are evaluated only
+    once while the columns they refer to are not reassigned
+
+    For example, with `y=f.x * 2, z=f.y + 1`, `z` sees the new `y`, and with
+    `a=mean(f.x), x=f.x + 1, b=mean(f.x)`, `mean(f.x)` is evaluated again
+    for `b`, but only once with `a=mean(f.x), b=mean(f.x) + 1`.
+
+    Args:
+        exprs: The expressions by the names of the columns to assign to
+        data: The data to evaluate the first expression with
+        contexts: The context for each expression
+        assign: A function `assign(data, name, value)` to assign the value
+            to the data as the column, returning the new data (could be the
+            same object if modified in place)
+
+    Returns:
+        The data with all the values assigned, and the evaluated values
+    """
+    names = list(exprs)
+    values = list(exprs.values())
+    counts = Counter()  # type: Counter
+    found: Dict[Hashable, Any] = {}
+    for expr in values:
+        _count_subexprs(expr, counts, found)
+    common = frozenset(key for key, count in counts.items() if count > 1)
+
+    keys = tuple(map(expr_key, values))
+    if not common or None in keys:
+        compiled = _compile_exprs(values, common)
+    else:
+        compiled = _COMPILED_CACHE.get_or_compile(
+            ("evaluate_exprs", keys),
+            _compile_exprs,
+            values,
+            common,
+        )
+    deps = {key: column_deps(found[key]) for key in common}
+
+    out = {}
+    memo = _Memo(data)
+    token = _MEMO.set(memo)
+    try:
+        for name, comp, context in zip(names, compiled, contexts):
+            out[name] = comp(data, context)
+            data = assign(data, name, out[name])
+            # drop the results that may refer to the replaced column
+            for mkey in list(memo):
+                dep = deps[mkey[0]]
+                if dep is None or name in dep:
+                    del memo[mkey]
+            memo.data = data
+    finally:
+        _MEMO.reset(token)
+
+    return data, out
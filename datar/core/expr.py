@@ -0,0 +1,161 @@
+"""Static analysis of the pipda expressions
+
+These helpers only look at the structure of the expressions, without
+evaluating them, so they work for any backend. Whenever the structure can't
+tell, they give the conservative answer (`None` or `False`).
+"""
+from __future__ import annotations
+
+from numbers import Integral, Number
+from typing import Any, Hashable, Set
+
+from pipda import (
+    FunctionCall,
+    OperatorCall,
+    ReferenceAttr,
+    ReferenceItem,
+    Symbolic,
+    VerbCall,
+)
+from pipda.expression import Expression
+
+_SCALAR_TYPES = (str, bytes, Number, type(None))
+
+
+def plain_name(x: Any) -> str | None:
+    """Get the column name if x is a plain column reference
+
+    Args:
+        x: A string, or a reference like `f.x` or `f["x"]`
+
+    Returns:
+        The column name or None if x is not a plain column reference
+    """
+    if isinstance(x, str):
+        return x
+    if (
+        isinstance(x, (ReferenceAttr, ReferenceItem))
+        and isinstance(x._pipda_parent, Symbolic)
+        and isinstance(x._pipda_ref, str)
+    ):
+        return x._pipda_ref
+    return None
+
+
+def _union(*refs: Set[str] | None) -> Set[str] | None:
+    """Union the sets of references, None if any of them is None"""
+    out = set()
+    for ref in refs:
+        if ref is None:
+            return None
+        out |= ref
+    return out
+
+
+def expr_refs(x: Any) -> Set[str] | None:
+    """Get the names of the columns referred to by an expression
+
+    Args:
+        x: The expression, or a literal, or a list/tuple/dict of them
+
+    Returns:
+        The column names, or None if they can't be determined, for example
+        when the expression refers to the whole data (`f`), columns by
+        position, or uses verbs like `across()` and `n()`.
+    """
+    if isinstance(x, (ReferenceAttr, ReferenceItem)):
+        if isinstance(x._pipda_parent, Symbolic):
+            return {x._pipda_ref} if isinstance(x._pipda_ref, str) else None
+        return _union(expr_refs(x._pipda_parent), expr_refs(x._pipda_ref))
+    if isinstance(x, OperatorCall):
+        return _union(*map(expr_refs, x._pipda_operands))
+    if isinstance(x, FunctionCall):
+        return _union(
+            expr_refs(x._pipda_func),
+            *map(expr_refs, x._pipda_args),
+            *map(expr_refs, x._pipda_kwargs.values()),
+        )
+    if isinstance(x, Expression):
+        return None
+    if isinstance(x, (list, tuple, set)):
+        return _union(*map(expr_refs, x))
+    if isinstance(x, dict):
+        return _union(*map(expr_refs, x.values()))
+    return set()
+
+
+def is_elementwise(x: Any) -> bool:
+    """Check if an expression is computed row by row
+
+    Only plain column references, scalars and operators on them are
+    considered elementwise. The result of an elementwise expression for a
+    row doesn't depend on the other rows or the order of the rows.
+
+    Args:
+        x: The expression
+
+    Returns:
+        True if the expression is known to be elementwise
+    """
+    if isinstance(x, OperatorCall):
+        return all(map(is_elementwise, x._pipda_operands))
+    if isinstance(x, Expression):
+        return plain_name(x) is not None
+    return isinstance(x, _SCALAR_TYPES)
+
+
+def expr_key(x: Any) -> Hashable | None:
+    """Get a structural key of an expression
+
+    Two expressions with the same key have the same structure, so they
+    evaluate to the same value with the same data.
+
+    Args:
+        x: The expression
+
+    Returns:
+        A hashable key, or None if x (or part of it) is not hashable
+    """
+    if isinstance(x, Symbolic):
+        return (Symbolic,)
+    if isinstance(x, (ReferenceAttr, ReferenceItem)):
+        parent, ref = expr_key(x._pipda_parent), expr_key(x._pipda_ref)
+        if parent is None or ref is None:
+            return None
+        return (type(x), parent, ref)
+    if isinstance(x, OperatorCall):
+        operands = tuple(map(expr_key, x._pipda_operands))
+        if None in operands:
+            return None
+        return (OperatorCall, x._pipda_op_name, x._pipda_op_func, operands)
+    if isinstance(x, (FunctionCall, VerbCall)):
+        func = (
+            expr_key(x._pipda_func)
+            if isinstance(x._pipda_func, Expression)
+            else x._pipda_func
+        )
+        args = tuple(map(expr_key, x._pipda_args))
+        kwargs = tuple(
+            (key, expr_key(val)) for key, val in x._pipda_kwargs.items()
+        )
+        if (
+            func is None
+            or None in args
+            or any(val is None for _, val in kwargs)
+        ):
+            return None
+        return (type(x), func, args, kwargs, x._pipda_backend)
+    if isinstance(x, Expression):
+        return None
+    if isinstance(x, (list, tuple)):
+        items = tuple(map(expr_key, x))
+        return None if None in items else (type(x), items)
+    try:
+        hash(x)
+    except TypeError:
+        return None
+    if isinstance(x, Number) and not isinstance(x, Integral):
+        # by repr, so that 0.0 and -0.0 are different, and nan equals nan
+        return (type(x), repr(x))
+    # type is included so that 1, 1.0 and True are different
+    return (type(x), x)
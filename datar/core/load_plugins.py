@@ -1,6 +1,7 @@
 from pipda import register_array_ufunc
 
-from .options import get_option
+from .backends import current_backend
+from .options import PARALLEL_OPTIONS, get_option, push_options
 from .plugin import plugin
 
 
@@ -14,11 +15,12 @@ def _array_ufunc_to_register(ufunc, x, *args, kind, **kwargs):
         *args,
         kind=kind,
         **kwargs,
-        __backend=array_ufunc.backend,
+        __backend=current_backend("array_ufunc", array_ufunc.backend),
     )
 
 
 plugin.load_entrypoints(only=get_option("backends"))
 
 plugin.hooks.setup()
+push_options({name: get_option(name) for name in PARALLEL_OPTIONS})
 register_array_ufunc(_array_ufunc_to_register)
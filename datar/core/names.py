@@ -3,11 +3,22 @@ import inspect
 import re
 import keyword
 import math
+from collections import Counter
+from functools import lru_cache
 from numbers import Number
 from typing import Any, Callable, List, Union, Iterable, Tuple
 
 from .utils import logger
 
+# Number of the repaired names cached, keyed on the names and the method
+NAMES_CACHE_SIZE = 128
+# Max number of the changed names to be listed in the log
+MAX_LOGGED_NAMES = 10
+
+_SUFFIX_REPAIR = re.compile(r"(?:(?<!_)_{1,2}\d+|(?<!_)__)+$")
+_SUFFIX_CHECK = re.compile(r"(?:(?<!_)_{2}\d+|(?<!_)__)+$")
+_NON_WORD = re.compile(r"[^\w]")
+
 
 class NameNonUniqueError(ValueError):
     """Error for non-unique names"""
@@ -30,18 +41,30 @@ def _is_scalar(x: Any) -> bool:
 
 
 def _log_changed_names(changed_names: List[Tuple[str, str]]) -> None:
-    """Log the changed names"""
+    """Log the changed names, at most `MAX_LOGGED_NAMES` of them listed"""
     if not changed_names:
         return
 
-    logger.warning("New names:")
-    for orig_name, new_name in changed_names:
-        logger.warning("* %r -> %r", orig_name, new_name)
+    lines = ["New names:"]
+    lines.extend(
+        f"* {orig_name!r} -> {new_name!r}"
+        for orig_name, new_name in changed_names[:MAX_LOGGED_NAMES]
+    )
+    if len(changed_names) > MAX_LOGGED_NAMES:
+        lines.append(
+            f"* ... and {len(changed_names) - MAX_LOGGED_NAMES} more"
+        )
+    logger.warning("\n".join(lines))
 
 
 def _repair_names_minimal(names: Iterable[str]) -> List[str]:
     """Minimal repairing"""
-    return ["" if name is None or _isnan(name) else str(name) for name in names]
+    return [
+        name if type(name) is str
+        else "" if name is None or _isnan(name)
+        else str(name)
+        for name in names
+    ]
 
 
 def _repair_names_unique(
@@ -50,19 +73,20 @@ def _repair_names_unique(
     sanitizer: Callable = None,
 ) -> List[str]:
     """Make sure names are unique"""
-    min_names = _repair_names_minimal(names)
+    names = list(names)
+    # The suffixes to remove all have `_`
     neat_names = [
-        re.sub(r"(?:(?<!_)_{1,2}\d+|(?<!_)__)+$", "", name)
-        for name in min_names
+        _SUFFIX_REPAIR.sub("", name) if "_" in name else name
+        for name in _repair_names_minimal(names)
     ]
     if callable(sanitizer):
         neat_names = [sanitizer(name) for name in neat_names]
 
+    counts = Counter(neat_names)
     new_names = []
     changed_names = []
-    for i, name in enumerate(names):
-        neat_name = neat_names[i]
-        if neat_names.count(neat_name) > 1 or neat_name == "":
+    for i, (name, neat_name) in enumerate(zip(names, neat_names)):
+        if neat_name == "" or counts[neat_name] > 1:
             neat_name = f"{neat_name}__{i}"
         if neat_name != name:
             changed_names.append((name, neat_name))
@@ -77,8 +101,9 @@ def _repair_names_universal(
     quiet: bool = False,
 ) -> List[str]:
     """Make sure names are safely to be used as variable or attribute"""
+    names = list(names)
     min_names = _repair_names_minimal(names)
-    neat_names = [re.sub(r"[^\w]", "_", name) for name in min_names]
+    neat_names = [_NON_WORD.sub("_", name) for name in min_names]
     new_names = _repair_names_unique(
         neat_names,
         quiet=True,
@@ -100,12 +125,13 @@ def _repair_names_universal(
 
 def _repair_names_check_unique(names: Iterable[str]) -> Iterable[str]:
     """Just check the uniqueness"""
+    counts = Counter(names)
     for name in names:
-        if names.count(name) > 1:
+        if counts[name] > 1:
             raise NameNonUniqueError(f"Names must be unique: {name}")
         if name == "" or _isnan(name):
             raise NameNonUniqueError(f"Names can't be empty: {name}")
-        if re.search(r"(?:(?<!_)_{2}\d+|(?<!_)__)+$", str(name)):
+        if _SUFFIX_CHECK.search(str(name)):
             raise NameNonUniqueError(
                 f"Names can't be of the form `__` or `_j`: {name}"
             )
@@ -120,6 +146,25 @@ BUILTIN_REPAIR_METHODS = dict(
 )
 
 
+@lru_cache(maxsize=NAMES_CACHE_SIZE)
+def _repair_names_cached(
+    names: Tuple[str, ...],
+    repair: str,
+) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]:
+    """Repair the names by a builtin method, and get the changed ones"""
+    method = BUILTIN_REPAIR_METHODS[repair]
+    if repair in ("unique", "universal"):
+        new_names = method(names, quiet=True)
+    else:
+        new_names = method(names)
+    changed_names = tuple(
+        (orig_name, new_name)
+        for orig_name, new_name in zip(names, new_names)
+        if orig_name != new_name
+    )
+    return tuple(new_names), changed_names
+
+
 def repair_names(
     names: Iterable[str],
     repair: Union[str, Callable],
@@ -161,6 +206,15 @@ def repair_names(
         NameNonUniqueError: when check_unique fails
     """
     if isinstance(repair, str):
+        names = list(names)
+        if all(type(name) is str for name in names):
+            # str names only, as 1 == 1.0 == True but their names differ
+            new_names, changed_names = _repair_names_cached(
+                tuple(names),
+                repair,
+            )
+            _log_changed_names(changed_names)
+            return list(new_names)
         repair = BUILTIN_REPAIR_METHODS[repair]  # type: ignore
     elif (
         not _is_scalar(repair)
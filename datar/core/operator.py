@@ -1,8 +1,76 @@
 """Operators for datar"""
-from typing import Callable
+from typing import Any, Callable, Dict, Tuple
 from contextlib import contextmanager
 
 from pipda import register_operator, Operator
+from pipda.expression import OPERATORS
+
+from .backends import current_backend, use_backend
+from .plugin import (
+    plugin,
+    dispatch,
+    resolve_cached,
+    _resolve_all,
+    _DISPATCH_CACHE,
+    _REGISTRY_LOCK,
+)
+
+_UNARY_OPS = {"neg", "pos", "invert"}
+
+
+def _resolve_table(
+    op: str,
+    xtype: type,
+    ytype: type,
+    backend: str,
+) -> Callable:
+    """Find the implementation of op by the backend from the operator table
+
+    The MROs of the operand types are walked, so implementations registered
+    for base classes apply to subclasses. For right operators (e.g. `radd`),
+    the implementation of the left operator (`add`) is used with the
+    operands swapped, if `radd` itself is not registered.
+    """
+    for xcls in xtype.__mro__:
+        for ycls in ytype.__mro__:
+            impls = DatarOperator._table.get((op, xcls, ycls))
+            if impls and backend in impls:
+                return impls[backend]
+
+    if OPERATORS[op][1] and op[1:] in OPERATORS:
+        impl = _resolve_table(op[1:], ytype, xtype, backend)
+        if impl is not None:
+            return lambda x, y: impl(y, x)
+
+    return None
+
+
+def _resolve_impl(
+    op: str,
+    xtype: type,
+    ytype: type,
+    backend: str,
+) -> Callable:
+    """Find the implementation of op from the operator table
+
+    Without a backend, the last enabled plugin that has either an
+    implementation in the table or the `operate()` hook wins, like
+    single-result hooks. `None` is returned to use the `operate()` hook.
+    """
+    # sorts the registry, so that the enabled plugins are in their order
+    hooked = {plg.name for plg, _ in _resolve_all("operate", None)}
+    enabled = plugin.get_enabled_plugin_names()
+    if backend is not None:
+        if backend not in enabled:
+            return None
+        return _resolve_table(op, xtype, ytype, backend)
+
+    for name in reversed(enabled):
+        impl = _resolve_table(op, xtype, ytype, name)
+        if impl is not None or name in hooked:
+            return impl
+
+    return None
 
 
 @register_operator
@@ -10,21 +78,105 @@ class DatarOperator(Operator):
     """Operator class for datar"""
 
     backend = None
+    # (op, xtype, ytype) => {backend: implementation}
+    _table: Dict[Tuple[str, type, type], Dict[str, Callable]] = {}
 
     @classmethod
     @contextmanager
     def with_backend(cls, backend: str):
-        """Use a backend for the operator"""
-        old_backend = cls.backend
-        cls.backend = backend
-        yield
-        cls.backend = old_backend
+        """Use a backend for the operator in the current context"""
+        with use_backend(backend, "operator"):
+            yield
+
+    @classmethod
+    def register(
+        cls,
+        op: str,
+        xtype: type,
+        ytype: type = object,
+        *,
+        backend: str,
+    ) -> Callable:
+        """Register an implementation of an operator for the operand types
+
+        Backends should call this in their `setup()` hook. Operators with
+        an implementation registered are called directly, without going
+        through the `operate()` hook.
+
+        Examples:
+            >>> @DatarOperator.register("add", np.ndarray, backend="numpy")
+            >>> def _add(x, y):
+            >>>     return np.add(x, y)
+
+        Args:
+            op: The name of the operator, e.g. `add`, `radd`, `neg`
+            xtype: The type of the left operand
+            ytype: The type of the right operand.
+                Ignored for unary operators.
+            backend: The name of the backend
+
+        Returns:
+            A decorator to register the implementation
+        """
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}")
+
+        def decorator(func: Callable) -> Callable:
+            with _REGISTRY_LOCK:
+                cls._table.setdefault((op, xtype, ytype), {})[backend] = func
+                _DISPATCH_CACHE.clear()
+            return func
+
+        return decorator
+
+    @classmethod
+    def unregister(
+        cls,
+        op: str,
+        xtype: type,
+        ytype: type = object,
+        *,
+        backend: str,
+    ) -> None:
+        """Remove the implementation of an operator registered by
+        `register()`, if any
+
+        Args:
+            op: The name of the operator
+            xtype: The type of the left operand
+            ytype: The type of the right operand
+            backend: The name of the backend
+        """
+        with _REGISTRY_LOCK:
+            impls = cls._table.get((op, xtype, ytype))
+            if impls is None or impls.pop(backend, None) is None:
+                return
+            if not impls:
+                del cls._table[(op, xtype, ytype)]
+            _DISPATCH_CACHE.clear()
 
     def __getattr__(self, name: str) -> Callable:
-        from .plugin import plugin
-        return lambda x, y=None: plugin.hooks.operate(
-            name,
-            x,
-            y,
-            __plugin=self.__class__.backend,
-        )
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        cls = self.__class__
+        unary = name in _UNARY_OPS
+
+        def op_func(x: Any, y: Any = None) -> Any:
+            backend = current_backend("operator", cls.backend)
+            impl = resolve_cached(
+                ("operate", backend, name, type(x), type(y)),
+                _resolve_impl,
+                name,
+                type(x),
+                type(y),
+                backend,
+            )
+            if impl is None:
+                return dispatch("operate", name, x, y, __plugin=backend)
+            return impl(x) if unary else impl(x, y)
+
+        op_func.__name__ = name
+        # Cache it so that __getattr__ is not hit again for this operator
+        setattr(self, name, op_func)
+        return op_func
@@ -1,6 +1,15 @@
-"""Provide options"""
+"""Provide options
+
+The options are looked up in two layers: the overrides of the current
+context, set by `options_context()`, and the global `OPTIONS`. The
+overrides are kept in a `ContextVar`, so they are local to the thread or
+the asyncio task that sets them. The global options are read without
+locking, and changed under a lock.
+"""
 from __future__ import annotations
 
+import threading
+from contextvars import ContextVar
 from typing import Any, Generator, Mapping
 from contextlib import contextmanager
 
@@ -21,6 +30,22 @@ OPTIONS = Diot(
             "allow_conflict_names": False,
             # Disable some installed backends
             "backends": [],
+            # Route the verbs in lazy pipelines to the backend that
+            # estimates the lowest cost (with the verb_cost() hook)
+            "lazy_routing": True,
+            # Cache the parsed datasets on disk (see datar.data.cache)
+            "dataset_cache": True,
+            # The max total size of the loaded datasets kept in memory
+            "dataset_memory_limit": 1 << 30,
+            # The max number of threads (or processes) datar and the
+            # backends use, None to let them decide
+            "n_threads": None,
+            # The number of rows for the backends to process at a time,
+            # None to let them decide
+            "chunk_size": None,
+            # The kind of the executor for parallel work, "thread" or
+            # "process", or a concurrent.futures.Executor
+            "executor": "thread",
         },
         OPTION_FILE_HOME,
         OPTION_FILE_CWD,
@@ -29,6 +54,51 @@ OPTIONS = Diot(
     diot_transform=_key_transform,
 )
 
+_OPTIONS_LOCK = threading.Lock()
+# The options pushed to the backends by the `options_changed()` hook
+PARALLEL_OPTIONS = ("n_threads", "chunk_size", "executor")
+# The overrides of the options in the current context
+_OVERRIDES: ContextVar[Mapping[str, Any]] = ContextVar(
+    "datar_options",
+    default={},
+)
+
+
+def _check_option(name: str, value: Any) -> None:
+    """Check the value of a parallelism option"""
+    if name in ("n_threads", "chunk_size"):
+        if value is not None and (
+            not isinstance(value, int) or isinstance(value, bool) or value < 1
+        ):
+            raise ValueError(
+                f"Option `{name}` must be a positive integer or None, "
+                f"got {value!r}."
+            )
+    elif name == "executor":
+        from concurrent.futures import Executor
+
+        if value not in ("thread", "process") and not isinstance(
+            value,
+            Executor,
+        ):
+            raise ValueError(
+                'Option `executor` must be "thread", "process" or a '
+                f"concurrent.futures.Executor, got {value!r}."
+            )
+
+
+def push_options(changes: Mapping[str, Any]) -> None:
+    """Push the changed options to the backends, by the `options_changed()`
+    hook
+
+    Args:
+        changes: The names and the new values of the changed options
+    """
+    from .plugin import plugin
+
+    if changes:
+        plugin.hooks.options_changed(dict(changes))
+
 
 def options(
     *args: str | Mapping[str, Any],
@@ -37,6 +107,8 @@ def options(
 ) -> Mapping[str, Any]:
     """Allow the user to set and examine a variety of global options
 
+    Inside `options_context()`, the options are set for the context only.
+
     Args:
         *args: Names of options to return
         **kwargs: name-value pair to create/set an option
@@ -46,9 +118,12 @@ def options(
     Returns:
         The options before updating if `_return` is `True`.
     """
+    overrides = _OVERRIDES.get()
     if not args and not kwargs and (_return is None or _return is True):
         # Make sure the options won't be changed
-        return OPTIONS.copy()
+        out = OPTIONS.copy()
+        out.update(overrides)
+        return out
 
     names = [arg.replace(".", "_") for arg in args if isinstance(arg, str)]
     pairs = {}
@@ -56,6 +131,8 @@ def options(
         if isinstance(arg, dict):
             pairs.update(_dict_transform_back(arg))
     pairs.update(_dict_transform_back(kwargs))
+    for key, val in pairs.items():
+        _check_option(key, val)
 
     out = None
     if _return is None:
@@ -64,19 +141,27 @@ def options(
     if _return:
         out = Diot(
             {
-                name: value
+                name: overrides.get(name, value)
                 for name, value in OPTIONS.items()
                 if name in names or name in pairs
             },
             diot_transform=_key_transform,
         )
 
-    for key, val in pairs.items():
-        oldval = OPTIONS[key]
-        if oldval == val:
-            continue
-        OPTIONS[key] = val
+    if _OVERRIDES.get(None) is not None:
+        # inside options_context()
+        _OVERRIDES.set({**overrides, **pairs})
+        return out
+
+    changes = {}
+    with _OPTIONS_LOCK:
+        for key, val in pairs.items():
+            oldval = OPTIONS[key]
+            if oldval == val:
+                continue
+            OPTIONS[key] = changes[key] = val
 
+    push_options(changes)
     return out
 
 
@@ -84,12 +169,21 @@ def options(
 def options_context(**kwargs: Any) -> Generator:
     """A context manager to execute code with temporary options
 
-    Note that this is not thread-safe.
+    The options are only changed for the current thread or asyncio task,
+    including the threads and tasks started with a copy of its context
+    (e.g. by `contextvars.copy_context()` or `asyncio.create_task()`).
+    They are not pushed to the backends, which should read them with
+    `get_option()` when running.
     """
-    opts = options()  # type: Mapping[str, Any]
-    options(**kwargs)
-    yield
-    options(opts)
+    kwargs = _dict_transform_back(kwargs)
+    for key, val in kwargs.items():
+        _check_option(key, val)
+
+    token = _OVERRIDES.set({**_OVERRIDES.get(), **kwargs})
+    try:
+        yield
+    finally:
+        _OVERRIDES.reset(token)
 
 
 def get_option(x: str, default: Any = None) -> Any:
@@ -100,6 +194,11 @@ def get_option(x: str, default: Any = None) -> Any:
         x: The name of the option
         default: The default value if `x` is unset
     """
+    overrides = _OVERRIDES.get()
+    if overrides:
+        key = x.replace(".", "_")
+        if key in overrides:
+            return overrides[key]
     return OPTIONS.get(x, default)
 
 
@@ -110,4 +209,5 @@ def add_option(x: str, default: Any = None) -> None:
         x: The name of the option
         default: The default value if `x` is unset
     """
-    OPTIONS.setdefault(x, default)
+    with _OPTIONS_LOCK:
+        OPTIONS.setdefault(x, default)
@@ -0,0 +1,323 @@
+"""Run a function on the groups of a frame in parallel
+
+`group_map()`, `group_modify()` and `group_walk()` run arbitrary Python
+functions on each group. With `_executor` and `_n_jobs`, the backends can
+spread the groups across a pool of threads or processes by `map_groups()`,
+which returns the results in the order of the groups, whenever they finish.
+
+For the executors other than the thread pools, e.g. the process pools,
+the numpy arrays in the arguments of the groups (including those in lists,
+tuples and dicts, e.g. the columns of a group) are passed to the workers
+through shared memory, instead of being pickled. Other objects, including
+the frames, are pickled as usual, so the backends may pass the columns and
+rebuild the frames in the workers for large groups.
+
+The groups are run serially unless `_n_jobs` or an executor instance is
+passed. The threads run with a copy of the context that submits them, so
+that `options_context()` and `use_backend()` apply to them. The processes
+don't.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from collections import deque
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from contextlib import contextmanager
+from contextvars import copy_context
+from typing import (
+    Any,
+    Callable,
+    Generator,
+    Iterable,
+    List,
+    NamedTuple,
+    Sequence,
+    Tuple,
+)
+
+from .options import get_option
+
+# The number of groups submitted ahead of the one being collected,
+# per worker. The memory for the arguments of the other groups is not used
+# until they are submitted.
+PENDING_PER_WORKER = 2
+
+
+class SharedArray(NamedTuple):
+    """A numpy array in shared memory, passed to a process worker"""
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+    strides: Tuple[int, ...]
+
+
+def _attach(name: str) -> Any:
+    """Attach to a block of shared memory, untracked if possible, so that
+    it's only unlinked by the process that created it"""
+    from multiprocessing.shared_memory import SharedMemory
+
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:  # pragma: no cover, python < 3.13
+        return SharedMemory(name=name)
+
+
+def _share(obj: Any, blocks: List) -> Any:
+    """Put the numpy arrays in obj into shared memory
+
+    The created blocks are appended to `blocks`, for the caller to release
+    them after the worker is done.
+    """
+    if isinstance(obj, tuple) and not hasattr(obj, "_fields"):
+        return tuple(_share(elem, blocks) for elem in obj)
+    if type(obj) is list:
+        return [_share(elem, blocks) for elem in obj]
+    if type(obj) is dict:
+        return {key: _share(val, blocks) for key, val in obj.items()}
+
+    np = sys.modules.get("numpy")
+    if (
+        np is None
+        or type(obj) is not np.ndarray
+        or obj.dtype.hasobject
+        or obj.nbytes == 0
+    ):
+        return obj
+
+    from multiprocessing.shared_memory import SharedMemory
+
+    block = SharedMemory(create=True, size=obj.nbytes)
+    blocks.append(block)
+    obj = np.ascontiguousarray(obj)
+    out = np.ndarray(obj.shape, dtype=obj.dtype, buffer=block.buf)
+    out[...] = obj
+    return SharedArray(block.name, obj.shape, obj.dtype.str, out.strides)
+
+
+def _unshare(obj: Any, blocks: List) -> Any:
+    """Rebuild the numpy arrays put into shared memory by `_share()`"""
+    if isinstance(obj, SharedArray):
+        import numpy as np
+
+        block = _attach(obj.name)
+        blocks.append(block)
+        return np.ndarray(
+            obj.shape,
+            dtype=np.dtype(obj.dtype),
+            buffer=block.buf,
+            strides=obj.strides,
+        )
+    if isinstance(obj, tuple) and not hasattr(obj, "_fields"):
+        return tuple(_unshare(elem, blocks) for elem in obj)
+    if type(obj) is list:
+        return [_unshare(elem, blocks) for elem in obj]
+    if type(obj) is dict:
+        return {key: _unshare(val, blocks) for key, val in obj.items()}
+    return obj
+
+
+def _release(blocks: List, unlink: bool) -> None:
+    """Close (and unlink) the blocks of shared memory"""
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:  # pragma: no cover
+            # the arrays on it are still referenced, closed when collected
+            pass
+        if unlink:
+            try:
+                block.unlink()
+            except FileNotFoundError:  # pragma: no cover
+                pass
+    blocks.clear()
+
+
+def _run_shared(
+    func: Callable,
+    group: Tuple,
+    args: Tuple,
+    kwargs: dict,
+) -> Any:
+    """Run func on a group in a process worker, with the numpy arrays
+    rebuilt from shared memory"""
+    blocks: List = []
+    try:
+        group = _unshare(group, blocks)
+        return func(*group, *args, **kwargs)
+    finally:
+        # release the views of the arrays before closing the blocks
+        group = None
+        _release(blocks, unlink=False)
+
+
+def _check_n_jobs(n_jobs: Any) -> None:
+    """Check the number of jobs"""
+    if n_jobs is not None and (
+        not isinstance(n_jobs, int) or isinstance(n_jobs, bool) or n_jobs < 1
+    ):
+        raise ValueError(
+            f"`_n_jobs` must be a positive integer or None, got {n_jobs!r}."
+        )
+
+
+def _is_thread_pool(executor: Executor) -> bool:
+    """Check if the executor runs the tasks in the threads of this
+    interpreter, which share the objects (and the context) with it"""
+    import concurrent.futures
+
+    return isinstance(executor, ThreadPoolExecutor) and not isinstance(
+        executor,
+        getattr(concurrent.futures, "InterpreterPoolExecutor", ()),
+    )
+
+
+@contextmanager
+def executor_context(
+    executor: str | Executor = None,
+    n_jobs: int = None,
+) -> Generator[Tuple[Executor | None, int], None, None]:
+    """Get the executor to run the groups with
+
+    The groups are run in parallel only when asked explicitly, since the
+    functions to run may not be thread-safe. The `n_threads` option, which
+    sizes the thread pools of the backends, is not used here.
+
+    Args:
+        executor: `"thread"`, `"process"` or a `concurrent.futures.Executor`.
+            Defaults to the `executor` option, if `n_jobs` is given.
+        n_jobs: The number of workers.
+
+    Yields:
+        The executor, or `None` to run the groups serially, when neither
+        an executor instance nor more than one worker is requested; and
+        the number of workers. The executors created here are shut down
+        on exit.
+    """
+    _check_n_jobs(n_jobs)
+    if executor is None and n_jobs is not None:
+        executor = get_option("executor")
+
+    if isinstance(executor, Executor):
+        yield executor, n_jobs or os.cpu_count() or 1
+        return
+
+    if executor not in (None, "thread", "process"):
+        raise ValueError(
+            '`_executor` must be "thread", "process" or a '
+            f"concurrent.futures.Executor, got {executor!r}."
+        )
+
+    if n_jobs is None or n_jobs == 1:
+        yield None, 1
+        return
+
+    pool_class = (
+        ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    )
+    with pool_class(n_jobs) as pool:
+        yield pool, n_jobs
+
+
+def map_groups(
+    func: Callable,
+    groups: Iterable[Sequence],
+    *args: Any,
+    _executor: str | Executor = None,
+    _n_jobs: int = None,
+    **kwargs: Any,
+) -> List[Any]:
+    """Run a function on each group, serially or in parallel
+
+    Examples:
+        >>> @group_map.register(DataFrame, backend="pandas")
+        >>> def _group_map(
+        >>>     _data, _f, *args, _keep=False, _executor=None, _n_jobs=None,
+        >>>     **kwargs,
+        >>> ):
+        >>>     chunks = group_split(_data, _keep=_keep)
+        >>>     return map_groups(
+        >>>         _f,
+        >>>         ((chunk, ) for chunk in chunks),
+        >>>         *args,
+        >>>         _executor=_executor,
+        >>>         _n_jobs=_n_jobs,
+        >>>         **kwargs,
+        >>>     )
+
+    Args:
+        func: The function, called as `func(*group, *args, **kwargs)`.
+            It must be picklable (e.g. not a lambda) for the process pools.
+        groups: The arguments for each group, as tuples,
+            e.g. `(chunk, keys)`.
+        *args: The additional arguments for `func`
+        _executor: `"thread"`, `"process"` or a `concurrent.futures.Executor`.
+            Defaults to the `executor` option, if `_n_jobs` is given. An
+            executor passed in is not shut down.
+        _n_jobs: The number of workers. The groups are run serially if it's
+            `None` or `1`, unless an executor instance is passed.
+        **kwargs: The additional keyword arguments for `func`
+
+    Returns:
+        The results, in the order of the groups
+
+    Raises:
+        ValueError: When `_executor` or `_n_jobs` is invalid
+    """
+    with executor_context(_executor, _n_jobs) as (executor, n_jobs):
+        if executor is None:
+            return [func(*group, *args, **kwargs) for group in groups]
+
+        # the other executors (e.g. processes) can't share the objects
+        process = not _is_thread_pool(executor)
+        max_pending = n_jobs * PENDING_PER_WORKER
+        pending: deque = deque()
+        results = []
+
+        def collect():
+            future, blocks = pending.popleft()
+            try:
+                results.append(future.result())
+            finally:
+                _release(blocks, unlink=True)
+
+        try:
+            for group in groups:
+                blocks: List = []
+                if process:
+                    try:
+                        future = executor.submit(
+                            _run_shared,
+                            func,
+                            _share(tuple(group), blocks),
+                            args,
+                            kwargs,
+                        )
+                    except BaseException:
+                        _release(blocks, unlink=True)
+                        raise
+                else:
+                    future = executor.submit(
+                        copy_context().run,
+                        func,
+                        *group,
+                        *args,
+                        **kwargs,
+                    )
+                pending.append((future, blocks))
+                if len(pending) > max_pending:
+                    collect()
+
+            while pending:
+                collect()
+        finally:
+            for future, blocks in pending:
+                future.cancel()
+                _release(blocks, unlink=True)
+
+        return results
@@ -0,0 +1,572 @@
+"""Logical plans for lazy pipelines, and the verbs to start and run them
+
+With `lazy(data) >> verb1(...) >> verb2(...)`, the verbs are recorded into
+a `LogicalPlan` instead of being run. `collect()` optimizes the plan and runs
+it, so that the intermediate frames that are thrown away right after can be
+avoided or made smaller.
+
+The optimizer only rewrites what it can prove from the structure of the
+expressions (see `datar.core.expr`), so the result is the same as running
+the verbs eagerly.
+"""
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any, Dict, List, Sequence, Set
+
+from pipda import VerbCall, register_verb
+from pipda.context import ContextPending
+from pipda.piping import PipeableCall, PIPING_OPS
+
+from .compiled import evaluate_exprs
+from .plugin import dispatch_last_avail
+from .routing import route
+from .expr import expr_key, expr_refs, is_elementwise, plain_name
+
+
+def _verbs():
+    """The verbs that the optimizer knows about"""
+    from ..apis import dplyr
+
+    return dplyr
+
+
+def _new_step(step: VerbCall, *args: Any, **kwargs: Any) -> VerbCall:
+    """Create a step with the same verb and backend as `step`"""
+    return VerbCall(
+        step._pipda_func,
+        *args,
+        __backend=step._pipda_backend,
+        **kwargs,
+    )
+
+
+def _options(step: VerbCall) -> Dict[str, Any]:
+    """The keyword arguments starting with `_`"""
+    return {
+        key: val for key, val in step._pipda_kwargs.items() if key[:1] == "_"
+    }
+
+
+def _named(step: VerbCall) -> Dict[str, Any]:
+    """The keyword arguments not starting with `_`"""
+    return {
+        key: val for key, val in step._pipda_kwargs.items() if key[:1] != "_"
+    }
+
+
+def _plain_names(values: Sequence[Any]) -> List[str] | None:
+    """Get the plain names of the values, None if any of them is not"""
+    names = [plain_name(val) for val in values]
+    return None if None in names else names
+
+
+def _is(step: Any, *verbs: Any) -> bool:
+    """Check if step is a call to one of the verbs"""
+    return isinstance(step, VerbCall) and step._pipda_func in verbs
+
+
+def _elementwise_filter(step: VerbCall) -> bool:
+    """Check if step is a filter with only elementwise conditions"""
+    dplyr = _verbs()
+    return (
+        _is(step, dplyr.filter_)
+        and not _named(step)
+        and all(map(is_elementwise, step._pipda_args))
+    )
+
+
+def _elementwise_mutate(step: VerbCall) -> bool:
+    """Check if step is a mutate that adds elementwise columns only"""
+    dplyr = _verbs()
+    return (
+        _is(step, dplyr.mutate)
+        and not step._pipda_args
+        and _options(step).get("_keep", "all") == "all"
+        and all(map(is_elementwise, _named(step).values()))
+    )
+
+
+def _rename_map(step: VerbCall) -> Dict[str, str] | None:
+    """Get the new => old mapping of a rename, None if not plain"""
+    named = _named(step)
+    if step._pipda_args or _options(step):
+        return None
+    olds = _plain_names(list(named.values()))
+    return None if olds is None else dict(zip(named, olds))
+
+
+# Rewrite rules
+def _merge_select_rename(steps: List[Any]) -> List[Any]:
+    """Merge consecutive selects with plain names,
+    and consecutive renames"""
+    dplyr = _verbs()
+    out = []
+    for step in steps:
+        prev = out[-1] if out else None
+        if (
+            prev is None
+            or not isinstance(step, VerbCall)
+            or not isinstance(prev, VerbCall)
+            or prev._pipda_func is not step._pipda_func
+            or prev._pipda_backend != step._pipda_backend
+        ):
+            out.append(step)
+            continue
+
+        merged = None
+        if _is(step, dplyr.select) and not (
+            prev._pipda_kwargs or step._pipda_kwargs
+        ):
+            names1 = _plain_names(prev._pipda_args)
+            names2 = _plain_names(step._pipda_args)
+            if names1 is not None and names2 is not None:
+                if set(names2) <= set(names1):
+                    merged = _new_step(step, *names2)
+
+        elif _is(step, dplyr.rename):
+            map1, map2 = _rename_map(prev), _rename_map(step)
+            if map1 is not None and map2 is not None:
+                merged = dict(map1)
+                for new, old in map2.items():
+                    if old in merged:
+                        merged[new] = merged.pop(old)
+                    elif (
+                        old in map1.values()
+                        or new in merged
+                        or new in map1.values()
+                    ):
+                        # renamed away before, or clashes, leave it
+                        merged = None
+                        break
+                    else:
+                        merged[new] = old
+                if merged is not None:
+                    merged = _new_step(step, **merged)
+
+        if merged is None:
+            out.append(step)
+        else:
+            out[-1] = merged
+    return out
+
+
+def _remove_redundant_arrange(steps: List[Any]) -> List[Any]:
+    """Remove an arrange if a later one sorts by the same leading keys
+
+    `arrange(a) >> ... >> arrange(a, b)` is the same as `... >> arrange(a, b)`,
+    as long as the steps in between don't depend on the order of the rows or
+    change the sorting columns.
+    """
+    dplyr = _verbs()
+    out = list(steps)
+    i = 0
+    while i < len(out):
+        step = out[i]
+        if not _is(step, dplyr.arrange) or _named(step):
+            i += 1
+            continue
+
+        keys = [expr_key(arg) for arg in step._pipda_args]
+        refs = expr_refs(step._pipda_args)
+        redundant = False
+        for later in out[i + 1:]:
+            if _is(later, dplyr.arrange):
+                later_keys = [expr_key(arg) for arg in later._pipda_args]
+                redundant = (
+                    None not in keys
+                    and not _named(later)
+                    and later_keys[: len(keys)] == keys
+                    and _options(later) == _options(step)
+                )
+                break
+
+            if refs is None:
+                break
+            if _elementwise_filter(later) or _is(later, dplyr.select):
+                continue
+            if _elementwise_mutate(later) and not refs & set(
+                _named(later)
+            ):
+                continue
+            rmap = _is(later, dplyr.rename) and _rename_map(later)
+            if rmap and not refs & (set(rmap) | set(rmap.values())):
+                continue
+            break
+
+        if redundant:
+            del out[i]
+        else:
+            i += 1
+    return out
+
+
+def _can_push_filter(prev: Any, flt: VerbCall) -> bool:
+    """Check if the filter can be moved before the previous step"""
+    dplyr = _verbs()
+    refs = expr_refs(flt._pipda_args)
+    if refs is None or not _elementwise_filter(flt):
+        return False
+    if _is(prev, dplyr.arrange):
+        return not _named(prev)
+    if _elementwise_mutate(prev):
+        return not refs & set(_named(prev))
+    if _is(prev, dplyr.rename):
+        rmap = _rename_map(prev)
+        return bool(rmap) and not refs & (set(rmap) | set(rmap.values()))
+    return False
+
+
+def _push_down_predicates(steps: List[Any]) -> List[Any]:
+    """Move the filters as early as possible"""
+    out = list(steps)
+    moved = True
+    while moved:
+        moved = False
+        for i in range(1, len(out)):
+            if _can_push_filter(out[i - 1], out[i]):
+                out[i - 1], out[i] = out[i], out[i - 1]
+                moved = True
+    return out
+
+
+def _merge_filters(steps: List[Any]) -> List[Any]:
+    """Merge consecutive elementwise filters into one"""
+    out = []
+    for step in steps:
+        prev = out[-1] if out else None
+        if (
+            prev is not None
+            and _elementwise_filter(prev)
+            and _elementwise_filter(step)
+            and prev._pipda_backend == step._pipda_backend
+            and _options(prev) == _options(step)
+        ):
+            out[-1] = _new_step(
+                step,
+                *prev._pipda_args,
+                *step._pipda_args,
+                **_options(step),
+            )
+        else:
+            out.append(step)
+    return out
+
+
+def _prune_projections(steps: List[Any]) -> List[Any]:
+    """Drop the columns that are not used by the steps after them
+
+    Walks the steps backwards keeping the set of the columns that are
+    needed, which is known after a `select` or a `summarise` with plain
+    names. The assignments of `mutate` that are not needed are dropped, and
+    if the columns needed from the data are known, only those are selected
+    at the beginning.
+    """
+    dplyr = _verbs()
+    needed = None  # type: Set[str] | None
+    out = []
+    for step in reversed(steps):
+        if not isinstance(step, VerbCall):
+            needed = None
+
+        elif _is(step, dplyr.select):
+            names = _plain_names(
+                [*step._pipda_args, *step._pipda_kwargs.values()]
+            )
+            needed = None if names is None else set(names)
+
+        elif _is(step, dplyr.summarise, dplyr.mutate):
+            is_mutate = _is(step, dplyr.mutate)
+            options = _options(step)
+            if step._pipda_args or (
+                is_mutate and options.get("_keep", "all") != "all"
+            ):
+                needed = None
+                out.append(step)
+                continue
+
+            named = _named(step)
+            # what summarise produces is all that is there after it
+            after = set(named) if not is_mutate else needed
+            kept = {}
+            for name, value in reversed(named.items()):
+                if after is not None and name not in after:
+                    continue
+                kept[name] = value
+                if after is not None:
+                    refs = expr_refs(value)
+                    after = None if refs is None else (after - {name}) | refs
+            kept = dict(reversed(kept.items()))
+
+            if is_mutate:
+                position = _plain_names(
+                    [
+                        options[key]
+                        for key in ("_before", "_after")
+                        if options.get(key) is not None
+                    ]
+                )
+                after = _union_refs(after, position)
+                if not kept:
+                    needed = after
+                    continue
+                step = _new_step(step, **kept, **options)
+            needed = after
+
+        elif _is(step, dplyr.filter_, dplyr.arrange):
+            if _named(step):
+                needed = None
+            else:
+                needed = _union_refs(needed, expr_refs(step._pipda_args))
+
+        elif _is(step, dplyr.rename):
+            rmap = _rename_map(step)
+            if rmap is None or needed is None:
+                needed = None
+            else:
+                needed = {rmap.get(name, name) for name in needed}
+
+        elif _is(step, dplyr.group_by):
+            names = _plain_names(step._pipda_args)
+            needed = (
+                None if _named(step) or names is None
+                else _union_refs(needed, set(names))
+            )
+
+        elif _is(step, dplyr.ungroup):
+            if step._pipda_args:
+                needed = None
+
+        else:
+            needed = None
+
+        out.append(step)
+
+    out.reverse()
+    if needed and out and not (
+        _is(out[0], dplyr.select)
+        and set(_plain_names(out[0]._pipda_args) or ()) == needed
+        and not out[0]._pipda_kwargs
+    ):
+        out.insert(
+            0,
+            VerbCall(
+                dplyr.select,
+                *sorted(needed),
+                __backend=getattr(out[0], "_pipda_backend", None),
+            ),
+        )
+    return out
+
+
+def _union_refs(*refs: Any) -> Set[str] | None:
+    """Union the sets of names, None if any is None"""
+    out = set()
+    for ref in refs:
+        if ref is None:
+            return None
+        out |= set(ref)
+    return out
+
+
+OPTIMIZERS = (
+    _merge_select_rename,
+    _remove_redundant_arrange,
+    _push_down_predicates,
+    _merge_filters,
+    _prune_projections,
+)
+
+
+def _evaluate_step(step: Any, data: Any) -> Any:
+    """Run a step, like `step._pipda_eval(data)`, but evaluate the arguments
+    with the compiled expressions, and the identical subexpressions once"""
+    if not isinstance(step, VerbCall):
+        return step._pipda_eval(data)
+
+    verb = step._pipda_func
+    func = verb.dispatch(data.__class__, backend=step._pipda_backend)
+    context, kw_context = verb.get_context(func, None)
+    kw_context = kw_context or {}
+    if isinstance(context, Enum):
+        context = context.value
+    if isinstance(context, ContextPending):
+        return func(data, *step._pipda_args, **step._pipda_kwargs)
+
+    nargs = len(step._pipda_args)
+    values = evaluate_exprs(
+        [*step._pipda_args, *step._pipda_kwargs.values()],
+        data,
+        [context] * nargs
+        + [kw_context.get(key, context) for key in step._pipda_kwargs],
+    )
+    return func(
+        data,
+        *values[:nargs],
+        **dict(zip(step._pipda_kwargs, values[nargs:])),
+    )
+
+
+class LogicalPlan:
+    """The data and the verbs to run on it
+
+    Args:
+        data: The data to run the verbs on
+        steps: The verb calls (pipda `VerbCall` objects), in order
+    """
+
+    def __init__(self, data: Any, steps: Sequence[PipeableCall] = ()):
+        self.data = data
+        self.steps = tuple(steps)
+
+    def optimize(self) -> LogicalPlan:
+        """Get an optimized plan that gives the same result"""
+        steps = list(self.steps)
+        for optimizer in OPTIMIZERS:
+            steps = optimizer(steps)
+        return LogicalPlan(self.data, steps)
+
+    def execute(self) -> Any:
+        """Run the plan
+
+        The backends can run the whole plan with the `execute_plan()` hook.
+        When none of them does, the verbs are run one by one. If all the
+        verbs are bound to the same backend (by `__backend`), only that
+        backend is asked.
+        """
+        if not self.steps:
+            return self.data
+
+        backends = {step._pipda_backend for step in self.steps}
+        out = dispatch_last_avail(
+            "execute_plan",
+            self,
+            __plugin=backends.pop() if len(backends) == 1 else None,
+        )
+        if out is not None:
+            return out
+
+        return self.execute_verbs()
+
+    def execute_verbs(self) -> Any:
+        """Run the verbs one by one
+
+        The verbs not bound to a backend are routed to the one with the
+        lowest estimated cost for the data passed to them, including the
+        cost to convert the data to its frame, if the backends tell (see
+        `datar.core.routing`).
+        """
+        data = self.data
+        for step in self.steps:
+            if isinstance(step, VerbCall) and step._pipda_backend is None:
+                backend, data = route(step._pipda_func, data)
+                if backend is not None:
+                    step = VerbCall(
+                        step._pipda_func,
+                        *step._pipda_args,
+                        __backend=backend,
+                        **step._pipda_kwargs,
+                    )
+            data = _evaluate_step(step, data)
+        return data
+
+    def __str__(self) -> str:
+        lines = [f"LogicalPlan({type(self.data).__name__})"]
+        lines.extend(f"  >> {step}" for step in self.steps)
+        return "\n".join(lines)
+
+
+class LazyFrame:
+    """Records the verbs piped into it, instead of running them
+
+    Use `datar.dplyr.lazy()` to create one and `datar.dplyr.collect()` to
+    run the verbs.
+
+    Args:
+        plan: The logical plan
+    """
+
+    def __init__(self, plan: LogicalPlan) -> None:
+        self.plan = plan
+
+    def explain(self, optimize: bool = True) -> str:
+        """Show the plan to run
+
+        Args:
+            optimize: Whether to show the optimized plan
+        """
+        return str(self.plan.optimize() if optimize else self.plan)
+
+    def collect(self) -> Any:
+        """Optimize the plan and run it"""
+        return self.plan.optimize().execute()
+
+    def _pipda_pipe(self, call: Any) -> Any:
+        """Record the verb call, or run the plan with collect()"""
+        if not isinstance(call, VerbCall):
+            return NotImplemented
+
+        if call._pipda_func is collect:
+            return self.collect()
+
+        return LazyFrame(
+            LogicalPlan(self.plan.data, (*self.plan.steps, call))
+        )
+
+    def __repr__(self) -> str:
+        return f"<LazyFrame: {len(self.plan.steps)} step(s) recorded>"
+
+
+def _make_piping_method(op: str):
+    """Make the method for the piping operator `op`"""
+
+    def method(self, call):
+        if PipeableCall.PIPING != op:
+            return NotImplemented
+        return self._pipda_pipe(call)
+
+    return method
+
+
+# The piping operator can be changed by `pipda.register_piping()`
+for _op, (_rmethod, _, _) in PIPING_OPS.items():
+    setattr(LazyFrame, _rmethod.replace("__r", "__"), _make_piping_method(_op))
+
+
+@register_verb()
+def lazy(_data) -> Any:
+    """Start a lazy pipeline
+
+    The verbs piped after it are recorded instead of being run, until
+    `collect()` is piped. Then the recorded verbs are optimized as a whole
+    and run. For example, filters are moved before the mutates and arranges
+    that they don't depend on, and the columns that are not used are
+    dropped at the beginning.
+
+    >>> lazy(df) >> mutate(z=f.x + 1) >> filter_(f.y > 0) >> collect()
+    >>> # runs as
+    >>> df >> filter_(f.y > 0) >> mutate(z=f.x + 1)
+
+    Args:
+        _data: The data frame
+
+    Returns:
+        A lazy frame that records the verbs piped into it.
+        Use `.explain()` to see the optimized plan.
+    """
+    return LazyFrame(LogicalPlan(_data))
+
+
+@register_verb()
+def collect(_data) -> Any:
+    """Run the verbs recorded by `lazy()`
+
+    Args:
+        _data: The lazy frame. Other data is returned as is.
+
+    Returns:
+        The result of the optimized pipeline
+    """
+    if isinstance(_data, LazyFrame):
+        return _data.collect()
+    return _data
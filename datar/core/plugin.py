@@ -1,9 +1,82 @@
-"""Plugin system to support different backends"""
+"""Plugin system to support different backends
+
+The resolved implementations are cached and read without locking. Resolving
+on a cache miss, registering, enabling or disabling plugins, and clearing
+the cache are serialized by `_REGISTRY_LOCK`, so that a resolution made
+against an outdated registry is never cached.
+"""
+import threading
+import warnings
 from typing import Any, List, Mapping, Tuple, Callable
 
-from simplug import Simplug, SimplugResult, makecall
+from simplug import (
+    Simplug,
+    SimplugResult,
+    SimplugWrapper,
+    MultipleImplsForSingleResultHookWarning,
+    ResultError,
+    ResultUnavailableError,
+    makecall,
+)
+
+
+class _DispatchCache(dict):
+    """Resolved implementations of single-result hooks
+
+    Keyed by a tuple led by the hook name and the requested backend, for
+    example `(hook, backend)` maps to `(plugin wrapper, implementation,
+    multiple)`, or `None` if no implementation is available. `registry` is
+    the plugin registry that the resolutions were made against.
+    """
+
+    registry = None
+
+    def clear(self) -> None:
+        with _REGISTRY_LOCK:
+            super().clear()
+
+
+_REGISTRY_LOCK = threading.RLock()
+_DISPATCH_CACHE = _DispatchCache()
+
+
+class _PluginWrapper(SimplugWrapper):
+    """Plugin wrapper that invalidates the dispatch cache
+    when the plugin is enabled or disabled"""
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        with _REGISTRY_LOCK:
+            self._enabled = value
+            _DISPATCH_CACHE.clear()
+
+
+class _Simplug(Simplug):
+    """Simplug that invalidates the dispatch cache
+    when plugins are registered"""
+
+    def register(self, *plugins: Any) -> Any:
+        with _REGISTRY_LOCK:
+            for i, plg in enumerate(plugins):
+                self.hooks._register(
+                    _PluginWrapper(plg, self._batch_index, i)
+                )
+
+            self._batch_index += 1
+            _DISPATCH_CACHE.clear()
+
+        if len(plugins) == 1 and callable(plugins[0]):
+            # allow to use as a decorator
+            return plugins[0]
 
-plugin = Simplug("datar")
+        return None
+
+
+plugin = _Simplug("datar")
 
 
 def _collect(calls: List[Tuple[Callable, Tuple, Mapping]]) -> Mapping[str, Any]:
@@ -21,6 +94,13 @@ def setup():
     """Initialize the backend"""
 
 
+@plugin.spec
+def options_changed(changes: Mapping[str, Any]):
+    """Apply the changed options, e.g. `n_threads`, `chunk_size` and
+    `executor`. Called once after `setup()` with the current values of
+    them, and whenever options are changed globally."""
+
+
 @plugin.spec(result=_collect)
 def get_versions():
     """Return the versions of the dependencies of the plugin."""
@@ -31,6 +111,20 @@ def load_dataset(name: str, metadata: Mapping):
     """Implementations for load_dataset()"""
 
 
+@plugin.spec(result=SimplugResult.TRY_SINGLE)
+def load_dataset_chunks(name: str, metadata: Mapping, chunksize: int):
+    """Load a dataset as an iterable of frames with at most chunksize rows"""
+
+
+@plugin.spec(result=SimplugResult.TRY_LAST_AVAIL)
+def copy_dataset(data: Any):
+    """Copy a cached dataset for a caller, ideally copy-on-write.
+
+    Return None to leave it to the other backends or
+    `data.copy(deep=False)`.
+    """
+
+
 @plugin.spec(result=_collect)
 def base_api():
     """What is implemented the base APIs."""
@@ -61,6 +155,45 @@ def misc_api():
     """What is implemented the misc APIs."""
 
 
+@plugin.spec(result=SimplugResult.TRY_LAST_AVAIL)
+def execute_plan(plan: Any):
+    """Execute a whole logical plan (`datar.core.plan.LogicalPlan`) natively.
+
+    Return None to leave it to the other backends, or to be run verb by verb.
+    """
+
+
+@plugin.spec(result=SimplugResult.ALL_AVAILS)
+def verb_cost(verb: Callable, data: Any):
+    """Estimate the cost of running the verb on the data with the backend.
+
+    Only the relative values matter, for example, the expected seconds.
+    Return None if the backend can't tell. Used to route the verbs in lazy
+    pipelines when more than one backend can run them. If the data is not
+    of the backend but can be converted (see `convert_data()`), estimate
+    the cost of running the verb on the converted data.
+    """
+
+
+@plugin.spec(result=SimplugResult.TRY_LAST_AVAIL)
+def convert_cost(data: Any):
+    """Estimate the cost of converting the data of another backend to the
+    frame of this backend, in the same unit as `verb_cost()`.
+
+    Only asked of the backend to convert to. Return None if the data can't
+    be converted.
+    """
+
+
+@plugin.spec(result=SimplugResult.TRY_LAST_AVAIL)
+def convert_data(data: Any):
+    """Convert the data of another backend to the frame of this backend.
+
+    Only asked of the backend to convert to. Return None if the data can't
+    be converted.
+    """
+
+
 @plugin.spec(result=SimplugResult.SINGLE)
 def c_getitem(item):
     """Get item for c"""
@@ -69,3 +202,138 @@ def c_getitem(item):
 @plugin.spec(result=SimplugResult.SINGLE)
 def operate(op: str, x: Any, y: Any = None):
     """Operate on x and y"""
+
+
+def _resolve_all(hook: str, backend: str) -> List[Tuple]:
+    """Get the implementations of a hook from the enabled plugins,
+    in the order of the plugins, or only that of the requested backend"""
+    plugin.hooks._sort_registry()
+    impls = []
+    for plg in plugin.hooks._registry.values():
+        if not plg.enabled:
+            continue
+        impl = plg.hook(hook)
+        if impl is not None:
+            impls.append((plg, impl))
+
+    if backend is None:
+        return impls
+    return [(plg, impl) for plg, impl in impls if plg.name == backend][:1]
+
+
+def _resolve(hook: str, backend: str) -> Tuple:
+    """Resolve the implementation of a single-result hook,
+    the same way as simplug does"""
+    impls = _resolve_all(hook, backend)
+    if not impls:
+        return None
+
+    plg, impl = impls[-1]
+    return plg, impl, len(impls) > 1
+
+
+def resolve_cached(key: Tuple, resolver: Callable, *args: Any) -> Any:
+    """Get the resolution from the dispatch cache,
+    or resolve it with `resolver(*args)` and cache it
+
+    Args:
+        key: The key of the resolution, led by the hook name and
+            the requested backend
+        resolver: The function to resolve it on a cache miss
+        *args: The arguments for the resolver
+
+    Returns:
+        The cached or the fresh resolution
+    """
+    registry = plugin.hooks._registry
+    if _DISPATCH_CACHE.registry is registry:
+        try:
+            return _DISPATCH_CACHE[key]
+        except KeyError:
+            pass
+
+    with _REGISTRY_LOCK:
+        if _DISPATCH_CACHE.registry is not plugin.hooks._registry:
+            # registry is replaced when exiting plugin.plugins_context()
+            _DISPATCH_CACHE.clear()
+            _DISPATCH_CACHE.registry = plugin.hooks._registry
+
+        try:
+            return _DISPATCH_CACHE[key]
+        except KeyError:
+            resolved = _DISPATCH_CACHE[key] = resolver(*args)
+            return resolved
+
+
+def dispatch(hook: str, *args: Any, __plugin: str = None) -> Any:
+    """Call a single-result hook with its implementation resolved once
+
+    Equivalent to `plugin.hooks.<hook>(*args, __plugin=...)`, but the
+    implementation is looked up from a cache keyed by the hook name and the
+    requested backend. The cache is invalidated whenever a plugin is
+    registered, enabled or disabled.
+
+    Args:
+        hook: The name of the hook
+        *args: The arguments for the hook
+        __plugin: The backend to use
+
+    Returns:
+        The result from the implementation
+    """
+    resolved = resolve_cached((hook, __plugin), _resolve, hook, __plugin)
+    if resolved is None:
+        if plugin.hooks._specs[hook].result is SimplugResult.TRY_SINGLE:
+            return None
+        raise ResultUnavailableError
+
+    plg, impl, multiple = resolved
+    if multiple:
+        warnings.warn(
+            f"More than one implementation of {hook} found, "
+            "but a single result is expected. Using the last one.",
+            MultipleImplsForSingleResultHookWarning,
+        )
+    return _call(hook, plg, impl, args)
+
+
+def dispatch_last_avail(hook: str, *args: Any, __plugin: str = None) -> Any:
+    """Call the implementations of a hook, from the last plugin to the first,
+    until one returns a result that is not None
+
+    Unlike `plugin.hooks.<hook>(...)`, `__plugin` is allowed to select the
+    backend. The implementations are cached the same way as `dispatch()`.
+
+    Args:
+        hook: The name of the hook
+        *args: The arguments for the hook
+        __plugin: The backend to use
+
+    Returns:
+        The first result that is not None, or None
+    """
+    impls = resolve_cached(
+        (hook, "__all__", __plugin),
+        _resolve_all,
+        hook,
+        __plugin,
+    )
+    for plg, impl in reversed(impls):
+        out = _call(hook, plg, impl, args)
+        if out is not None:
+            return out
+    return None
+
+
+def _call(hook: str, plg: Any, impl: Any, args: Tuple) -> Any:
+    """Call a hook implementation the way simplug does"""
+    if impl.has_self:
+        args = plugin.hooks._specs[hook]._prepare_plugin_args(plg, impl, args)
+
+    try:
+        return impl.impl(*args)
+    except Exception as exc:
+        raise ResultError(
+            "Error while calling hook implementation, "
+            f"plugin={plg.name}; spec={impl.impl.__name__}"
+        ) from exc
@@ -0,0 +1,120 @@
+"""Route the verbs in lazy pipelines to the backends by the estimated costs
+
+When more than one backend implements a verb for the type of the data,
+pipda uses the last one, unless `__backend` is given. In the lazy pipelines
+(`lazy(data) >> ... >> collect()`, see `datar.core.plan`), the backends can
+implement the `verb_cost()` hook to estimate the cost of a call with the
+data at hand (e.g. from the number of rows), so that the one with the
+lowest cost is used.
+
+The eager verb calls (`data >> verb(...)`) are not routed. They are
+dispatched by pipda by the type of the data only, before the data is
+available to estimate the costs or to convert.
+
+A backend that doesn't implement the verb for the type of the data can
+still be chosen, if it can convert the data to its own frame, with the
+`convert_cost()` and `convert_data()` hooks. The cost of the conversion is
+added to its cost of the verb, so that the data is only converted when it
+pays off.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Tuple
+
+from .options import get_option
+from .plugin import _call, _resolve_all, dispatch_last_avail, resolve_cached
+
+
+def _implemented_by(verb: Callable, cls: type, backend: str) -> bool:
+    """Check if the backend has an implementation of the verb for cls"""
+    registry = getattr(verb, "registry", {}).get(backend)
+    if registry is None:
+        return False
+    return registry.dispatch(cls) is not registry.dispatch(object)
+
+
+def _routes(verb: Callable, data: Any) -> list:
+    """The backends that can run the verb, with the estimated costs
+    (including the conversions), and whether to convert the data first"""
+    impls = resolve_cached(
+        ("verb_cost", "__all__", None),
+        _resolve_all,
+        "verb_cost",
+        None,
+    )
+    if len(impls) < 2:
+        return []
+
+    routes = []
+    for plg, impl in impls:
+        convert = not _implemented_by(verb, data.__class__, plg.name)
+        if convert and getattr(verb, "registry", {}).get(plg.name) is None:
+            # the backend doesn't implement the verb at all
+            continue
+        convert_cost = 0
+        if convert:
+            convert_cost = dispatch_last_avail(
+                "convert_cost",
+                data,
+                __plugin=plg.name,
+            )
+            if convert_cost is None:
+                continue
+        cost = _call("verb_cost", plg, impl, (verb, data))
+        if cost is not None:
+            routes.append((cost + convert_cost, plg.name, convert))
+    return routes
+
+
+def route_backend(verb: Callable, data: Any) -> str | None:
+    """Get the backend with the lowest estimated cost to run the verb,
+    including the cost to convert the data to its frame if needed
+
+    Args:
+        verb: The verb, e.g. `datar.apis.dplyr.mutate`
+        data: The data to run the verb on
+
+    Returns:
+        The name of the backend, or None to leave it to pipda, when routing
+        is disabled by option `lazy_routing`, or less than two backends
+        can run the verb with an estimated cost.
+    """
+    return route(verb, data, convert=False)[0]
+
+
+def route(
+    verb: Callable,
+    data: Any,
+    convert: bool = True,
+) -> Tuple[str | None, Any]:
+    """Route the verb to the backend with the lowest estimated cost, and
+    convert the data to its frame if needed
+
+    Args:
+        verb: The verb, e.g. `datar.apis.dplyr.mutate`
+        data: The data to run the verb on
+        convert: Whether to convert the data
+
+    Returns:
+        The name of the backend (None to leave it to pipda, see
+        `route_backend()`), and the data to run the verb on, converted by
+        the `convert_data()` hook of the backend if it doesn't implement
+        the verb for the data. If the conversion fails, the verb is left
+        to pipda with the original data.
+    """
+    if not get_option("lazy_routing"):
+        return None, data
+
+    routes = _routes(verb, data)
+    if len(routes) < 2:
+        return None, data
+
+    # the last backend wins on a tie, as pipda does
+    _, backend, need_convert = min(reversed(routes), key=lambda r: r[0])
+    if not need_convert or not convert:
+        return backend, data
+
+    converted = dispatch_last_avail("convert_data", data, __plugin=backend)
+    if converted is None:
+        return None, data
+    return backend, converted
@@ -0,0 +1,336 @@
+"""Index of the column names, for the tidyselect helpers
+
+Scanning every column name for each `starts_with()`, `ends_with()`,
+`contains()`, `matches()`, `all_of()` or `any_of()` is slow for wide frames,
+especially when the selectors are evaluated repeatedly, e.g. with
+`across()`. The backends can get a `ColumnIndex` of the columns with
+`column_index()`, which is cached and reused across the selectors (and
+`num_range()`):
+
+- the positions of the names are hashed, for `all_of()` and `any_of()`
+- the names and the reversed names are sorted, so that the prefixes and the
+  suffixes are found by bisection
+- the compiled regular expressions are cached
+- the results of the selectors are cached in the index
+"""
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# Number of the column indexes cached
+COLUMN_INDEX_CACHE_SIZE = 64
+# Number of the results of the selectors cached for each index
+SELECTOR_CACHE_SIZE = 256
+# Number of the compiled regular expressions cached
+REGEX_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_regex(pattern: str, ignore_case: bool = False) -> re.Pattern:
+    """Compile a regular expression, cached
+
+    Args:
+        pattern: The regular expression
+        ignore_case: Whether to ignore case when matching
+
+    Returns:
+        The compiled regular expression
+    """
+    return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+
+def _sorted_with_positions(names: Sequence[str]) -> Tuple[List, List]:
+    """Sort the names, with their positions"""
+    pairs = sorted(zip(names, range(len(names))))
+    return [name for name, _ in pairs], [pos for _, pos in pairs]
+
+
+def _prefixed(keys: List[str], positions: List[int], prefix: str) -> List[int]:
+    """Find the positions of the keys starting with prefix, by bisection"""
+    start = bisect_left(keys, prefix)
+    end = start
+    while end < len(keys) and keys[end].startswith(prefix):
+        end += 1
+    return positions[start:end]
+
+
+class ColumnIndex:
+    """An index of the column names
+
+    Args:
+        columns: The column names
+    """
+
+    def __init__(self, columns: Sequence[str]) -> None:
+        self.columns = tuple(columns)
+        self.positions: Dict[str, int] = {}
+        for i, name in enumerate(self.columns):
+            self.positions.setdefault(name, i)
+        self._sorted: Dict[Tuple[str, bool], Tuple[List, List]] = {}
+        self._results: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def _keys(self, kind: str, ignore_case: bool) -> Tuple[List, List]:
+        """The sorted names (kind `prefix`) or reversed names (`suffix`)"""
+        key = (kind, ignore_case)
+        out = self._sorted.get(key)
+        if out is None:
+            names = [str(name) for name in self.columns]
+            if ignore_case:
+                names = [name.lower() for name in names]
+            if kind == "suffix":
+                names = [name[::-1] for name in names]
+            out = self._sorted[key] = _sorted_with_positions(names)
+        return out
+
+    def _cached(self, key: Tuple, compute: Callable[[], List[str]]) -> List:
+        """Get the result of a selector from the cache, or compute it"""
+        with self._lock:
+            out = self._results.get(key)
+            if out is not None:
+                self._results.move_to_end(key)
+                return list(out)
+
+        out = tuple(compute())
+        with self._lock:
+            self._results[key] = out
+            if len(self._results) > SELECTOR_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return list(out)
+
+    def _filter(
+        self,
+        kind: str,
+        match: str | Sequence[str],
+        ignore_case: bool,
+        find: Callable[[str], List[int]],
+    ) -> List[str]:
+        """Select the columns matching any of the matches, in the order of
+        the matches, and then of the columns"""
+        if isinstance(match, str):
+            match = [match]
+
+        def compute():
+            selected: Dict[int, None] = {}
+            for mat in match:
+                for pos in sorted(find(mat)):
+                    selected.setdefault(pos)
+            return [self.columns[pos] for pos in selected]
+
+        return self._cached((kind, tuple(match), ignore_case), compute)
+
+    def starts_with(
+        self,
+        match: str | Sequence[str],
+        ignore_case: bool = True,
+    ) -> List[str]:
+        """Select the columns starting with any of the matches
+
+        Args:
+            match: The prefix, or the prefixes
+            ignore_case: Whether to ignore case when matching
+
+        Returns:
+            The selected column names
+        """
+        keys, positions = self._keys("prefix", ignore_case)
+        return self._filter(
+            "starts_with",
+            match,
+            ignore_case,
+            lambda mat: _prefixed(
+                keys,
+                positions,
+                mat.lower() if ignore_case else mat,
+            ),
+        )
+
+    def ends_with(
+        self,
+        match: str | Sequence[str],
+        ignore_case: bool = True,
+    ) -> List[str]:
+        """Select the columns ending with any of the matches
+
+        Args:
+            match: The suffix, or the suffixes
+            ignore_case: Whether to ignore case when matching
+
+        Returns:
+            The selected column names
+        """
+        keys, positions = self._keys("suffix", ignore_case)
+        return self._filter(
+            "ends_with",
+            match,
+            ignore_case,
+            lambda mat: _prefixed(
+                keys,
+                positions,
+                (mat.lower() if ignore_case else mat)[::-1],
+            ),
+        )
+
+    def contains(
+        self,
+        match: str | Sequence[str],
+        ignore_case: bool = True,
+    ) -> List[str]:
+        """Select the columns containing any of the matches
+
+        Args:
+            match: The substring, or the substrings
+            ignore_case: Whether to ignore case when matching
+
+        Returns:
+            The selected column names
+        """
+
+        def find(mat):
+            if ignore_case:
+                mat = mat.lower()
+                return [
+                    i for i, name in enumerate(self.columns)
+                    if mat in str(name).lower()
+                ]
+            return [
+                i for i, name in enumerate(self.columns) if mat in str(name)
+            ]
+
+        return self._filter("contains", match, ignore_case, find)
+
+    def matches(
+        self,
+        match: str | Sequence[str],
+        ignore_case: bool = True,
+    ) -> List[str]:
+        """Select the columns matching any of the regular expressions
+
+        Args:
+            match: The regular expression, or the regular expressions
+            ignore_case: Whether to ignore case when matching
+
+        Returns:
+            The selected column names
+        """
+
+        def find(mat):
+            search = compile_regex(mat, ignore_case).search
+            return [
+                i for i, name in enumerate(self.columns) if search(str(name))
+            ]
+
+        return self._filter("matches", match, ignore_case, find)
+
+    def num_range(
+        self,
+        prefix: str,
+        range_: Sequence[int],
+        width: int = None,
+    ) -> List[str]:
+        """Select the columns named by the prefix and the numbers,
+        like `x01`, `x02` and `x03`
+
+        Args:
+            prefix: The prefix
+            range_: The numbers
+            width: The width to pad the numbers to with zeros
+
+        Returns:
+            The existing columns, in the order of the numbers
+        """
+        fmt = "{}" if width is None else f"{{:0{width}d}}"
+        return self.select(
+            [f"{prefix}{fmt.format(num)}" for num in range_],
+            strict=False,
+        )
+
+    def select(self, names: Sequence[str], strict: bool = True) -> List[str]:
+        """Select the columns by names, for `all_of()` and `any_of()`
+
+        Args:
+            names: The names of the columns
+            strict: Whether to raise an error for the missing columns
+
+        Returns:
+            The selected column names, in the order of `names`
+
+        Raises:
+            KeyError: When any of the names doesn't exist and `strict`
+        """
+        if isinstance(names, str):
+            names = [names]
+        missing = [name for name in names if name not in self.positions]
+        if missing and strict:
+            raise KeyError(f"Columns `{missing}` do not exist.")
+        return [name for name in names if name in self.positions]
+
+    def locate(self, names: Sequence[str]) -> List[int]:
+        """Get the positions of the columns, -1 for the missing ones
+
+        Args:
+            names: The names of the columns
+
+        Returns:
+            The positions of the columns
+        """
+        return [self.positions.get(name, -1) for name in names]
+
+
+_INDEXES: OrderedDict = OrderedDict()
+_INDEXES_LOCK = threading.Lock()
+
+
+def _immutable(columns: Sequence[str]) -> bool:
+    """Check if the container of the names can't be modified in place"""
+    if isinstance(columns, tuple):
+        return True
+    cls = type(columns)
+    return cls.__module__.startswith("pandas.") and any(
+        base.__name__ == "Index" for base in cls.__mro__
+    )
+
+
+def column_index(columns: Sequence[str]) -> ColumnIndex:
+    """Get the index of the columns, cached
+
+    The immutable containers of the names (`tuple` and `pandas.Index`) are
+    cached by identity, so that the index of the columns of a frame is
+    found in constant time. The others (e.g. lists or numpy arrays, which
+    could be modified in place) are cached by their values.
+
+    Args:
+        columns: The column names
+
+    Returns:
+        The index of the columns
+    """
+    key: Any
+    if _immutable(columns):
+        key = id(columns)
+    else:
+        key = tuple(columns)
+
+    with _INDEXES_LOCK:
+        entry = _INDEXES.get(key)
+        if entry is not None and (
+            isinstance(key, tuple) or entry[0] is columns
+        ):
+            _INDEXES.move_to_end(key)
+            return entry[1]
+
+    index = ColumnIndex(columns)
+    with _INDEXES_LOCK:
+        # keep a reference to columns, so that its id is not reused
+        _INDEXES[key] = (columns, index)
+        if len(_INDEXES) > COLUMN_INDEX_CACHE_SIZE:
+            _INDEXES.popitem(last=False)
+    return index
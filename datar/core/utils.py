@@ -4,7 +4,8 @@ import logging
 from typing import Any, Callable
 from contextlib import contextmanager
 
-from .plugin import plugin
+from .backends import current_backend, use_backend
+from .plugin import plugin, dispatch
 
 # logger
 logger = logging.getLogger("datar")
@@ -47,15 +48,17 @@ class CollectionFunction:
 
     @contextmanager
     def with_backend(self, backend: str):
-        """Set the backend for c[]"""
-        _backend = self.backend
-        self.backend = backend
-        yield
-        self.backend = _backend
+        """Set the backend for c[] in the current context"""
+        with use_backend(backend, "c"):
+            yield
 
     def __getitem__(self, item):
         """Allow c[1:3] to be interpreted as 1:3"""
-        return plugin.hooks.c_getitem(item, __plugin=self.backend)
+        return dispatch(
+            "c_getitem",
+            item,
+            __plugin=current_backend("c", self.backend),
+        )
 
 
 def arg_match(arg, argname, values, errmsg=None):
@@ -1,9 +1,17 @@
 """Collects datasets from R-datasets, dplyr and tidyr packages"""
 import functools
-from typing import Any, List
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator, List
 
-from ..core.load_plugins import plugin
+from ..core import load_plugins as _  # noqa: F401
+from ..core.plugin import dispatch
+from ..core.options import get_option
 from .metadata import Metadata, metadata
+from .store import DatasetStore
+from .synthetic import synthesize
+
+_store = DatasetStore(lambda: get_option("dataset_memory_limit"))
 
 
 # Should never do `from datar.data import *`
@@ -33,10 +41,38 @@ def add_dataset(name: str, meta: Metadata):
     metadata[name] = meta
 
 
-@functools.lru_cache()
-def load_dataset(name: str, __backend: str = None) -> Any:
-    """Load the specific dataset"""
-    loaded = plugin.hooks.load_dataset(name, metadata, __plugin=__backend)
+def _load_cached(name: str, backend: str = None) -> Any:
+    """Construct the dataset by the backend from the columnar cache
+    (see `datar.data.cache`), or None if it can't be"""
+    source = getattr(metadata.get(name), "source", None)
+    if (
+        not get_option("dataset_cache")
+        or not source
+        or not Path(source).is_file()
+    ):
+        return None
+
+    try:
+        from .cache import _factors, _to_frame, load_columns
+    except ImportError:  # pragma: no cover, numpy not installed
+        return None
+
+    data = load_columns(name, metadata)
+    try:
+        return _to_frame(data, _factors(metadata[name].schema, data), backend)
+    except NotImplementedError:
+        # the backend doesn't implement the APIs to construct the frames
+        return None
+
+
+def _load_dataset(name: str, backend: str = None) -> Any:
+    """Load the dataset by the backend, from the columnar cache if possible,
+    otherwise by the `load_dataset()` hook"""
+    loaded = _load_cached(name, backend)
+    if loaded is not None:
+        return loaded
+
+    loaded = dispatch("load_dataset", name, metadata, __plugin=backend)
     if loaded is None:
         from ..core.utils import NotImplementedByCurrentBackendError
         raise NotImplementedByCurrentBackendError(f"loading dataset '{name}'")
@@ -44,6 +80,130 @@ def load_dataset(name: str, __backend: str = None) -> Any:
     return loaded
 
 
+def _slice_rows(data: Any, start: int, stop: int) -> Any:
+    """Get the rows of data from start to stop"""
+    iloc = getattr(data, "iloc", None)
+    if iloc is not None:
+        # pandas
+        return iloc[start:stop]
+    if hasattr(data, "slice") and hasattr(data, "num_rows"):
+        # pyarrow
+        return data.slice(start, stop - start)
+    return data[start:stop]
+
+
+def _iter_chunks(name: str, backend: str, chunksize: int) -> Iterator:
+    """Load the dataset in chunks"""
+    chunks = dispatch(
+        "load_dataset_chunks",
+        name,
+        metadata,
+        chunksize,
+        __plugin=backend,
+    )
+    if chunks is not None:
+        yield from chunks
+        return
+
+    # The backend can't load it in chunks
+    data = load_dataset(name, backend)
+    for start in range(0, len(data), chunksize):
+        yield _slice_rows(data, start, start + chunksize)
+
+
+def load_dataset(
+    name: str,
+    __backend: str = None,
+    chunksize: int = None,
+) -> Any:
+    """Load the specific dataset
+
+    The datasets are constructed by the backend from the columnar cache on
+    disk (see `datar.data.cache`), or loaded by the `load_dataset()` hook
+    of the backend if the cache is disabled or the backend can't construct
+    the frames. The loaded datasets are cached in memory (see
+    `datar.data.store`), and each call gets its own copy.
+
+    Args:
+        name: The name of the dataset
+        __backend: The backend to load the dataset
+        chunksize: If given, return an iterator of frames with at most
+            `chunksize` rows instead, which are not cached. The backends
+            implementing the `load_dataset_chunks()` hook load the chunks
+            one by one, otherwise the whole dataset is loaded and sliced.
+
+    Returns:
+        The dataset, or an iterator of the chunks of it
+    """
+    if chunksize is not None:
+        if chunksize < 1:
+            raise ValueError("`chunksize` must be a positive integer.")
+        return _iter_chunks(name, __backend, chunksize)
+
+    return _store.get(
+        (name, __backend),
+        functools.partial(_load_dataset, name, __backend),
+    )
+
+
+def _warm_columns(name: str) -> None:
+    """Parse the dataset into the columnar cache, in a worker process"""
+    from .cache import load_columns
+
+    load_columns(name, metadata)
+
+
+def _bundled() -> List[str]:
+    """The names of the datasets whose source files exist"""
+    out = []
+    for name, meta in metadata.items():
+        source = getattr(meta, "source", None)
+        if source and Path(source).is_file():
+            out.append(name)
+    return out
+
+
+def preload(
+    *names: str,
+    workers: int = None,
+    processes: bool = False,
+    __backend: str = None,
+) -> List[str]:
+    """Load the datasets concurrently into the cache of `load_dataset()`
+
+    The datasets are loaded in a thread pool. Later `load_dataset()` calls
+    and `from datar.data import ...` get copies of them without loading.
+
+    Args:
+        *names: The names of the datasets. All the datasets with their
+            source files (see `datar.data.metadata`) if not given.
+        workers: The max number of the workers. Defaults to option
+            `n_threads`, or that of `concurrent.futures.ThreadPoolExecutor`
+        processes: Whether to parse the datasets into the columnar cache
+            (see `datar.data.cache`) in a process pool first, which helps
+            the backends that load the datasets from it.
+        __backend: The backend to load the datasets
+
+    Returns:
+        The names of the loaded datasets
+    """
+    names = [name.lower() for name in names] or _bundled()
+    workers = workers or get_option("n_threads")
+    if processes:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_warm_columns, names))
+
+    def warm(name):
+        return _store.warm(
+            (name, __backend),
+            functools.partial(_load_dataset, name, __backend),
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(warm, names))
+    return names
+
+
 def __getattr__(name: str):
     # mkapi accesses quite a lot of attributes starting with _
     if not name.isidentifier() or name.startswith("__"):  # pragma: no cover
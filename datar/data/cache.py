@@ -0,0 +1,317 @@
+"""Columnar on-disk cache of the datasets
+
+Parsing the gzipped csv files is slow, especially for the wide or long
+datasets. On the first load, a dataset is parsed into typed columns (with
+the dtypes from its schema, see `datar.data.schemas`), which are saved as
+`.npy` files under the cache directory. Later loads, from any
+process, memory-map them.
+
+`load_dataset()` (and `from datar.data import <name>`) constructs the frames
+from the cached columns by the APIs of the backend (`tibble()`, `factor()`
+and `column_to_rownames()`), with the factors and the rownames.
+
+The cache directory is `$DATAR_CACHE_DIR`, or `datar` under
+`$XDG_CACHE_HOME` (`~/.cache` by default). Set option `dataset_cache` to
+`False` to disable the cache, so that the datasets are loaded by the
+`load_dataset()` hook of the backends.
+
+This module requires `numpy`, which is installed with the backends.
+"""
+from __future__ import annotations
+
+import csv
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from ..core.options import get_option
+
+# Bump it when the format of the cache changes
+CACHE_VERSION = 2
+NA_VALUES = frozenset(("", "NA", "NaN", "nan", "N/A", "NULL", "null"))
+TRUE_VALUES = frozenset(("TRUE", "True", "true"))
+FALSE_VALUES = frozenset(("FALSE", "False", "false"))
+# The temporary column for the index, turned into the rownames
+INDEX_COLUMN = "_rownames"
+
+ColumnarData = namedtuple("ColumnarData", ["columns", "index", "na"])
+ColumnarData.__doc__ = """The columns of a dataset
+
+Attributes:
+    columns: The column names and the arrays
+    index: The index (rownames) or None
+    na: The masks of the missing values of the string columns.
+        The missing values of the numeric columns are `nan`.
+"""
+
+
+def dataset_cache_dir() -> Path:
+    """Get the directory of the dataset cache"""
+    cache_dir = os.environ.get("DATAR_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+
+    xdg = os.environ.get("XDG_CACHE_HOME") or Path("~/.cache").expanduser()
+    return Path(xdg) / "datar"
+
+
+def _cache_path(name: str, source: Path, schema: Any) -> Path:
+    """The cache directory of a dataset, which changes with the source"""
+    stat = source.stat()
+    signature = (
+        f"{CACHE_VERSION}:{source.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+        f":{schema!r}"
+    )
+    digest = hashlib.sha1(signature.encode()).hexdigest()[:12]
+    return dataset_cache_dir() / f"{name}-{digest}"
+
+
+def _read_rows(source: Path) -> Tuple[List[str], List[List[str]]]:
+    """Read the header and the rows of the csv file"""
+    opener = gzip.open if source.suffix == ".gz" else open
+    with opener(source, "rt", newline="") as fcsv:
+        reader = csv.reader(fcsv)
+        header = next(reader, [])
+        rows = list(reader)
+
+    ncols = len(rows[0]) if rows else len(header)
+    if len(header) < ncols:
+        # R writes no header for the rownames
+        header = [""] * (ncols - len(header)) + header
+    # The missing trailing values are missing values
+    rows = [
+        row if len(row) >= ncols else row + [""] * (ncols - len(row))
+        for row in rows
+    ]
+    return header, rows
+
+
+def _read_csv(source: Path, index: bool, schema: Any = None) -> ColumnarData:
+    """Read the csv file into typed columns, with the dtypes from the schema
+    (see `datar.data.schemas`) or inferred"""
+    header, rows = _read_rows(source)
+    values = list(zip(*rows)) if rows else [() for _ in header]
+    if index:
+        index_values, values = values[0], values[1:]
+        header = header[1:]
+        index_array = _to_array(index_values)[0]
+    else:
+        index_array = None
+
+    dtypes = schema.dtypes if schema else {}
+    formats = schema.formats if schema else {}
+    columns, na = {}, {}
+    for name, column in zip(header, values):
+        columns[name], mask = _to_array(
+            column,
+            dtypes.get(name),
+            formats.get(name),
+        )
+        if mask is not None:
+            na[name] = mask
+    return ColumnarData(columns, index_array, na)
+
+
+def _infer_type(values: Sequence[str]) -> type:
+    """Infer the type of the column from the non-missing values"""
+    present = [val for val in values if val not in NA_VALUES]
+    if not present:
+        return float
+    if all(val in TRUE_VALUES or val in FALSE_VALUES for val in present):
+        return bool
+    for type_ in (int, float):
+        try:
+            for val in present:
+                type_(val)
+        except ValueError:
+            continue
+        return type_
+    return str
+
+
+def _to_array(
+    values: Sequence[str],
+    dtype: str = None,
+    fmt: str = None,
+) -> tuple:
+    """Convert the csv values to an array, and the mask of the missing
+    values for the string columns"""
+    import numpy as np
+
+    if dtype is None:
+        dtype = _infer_type(values).__name__
+    has_na = any(val in NA_VALUES for val in values)
+
+    if dtype in ("date", "datetime"):
+        unit = "D" if dtype == "date" else "s"
+        return (
+            np.array(
+                [
+                    "NaT" if val in NA_VALUES
+                    else datetime.strptime(val, fmt).isoformat()
+                    for val in values
+                ],
+                dtype=f"datetime64[{unit}]",
+            ),
+            None,
+        )
+    if dtype in ("str", "category", "ordered"):
+        mask = np.array([val in NA_VALUES for val in values], dtype=bool)
+        return np.array(values, dtype=str), mask if has_na else None
+    if dtype == "bool" and not has_na:
+        return np.array([val in TRUE_VALUES for val in values]), None
+    if dtype == "int" and not has_na:
+        return np.array(values, dtype=np.int64), None
+    if dtype == "bool":
+        values = [
+            "nan" if val in NA_VALUES else float(val in TRUE_VALUES)
+            for val in values
+        ]
+    else:
+        values = ["nan" if val in NA_VALUES else val for val in values]
+    return np.array(values, dtype=np.float64), None
+
+
+def _save(data: ColumnarData, path: Path) -> None:
+    """Save the columns into the cache directory, atomically"""
+    import numpy as np
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmpdir = Path(tempfile.mkdtemp(prefix=f".{path.name}-", dir=path.parent))
+    columns = []
+    for i, (name, array) in enumerate(data.columns.items()):
+        np.save(tmpdir / f"{i}.npy", array)
+        if name in data.na:
+            np.save(tmpdir / f"{i}.na.npy", data.na[name])
+        columns.append({"name": name, "na": name in data.na})
+    if data.index is not None:
+        np.save(tmpdir / "index.npy", data.index)
+
+    with tmpdir.joinpath("columns.json").open("w") as fjson:
+        json.dump({"columns": columns, "index": data.index is not None}, fjson)
+
+    try:
+        tmpdir.rename(path)
+    except OSError:
+        # saved by another process in the meantime
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _load(path: Path) -> ColumnarData:
+    """Load the columns from the cache directory, memory-mapped"""
+    import numpy as np
+
+    with path.joinpath("columns.json").open() as fjson:
+        info = json.load(fjson)
+
+    columns, na = {}, {}
+    for i, column in enumerate(info["columns"]):
+        name = column["name"]
+        columns[name] = np.load(path / f"{i}.npy", mmap_mode="r")
+        if column["na"]:
+            na[name] = np.load(path / f"{i}.na.npy", mmap_mode="r")
+
+    index = (
+        np.load(path / "index.npy", mmap_mode="r") if info["index"] else None
+    )
+    return ColumnarData(columns, index, na)
+
+
+def load_columns(name: str, metadata: Mapping[str, Any]) -> ColumnarData:
+    """Load a dataset as typed columns, from the cache if possible
+
+    Args:
+        name: The name of the dataset
+        metadata: The metadata of all datasets, as passed to the
+            `load_dataset()` hook
+
+    Returns:
+        The columns, the index and the masks of the missing values.
+        The arrays are read-only when loaded from the cache.
+    """
+    meta = metadata[name]
+    source = Path(meta.source)
+    schema = getattr(meta, "schema", None)
+    if not get_option("dataset_cache"):
+        return _read_csv(source, meta.index, schema)
+
+    path = _cache_path(name, source, schema)
+    if not path.joinpath("columns.json").is_file():
+        data = _read_csv(source, meta.index, schema)
+        try:
+            _save(data, path)
+        except OSError:  # pragma: no cover
+            # cache directory not writable
+            return data
+    return _load(path)
+
+
+def _factors(schema: Any, data: ColumnarData) -> Dict[str, tuple]:
+    """The levels and whether ordered, of the factor columns in the schema
+    of the dataset"""
+    import numpy as np
+
+    if schema is None:
+        return {}
+
+    out = {}
+    for col, dtype in schema.dtypes.items():
+        if dtype not in ("category", "ordered") or col not in data.columns:
+            continue
+        levels = schema.levels.get(col)
+        if levels is None:
+            values = np.asarray(data.columns[col])
+            if col in data.na:
+                values = values[~np.asarray(data.na[col])]
+            levels = np.unique(values).tolist()
+        out[col] = (list(levels), dtype == "ordered")
+    return out
+
+
+def _with_na(data: ColumnarData) -> Dict[str, Any]:
+    """The columns, with the missing strings as None"""
+    columns = dict(data.columns)
+    for col, mask in data.na.items():
+        values = columns[col].astype(object)
+        values[mask] = None
+        columns[col] = values
+    return columns
+
+
+def _to_frame(
+    data: ColumnarData,
+    factors: Mapping,
+    backend: str | None,
+    **extra: Any,
+) -> Any:
+    """Construct the frame by the backend, with the factors and rownames"""
+    from ..apis.base import factor
+    from ..apis.tibble import column_to_rownames, tibble
+
+    columns = _with_na(data)
+    for col, (levels, ordered) in factors.items():
+        columns[col] = factor(
+            columns[col],
+            levels=levels,
+            ordered=ordered,
+            __backend=backend,
+        )
+    if data.index is not None:
+        columns[INDEX_COLUMN] = data.index
+
+    frame = tibble(**extra, **columns, __backend=backend)
+    if data.index is not None:
+        frame = column_to_rownames(
+            frame,
+            INDEX_COLUMN,
+            __ast_fallback="normal",
+            __backend=backend,
+        )
+    return frame
@@ -1,9 +1,15 @@
 from collections import namedtuple
 from pathlib import Path
 
+from .schemas import SCHEMAS
+
 HERE = Path(__file__).parent
 
-Metadata = namedtuple('Metadata', ['descr', 'ref', 'index', 'source'])
+Metadata = namedtuple(
+    'Metadata',
+    ['descr', 'ref', 'index', 'source', 'schema'],
+    defaults=[None],
+)
 
 metadata = dict(
     airlines=Metadata(
@@ -319,3 +325,6 @@ metadata = dict(
         source=HERE / "world_bank_pop.csv.gz",
     ),
 )
+
+for _name, _meta in metadata.items():
+    metadata[_name] = _meta._replace(schema=SCHEMAS.get(_name))
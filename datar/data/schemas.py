@@ -0,0 +1,890 @@
+"""The schemas of the bundled datasets
+
+With the schemas, the backends can parse the datasets with fixed types,
+instead of inferring them from the csv files.
+
+The dtypes and the date formats are generated from the data, and the
+factors are from `FACTORS`. Regenerate it when the datasets change:
+python -m datar.data.schemas
+
+Attributes:
+    Schema: The schema of a dataset, with
+        `dtypes`: The dtypes of the columns, one of `int`, `float`, `bool`,
+            `str`, `category`, `ordered` (ordered category), `date` and
+            `datetime`. The `int` and `bool` columns may have missing values.
+        `levels`: The levels of the `category` and `ordered` columns.
+            `None` means the sorted unique values.
+        `formats`: The formats of the `date` and `datetime` columns,
+            for `datetime.strptime()`
+"""
+from __future__ import annotations
+
+import re
+from collections import namedtuple
+from typing import Dict, Sequence
+
+Schema = namedtuple("Schema", ["dtypes", "levels", "formats"])
+
+# The factors in R, which can't be inferred from the csv files
+# dataset => column => (levels, ordered)
+FACTORS = {
+    "diamonds": {
+        "cut": (["Fair", "Good", "Very Good", "Premium", "Ideal"], True),
+        "color": (["D", "E", "F", "G", "H", "I", "J"], True),
+        "clarity": (
+            ["I1", "SI2", "SI1", "VS2", "VS1", "VVS2", "VVS1", "IF"],
+            True,
+        ),
+    },
+    "iris": {"Species": (["setosa", "versicolor", "virginica"], False)},
+    "toothgrowth": {"supp": (["OJ", "VC"], False)},
+    "warpbreaks": {
+        "wool": (["A", "B"], False),
+        "tension": (["L", "M", "H"], False),
+    },
+    "gss_cat": {
+        "marital": (None, False),
+        "race": (None, False),
+        "rincome": (None, False),
+        "partyid": (None, False),
+        "relig": (None, False),
+        "denom": (None, False),
+    },
+}
+
+# The patterns of the dates and datetimes in the csv files
+DATE_FORMATS = {
+    "date": (re.compile(r"\d{4}-\d{2}-\d{2}"), "%Y-%m-%d"),
+    "datetime": (
+        re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"),
+        "%Y-%m-%d %H:%M:%S",
+    ),
+}
+
+
+def infer_schema(
+    header: Sequence[str],
+    columns: Sequence[Sequence[str]],
+    factors: Dict[str, tuple] = None,
+) -> Schema:
+    """Infer the schema from the values of the columns
+
+    Args:
+        header: The column names
+        columns: The values of the columns, as in the csv file
+        factors: The factors, column => (levels, ordered)
+
+    Returns:
+        The schema
+    """
+    from .cache import NA_VALUES, _infer_type
+
+    factors = factors or {}
+    dtypes, levels, formats = {}, {}, {}
+    for name, values in zip(header, columns):
+        if name in factors:
+            levels[name], ordered = factors[name]
+            dtypes[name] = "ordered" if ordered else "category"
+            continue
+
+        dtype = _infer_type(values).__name__
+        if dtype == "str":
+            present = [val for val in values if val not in NA_VALUES]
+            for date_type, (pattern, fmt) in DATE_FORMATS.items():
+                if present and all(map(pattern.fullmatch, present)):
+                    dtype = date_type
+                    formats[name] = fmt
+                    break
+        dtypes[name] = dtype
+
+    return Schema(dtypes, levels, formats)
+
+
+def build_schemas() -> Dict[str, Schema]:
+    """Build the schemas of the bundled datasets"""
+    from .cache import _read_rows
+    from .metadata import HERE, Metadata, metadata
+
+    schemas = {}
+    for name, meta in metadata.items():
+        # only the bundled ones, not the ones by add_dataset()
+        if (
+            not isinstance(meta, Metadata)
+            or meta.source.parent != HERE
+            or not meta.source.exists()
+        ):
+            continue
+        header, rows = _read_rows(meta.source)
+        columns = list(zip(*rows)) if rows else [() for _ in header]
+        if meta.index:
+            header, columns = header[1:], columns[1:]
+        schemas[name] = infer_schema(header, columns, FACTORS.get(name))
+    return schemas
+
+
+SCHEMAS = {
+    'airlines': Schema(
+        dtypes={'carrier': 'str', 'name': 'str'},
+        levels={},
+        formats={},
+    ),
+    'airports': Schema(
+        dtypes={
+            'faa': 'str',
+            'name': 'str',
+            'lat': 'float',
+            'lon': 'float',
+            'alt': 'int',
+            'tz': 'int',
+            'dst': 'str',
+            'tzone': 'str',
+        },
+        levels={},
+        formats={},
+    ),
+    'airquality': Schema(
+        dtypes={
+            'Ozone': 'int',
+            'Solar_R': 'int',
+            'Wind': 'float',
+            'Temp': 'int',
+            'Month': 'int',
+            'Day': 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'anscombe': Schema(
+        dtypes={
+            'x1': 'int',
+            'x2': 'int',
+            'x3': 'int',
+            'x4': 'int',
+            'y1': 'float',
+            'y2': 'float',
+            'y3': 'float',
+            'y4': 'float',
+        },
+        levels={},
+        formats={},
+    ),
+    'band_instruments': Schema(
+        dtypes={'name': 'str', 'plays': 'str'},
+        levels={},
+        formats={},
+    ),
+    'band_instruments2': Schema(
+        dtypes={'artist': 'str', 'plays': 'str'},
+        levels={},
+        formats={},
+    ),
+    'band_members': Schema(
+        dtypes={'name': 'str', 'band': 'str'},
+        levels={},
+        formats={},
+    ),
+    'billboard': Schema(
+        dtypes={
+            'artist': 'str',
+            'track': 'str',
+            'date.entered': 'date',
+            'wk1': 'int',
+            'wk2': 'int',
+            'wk3': 'int',
+            'wk4': 'int',
+            'wk5': 'int',
+            'wk6': 'int',
+            'wk7': 'int',
+            'wk8': 'int',
+            'wk9': 'int',
+            'wk10': 'int',
+            'wk11': 'int',
+            'wk12': 'int',
+            'wk13': 'int',
+            'wk14': 'int',
+            'wk15': 'int',
+            'wk16': 'int',
+            'wk17': 'int',
+            'wk18': 'int',
+            'wk19': 'int',
+            'wk20': 'int',
+            'wk21': 'int',
+            'wk22': 'int',
+            'wk23': 'int',
+            'wk24': 'int',
+            'wk25': 'int',
+            'wk26': 'int',
+            'wk27': 'int',
+            'wk28': 'int',
+            'wk29': 'int',
+            'wk30': 'int',
+            'wk31': 'int',
+            'wk32': 'int',
+            'wk33': 'int',
+            'wk34': 'int',
+            'wk35': 'int',
+            'wk36': 'int',
+            'wk37': 'int',
+            'wk38': 'int',
+            'wk39': 'int',
+            'wk40': 'int',
+            'wk41': 'int',
+            'wk42': 'int',
+            'wk43': 'int',
+            'wk44': 'int',
+            'wk45': 'int',
+            'wk46': 'int',
+            'wk47': 'int',
+            'wk48': 'int',
+            'wk49': 'int',
+            'wk50': 'int',
+            'wk51': 'int',
+            'wk52': 'int',
+            'wk53': 'int',
+            'wk54': 'int',
+            'wk55': 'int',
+            'wk56': 'int',
+            'wk57': 'int',
+            'wk58': 'int',
+            'wk59': 'int',
+            'wk60': 'int',
+            'wk61': 'int',
+            'wk62': 'int',
+            'wk63': 'int',
+            'wk64': 'int',
+            'wk65': 'int',
+            'wk66': 'float',
+            'wk67': 'float',
+            'wk68': 'float',
+            'wk69': 'float',
+            'wk70': 'float',
+            'wk71': 'float',
+            'wk72': 'float',
+            'wk73': 'float',
+            'wk74': 'float',
+            'wk75': 'float',
+            'wk76': 'float',
+        },
+        levels={},
+        formats={'date.entered': '%Y-%m-%d'},
+    ),
+    'chickweight': Schema(
+        dtypes={'weight': 'int', 'Time': 'int', 'Chick': 'int', 'Diet': 'int'},
+        levels={},
+        formats={},
+    ),
+    'cms_patient_care': Schema(
+        dtypes={
+            'ccn': 'int',
+            'facility_name': 'str',
+            'measure_abbr': 'str',
+            'score': 'float',
+            'type': 'str',
+        },
+        levels={},
+        formats={},
+    ),
+    'cms_patient_experience': Schema(
+        dtypes={
+            'org_pac_id': 'int',
+            'org_nm': 'str',
+            'measure_cd': 'str',
+            'measure_title': 'str',
+            'prf_rate': 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'construction': Schema(
+        dtypes={
+            'Year': 'int',
+            'Month': 'str',
+            '1 unit': 'int',
+            '2 to 4 units': 'float',
+            '5 units or more': 'int',
+            'Northeast': 'int',
+            'Midwest': 'int',
+            'South': 'int',
+            'West': 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'diamonds': Schema(
+        dtypes={
+            'carat': 'float',
+            'cut': 'ordered',
+            'color': 'ordered',
+            'clarity': 'ordered',
+            'depth': 'float',
+            'table': 'float',
+            'price': 'int',
+            'x': 'float',
+            'y': 'float',
+            'z': 'float',
+        },
+        levels={
+            'cut': ['Fair', 'Good', 'Very Good', 'Premium', 'Ideal'],
+            'color': ['D', 'E', 'F', 'G', 'H', 'I', 'J'],
+            'clarity': ['I1', 'SI2', 'SI1', 'VS2', 'VS1', 'VVS2', 'VVS1', 'IF'],
+        },
+        formats={},
+    ),
+    'economics': Schema(
+        dtypes={
+            'date': 'date',
+            'pce': 'float',
+            'pop': 'float',
+            'psavert': 'float',
+            'uempmed': 'float',
+            'unemploy': 'int',
+        },
+        levels={},
+        formats={'date': '%Y-%m-%d'},
+    ),
+    'economics_long': Schema(
+        dtypes={
+            'date': 'date',
+            'variable': 'str',
+            'value': 'float',
+            'value01': 'float',
+        },
+        levels={},
+        formats={'date': '%Y-%m-%d'},
+    ),
+    'faithful': Schema(
+        dtypes={'eruptions': 'float', 'waiting': 'int'},
+        levels={},
+        formats={},
+    ),
+    'faithfuld': Schema(
+        dtypes={'eruptions': 'float', 'waiting': 'float', 'density': 'float'},
+        levels={},
+        formats={},
+    ),
+    'fish_encounters': Schema(
+        dtypes={'fish': 'int', 'station': 'str', 'seen': 'int'},
+        levels={},
+        formats={},
+    ),
+    'gss_cat': Schema(
+        dtypes={
+            'year': 'int',
+            'marital': 'category',
+            'age': 'int',
+            'race': 'category',
+            'rincome': 'category',
+            'partyid': 'category',
+            'relig': 'category',
+            'denom': 'category',
+            'tvhours': 'int',
+        },
+        levels={
+            'marital': None,
+            'race': None,
+            'rincome': None,
+            'partyid': None,
+            'relig': None,
+            'denom': None,
+        },
+        formats={},
+    ),
+    'household': Schema(
+        dtypes={
+            'family': 'int',
+            'dob_child1': 'date',
+            'dob_child2': 'date',
+            'name_child1': 'str',
+            'name_child2': 'str',
+        },
+        levels={},
+        formats={'dob_child1': '%Y-%m-%d', 'dob_child2': '%Y-%m-%d'},
+    ),
+    'iris': Schema(
+        dtypes={
+            'Sepal_Length': 'float',
+            'Sepal_Width': 'float',
+            'Petal_Length': 'float',
+            'Petal_Width': 'float',
+            'Species': 'category',
+        },
+        levels={'Species': ['setosa', 'versicolor', 'virginica']},
+        formats={},
+    ),
+    'luv_colours': Schema(
+        dtypes={'L': 'float', 'u': 'float', 'v': 'float', 'col': 'str'},
+        levels={},
+        formats={},
+    ),
+    'midwest': Schema(
+        dtypes={
+            'PID': 'int',
+            'county': 'str',
+            'state': 'str',
+            'area': 'float',
+            'poptotal': 'int',
+            'popdensity': 'float',
+            'popwhite': 'int',
+            'popblack': 'int',
+            'popamerindian': 'int',
+            'popasian': 'int',
+            'popother': 'int',
+            'percwhite': 'float',
+            'percblack': 'float',
+            'percamerindan': 'float',
+            'percasian': 'float',
+            'percother': 'float',
+            'popadults': 'int',
+            'perchsd': 'float',
+            'percollege': 'float',
+            'percprof': 'float',
+            'poppovertyknown': 'int',
+            'percpovertyknown': 'float',
+            'percbelowpoverty': 'float',
+            'percchildbelowpovert': 'float',
+            'percadultpoverty': 'float',
+            'percelderlypoverty': 'float',
+            'inmetro': 'int',
+            'category': 'str',
+        },
+        levels={},
+        formats={},
+    ),
+    'mpg': Schema(
+        dtypes={
+            'manufacturer': 'str',
+            'model': 'str',
+            'displ': 'float',
+            'year': 'int',
+            'cyl': 'int',
+            'trans': 'str',
+            'drv': 'str',
+            'cty': 'int',
+            'hwy': 'int',
+            'fl': 'str',
+            'class': 'str',
+        },
+        levels={},
+        formats={},
+    ),
+    'msleep': Schema(
+        dtypes={
+            'name': 'str',
+            'genus': 'str',
+            'vore': 'str',
+            'order': 'str',
+            'conservation': 'str',
+            'sleep_total': 'float',
+            'sleep_rem': 'float',
+            'sleep_cycle': 'float',
+            'awake': 'float',
+            'brainwt': 'float',
+            'bodywt': 'float',
+        },
+        levels={},
+        formats={},
+    ),
+    'mtcars': Schema(
+        dtypes={
+            'mpg': 'float',
+            'cyl': 'int',
+            'disp': 'float',
+            'hp': 'int',
+            'drat': 'float',
+            'wt': 'float',
+            'qsec': 'float',
+            'vs': 'int',
+            'am': 'int',
+            'gear': 'int',
+            'carb': 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'planes': Schema(
+        dtypes={
+            'tailnum': 'str',
+            'year': 'int',
+            'type': 'str',
+            'manufacturer': 'str',
+            'model': 'str',
+            'engines': 'int',
+            'seats': 'int',
+            'speed': 'int',
+            'engine': 'str',
+        },
+        levels={},
+        formats={},
+    ),
+    'population': Schema(
+        dtypes={'country': 'str', 'year': 'int', 'population': 'int'},
+        levels={},
+        formats={},
+    ),
+    'presidential': Schema(
+        dtypes={'name': 'str', 'start': 'date', 'end': 'date', 'party': 'str'},
+        levels={},
+        formats={'start': '%Y-%m-%d', 'end': '%Y-%m-%d'},
+    ),
+    'relig_income': Schema(
+        dtypes={
+            'religion': 'str',
+            '<$10k': 'int',
+            '$10-20k': 'int',
+            '$20-30k': 'int',
+            '$30-40k': 'int',
+            '$40-50k': 'int',
+            '$50-75k': 'int',
+            '$75-100k': 'int',
+            '$100-150k': 'int',
+            '>150k': 'int',
+            "Don't know/refused": 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'seals': Schema(
+        dtypes={
+            'lat': 'float',
+            'long': 'float',
+            'delta_long': 'float',
+            'delta_lat': 'float',
+        },
+        levels={},
+        formats={},
+    ),
+    'starwars': Schema(
+        dtypes={
+            'name': 'str',
+            'height': 'int',
+            'mass': 'float',
+            'hair_color': 'str',
+            'skin_color': 'str',
+            'eye_color': 'str',
+            'birth_year': 'float',
+            'sex': 'str',
+            'gender': 'str',
+            'homeworld': 'str',
+            'species': 'str',
+        },
+        levels={},
+        formats={},
+    ),
+    'state_abb': Schema(
+        dtypes={'abb': 'str'},
+        levels={},
+        formats={},
+    ),
+    'state_division': Schema(
+        dtypes={'division': 'str'},
+        levels={},
+        formats={},
+    ),
+    'state_region': Schema(
+        dtypes={'region': 'str'},
+        levels={},
+        formats={},
+    ),
+    'storms': Schema(
+        dtypes={
+            'name': 'str',
+            'year': 'int',
+            'month': 'int',
+            'day': 'int',
+            'hour': 'int',
+            'lat': 'float',
+            'long': 'float',
+            'status': 'str',
+            'category': 'int',
+            'wind': 'int',
+            'pressure': 'int',
+            'tropicalstorm_force_diameter': 'int',
+            'hurricane_force_diameter': 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'table1': Schema(
+        dtypes={
+            'country': 'str',
+            'year': 'int',
+            'cases': 'int',
+            'population': 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'table2': Schema(
+        dtypes={'country': 'str', 'year': 'int', 'type': 'str', 'count': 'int'},
+        levels={},
+        formats={},
+    ),
+    'table3': Schema(
+        dtypes={'country': 'str', 'year': 'int', 'rate': 'str'},
+        levels={},
+        formats={},
+    ),
+    'table4a': Schema(
+        dtypes={'country': 'str', '1999': 'int', '2000': 'int'},
+        levels={},
+        formats={},
+    ),
+    'table4b': Schema(
+        dtypes={'country': 'str', '1999': 'int', '2000': 'int'},
+        levels={},
+        formats={},
+    ),
+    'table5': Schema(
+        dtypes={
+            'country': 'str',
+            'century': 'int',
+            'year': 'int',
+            'rate': 'str',
+        },
+        levels={},
+        formats={},
+    ),
+    'toothgrowth': Schema(
+        dtypes={'len': 'float', 'supp': 'category', 'dose': 'float'},
+        levels={'supp': ['OJ', 'VC']},
+        formats={},
+    ),
+    'txhousing': Schema(
+        dtypes={
+            'city': 'str',
+            'year': 'int',
+            'month': 'int',
+            'sales': 'int',
+            'volume': 'float',
+            'median': 'float',
+            'listings': 'int',
+            'inventory': 'float',
+            'date': 'float',
+        },
+        levels={},
+        formats={},
+    ),
+    'us_rent_income': Schema(
+        dtypes={
+            'GEOID': 'int',
+            'NAME': 'str',
+            'variable': 'str',
+            'estimate': 'int',
+            'moe': 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'warpbreaks': Schema(
+        dtypes={'breaks': 'int', 'wool': 'category', 'tension': 'category'},
+        levels={'wool': ['A', 'B'], 'tension': ['L', 'M', 'H']},
+        formats={},
+    ),
+    'weather': Schema(
+        dtypes={
+            'origin': 'str',
+            'year': 'int',
+            'month': 'int',
+            'day': 'int',
+            'hour': 'int',
+            'temp': 'float',
+            'dewp': 'float',
+            'humid': 'float',
+            'wind_dir': 'int',
+            'wind_speed': 'float',
+            'wind_gust': 'float',
+            'precip': 'float',
+            'pressure': 'float',
+            'visib': 'float',
+            'time_hour': 'datetime',
+        },
+        levels={},
+        formats={'time_hour': '%Y-%m-%d %H:%M:%S'},
+    ),
+    'who': Schema(
+        dtypes={
+            'country': 'str',
+            'iso2': 'str',
+            'iso3': 'str',
+            'year': 'int',
+            'new_sp_m014': 'int',
+            'new_sp_m1524': 'int',
+            'new_sp_m2534': 'int',
+            'new_sp_m3544': 'int',
+            'new_sp_m4554': 'int',
+            'new_sp_m5564': 'int',
+            'new_sp_m65': 'int',
+            'new_sp_f014': 'int',
+            'new_sp_f1524': 'int',
+            'new_sp_f2534': 'int',
+            'new_sp_f3544': 'int',
+            'new_sp_f4554': 'int',
+            'new_sp_f5564': 'int',
+            'new_sp_f65': 'int',
+            'new_sn_m014': 'int',
+            'new_sn_m1524': 'int',
+            'new_sn_m2534': 'int',
+            'new_sn_m3544': 'int',
+            'new_sn_m4554': 'int',
+            'new_sn_m5564': 'int',
+            'new_sn_m65': 'int',
+            'new_sn_f014': 'int',
+            'new_sn_f1524': 'int',
+            'new_sn_f2534': 'int',
+            'new_sn_f3544': 'int',
+            'new_sn_f4554': 'int',
+            'new_sn_f5564': 'int',
+            'new_sn_f65': 'int',
+            'new_ep_m014': 'int',
+            'new_ep_m1524': 'int',
+            'new_ep_m2534': 'int',
+            'new_ep_m3544': 'int',
+            'new_ep_m4554': 'int',
+            'new_ep_m5564': 'int',
+            'new_ep_m65': 'int',
+            'new_ep_f014': 'int',
+            'new_ep_f1524': 'int',
+            'new_ep_f2534': 'int',
+            'new_ep_f3544': 'int',
+            'new_ep_f4554': 'int',
+            'new_ep_f5564': 'int',
+            'new_ep_f65': 'int',
+            'newrel_m014': 'int',
+            'newrel_m1524': 'int',
+            'newrel_m2534': 'int',
+            'newrel_m3544': 'int',
+            'newrel_m4554': 'int',
+            'newrel_m5564': 'int',
+            'newrel_m65': 'int',
+            'newrel_f014': 'int',
+            'newrel_f1524': 'int',
+            'newrel_f2534': 'int',
+            'newrel_f3544': 'int',
+            'newrel_f4554': 'int',
+            'newrel_f5564': 'int',
+            'newrel_f65': 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'who2': Schema(
+        dtypes={
+            'country': 'str',
+            'year': 'int',
+            'sp_m_014': 'int',
+            'sp_m_1524': 'int',
+            'sp_m_2534': 'int',
+            'sp_m_3544': 'int',
+            'sp_m_4554': 'int',
+            'sp_m_5564': 'int',
+            'sp_m_65': 'int',
+            'sp_f_014': 'int',
+            'sp_f_1524': 'int',
+            'sp_f_2534': 'int',
+            'sp_f_3544': 'int',
+            'sp_f_4554': 'int',
+            'sp_f_5564': 'int',
+            'sp_f_65': 'int',
+            'sn_m_014': 'int',
+            'sn_m_1524': 'int',
+            'sn_m_2534': 'int',
+            'sn_m_3544': 'int',
+            'sn_m_4554': 'int',
+            'sn_m_5564': 'int',
+            'sn_m_65': 'int',
+            'sn_f_014': 'int',
+            'sn_f_1524': 'int',
+            'sn_f_2534': 'int',
+            'sn_f_3544': 'int',
+            'sn_f_4554': 'int',
+            'sn_f_5564': 'int',
+            'sn_f_65': 'int',
+            'ep_m_014': 'int',
+            'ep_m_1524': 'int',
+            'ep_m_2534': 'int',
+            'ep_m_3544': 'int',
+            'ep_m_4554': 'int',
+            'ep_m_5564': 'int',
+            'ep_m_65': 'int',
+            'ep_f_014': 'int',
+            'ep_f_1524': 'int',
+            'ep_f_2534': 'int',
+            'ep_f_3544': 'int',
+            'ep_f_4554': 'int',
+            'ep_f_5564': 'int',
+            'ep_f_65': 'int',
+            'rel_m_014': 'int',
+            'rel_m_1524': 'int',
+            'rel_m_2534': 'int',
+            'rel_m_3544': 'int',
+            'rel_m_4554': 'int',
+            'rel_m_5564': 'int',
+            'rel_m_65': 'int',
+            'rel_f_014': 'int',
+            'rel_f_1524': 'int',
+            'rel_f_2534': 'int',
+            'rel_f_3544': 'int',
+            'rel_f_4554': 'int',
+            'rel_f_5564': 'int',
+            'rel_f_65': 'int',
+        },
+        levels={},
+        formats={},
+    ),
+    'world_bank_pop': Schema(
+        dtypes={
+            'country': 'str',
+            'indicator': 'str',
+            '2000': 'float',
+            '2001': 'float',
+            '2002': 'float',
+            '2003': 'float',
+            '2004': 'float',
+            '2005': 'float',
+            '2006': 'float',
+            '2007': 'float',
+            '2008': 'float',
+            '2009': 'float',
+            '2010': 'float',
+            '2011': 'float',
+            '2012': 'float',
+            '2013': 'float',
+            '2014': 'float',
+            '2015': 'float',
+            '2016': 'float',
+            '2017': 'float',
+        },
+        levels={},
+        formats={},
+    ),
+}
+
+
+def _format_field(name: str, value: Dict) -> str:
+    """Format a field of a Schema for the generated code"""
+    line = f"        {name}={value!r},"
+    if len(line) <= 80:
+        return line
+
+    items = "".join(
+        f"            {key!r}: {val!r},\n" for key, val in value.items()
+    )
+    return f"        {name}={{\n{items}        }},"
+
+
+if __name__ == "__main__":  # pragma: no cover
+    from pathlib import Path
+
+    out = ["SCHEMAS = {"]
+    for name, schema in build_schemas().items():
+        out.append(f"    {name!r}: Schema(")
+        for field in Schema._fields:
+            out.append(_format_field(field, getattr(schema, field)))
+        out.append("    ),")
+    out.append("}")
+
+    path = Path(__file__)
+    source = path.read_text()
+    head, rest = source.split("\nSCHEMAS = {", 1)
+    _, tail = ("\n" + rest).split("\n}\n", 1)
+    path.write_text(head + "\n" + "\n".join(out) + "\n" + tail)
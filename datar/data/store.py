@@ -0,0 +1,171 @@
+"""In-memory cache of the loaded datasets
+
+The loaded datasets are kept until the total size exceeds option
+`dataset_memory_limit` (bytes), when the least recently used ones are
+evicted. Each caller gets its own copy (see the `copy_dataset()` hook), so
+that the columns added, dropped or replaced by a caller don't affect the
+others. Without the hook, the copies are shallow where the data supports
+it (e.g. pandas), which share the values with the cached dataset. The
+backends should implement the hook to make cheap copy-on-write copies, so
+that modifying the values in place is safe, too.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+from ..core.plugin import dispatch_last_avail
+
+
+def sizeof(data: Any) -> int:
+    """Estimate the size of the data in bytes
+
+    Args:
+        data: The data, e.g. a data frame
+
+    Returns:
+        The estimated size
+    """
+    memory_usage = getattr(data, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            # pandas
+            return int(memory_usage(index=True, deep=True).sum())
+        except Exception:  # pragma: no cover
+            pass
+
+    nbytes = getattr(data, "nbytes", None)
+    if isinstance(nbytes, int):
+        # numpy, pyarrow
+        return nbytes
+    return sys.getsizeof(data)
+
+
+def copy_data(data: Any) -> Any:
+    """Get a copy of the data for a caller
+
+    The backends can implement the `copy_dataset()` hook to make cheap,
+    copy-on-write copies. Otherwise, `data.copy(deep=False)` is used if
+    supported, then `data.copy()`, or the data itself, which is assumed to
+    be immutable.
+    """
+    copied = dispatch_last_avail("copy_dataset", data)
+    if copied is not None:
+        return copied
+
+    copy = getattr(data, "copy", None)
+    if not callable(copy):
+        return data
+    try:
+        # pandas, sharing the values
+        return copy(deep=False)
+    except TypeError:
+        return copy()
+
+
+class DatasetStore:
+    """A memory-bounded LRU cache of the datasets
+
+    Args:
+        limit: The max total size in bytes, or a callable to get it.
+            Datasets larger than it are not cached.
+    """
+
+    def __init__(self, limit: int | Callable[[], int]) -> None:
+        self._limit = limit
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._size = 0
+        self._lock = threading.Lock()
+        # The locks of the datasets being loaded, so that each is loaded once
+        self._loading = {}  # type: dict
+
+    @property
+    def limit(self) -> int:
+        """The max total size in bytes"""
+        return self._limit() if callable(self._limit) else self._limit
+
+    @property
+    def size(self) -> int:
+        """The total size of the cached datasets in bytes"""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Get a copy of the dataset, loading it with `loader()` on a miss
+
+        Args:
+            key: The key of the dataset
+            loader: The function to load the dataset
+
+        Returns:
+            A copy of the dataset
+        """
+        return copy_data(self.warm(key, loader))
+
+    def warm(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Make sure the dataset is loaded, without copying it
+
+        Args:
+            key: The key of the dataset
+            loader: The function to load the dataset
+
+        Returns:
+            The cached dataset, which should not be modified
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry[0]
+
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            # loaded by another thread in the meantime
+            entry = self._lookup(key)
+            if entry is None:
+                try:
+                    data = loader()
+                    entry = (data, sizeof(data))
+                    self._put(key, entry)
+                finally:
+                    with self._lock:
+                        self._loading.pop(key, None)
+
+        return entry[0]
+
+    def _lookup(self, key: Hashable) -> Tuple[Any, int] | None:
+        """Get the cached dataset and its size, marking it recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: Hashable, entry: Tuple[Any, int]) -> None:
+        """Cache the dataset and evict the least recently used ones"""
+        limit = self.limit
+        with self._lock:
+            if entry[1] > limit:
+                return
+
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = entry
+            self._size += entry[1]
+            while self._size > limit:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._size -= size
+
+    def clear(self) -> None:
+        """Remove all the cached datasets"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
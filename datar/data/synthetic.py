@@ -0,0 +1,253 @@
+"""Generate larger versions of the bundled datasets
+
+The rows are sampled from the dataset with replacement, so that the
+distributions of the values and the relationships between the columns are
+kept. The columns with mostly unique values (e.g. names or measurements)
+are varied, so that their cardinalities grow with the number of rows:
+
+- a suffix is added to the strings, for each round of the original rows
+- a small noise (1% of the standard deviation) is added to the floats
+
+Only the `float` columns in the schema get the noise. The `int` and `bool`
+columns with missing values are loaded as floats (with `nan`), but they are
+sampled as they are, so that the values stay integral.
+
+The `category` and `ordered` columns in the schema of the dataset (see
+`datar.data.schemas`) are never varied, so the values stay in the levels,
+and `synthesize()` makes them factors with the levels. The index
+(rownames) is sampled and suffixed like the varied strings.
+
+This module requires `numpy`, which is installed with the backends.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, Mapping, Set
+
+from .cache import ColumnarData, _factors, _to_frame, _with_na, load_columns
+from .metadata import metadata
+
+# The ratio of unique values for a column to be varied
+UNIQUE_RATIO = 0.5
+# The scale of the noise added to the floats, relative to the std
+NOISE_SCALE = 0.01
+
+
+def _schema(name: str) -> Any:
+    """The schema of the dataset, or None"""
+    return getattr(metadata.get(name), "schema", None)
+
+
+def _varied_columns(
+    data: ColumnarData,
+    factors: Mapping,
+    dtypes: Mapping[str, str],
+) -> Set[str]:
+    """The string and float columns with mostly unique values,
+    except the factors and the `int`/`bool` columns with missing values"""
+    import numpy as np
+
+    out = set()
+    for name, column in data.columns.items():
+        if (
+            name in factors
+            or column.dtype.kind not in "Uf"
+            or (
+                column.dtype.kind == "f"
+                and dtypes.get(name, "float") != "float"
+            )
+            or len(column) == 0
+        ):
+            continue
+        if len(np.unique(column)) / len(column) > UNIQUE_RATIO:
+            out.add(name)
+    return out
+
+
+def _suffixed(values: Any, rounds: Any) -> Any:
+    """Add the suffixes of the rounds (except the first one) to strings"""
+    import numpy as np
+
+    suffixes = np.char.add("_", rounds.astype(str))
+    return np.char.add(values, np.where(rounds > 0, suffixes, ""))
+
+
+def _synthesize_chunk(
+    data: ColumnarData,
+    varied: Mapping[str, float | None],
+    start: int,
+    stop: int,
+    rng: Any,
+) -> ColumnarData:
+    """Generate the rows from start to stop
+
+    `varied` maps the varied columns to their standard deviations, `None`
+    for the strings.
+    """
+    import numpy as np
+
+    nrows = len(next(iter(data.columns.values())))
+    indices = rng.integers(0, nrows, stop - start)
+    rounds = np.arange(start, stop) // nrows
+
+    columns, na = {}, {}
+    for name, column in data.columns.items():
+        values = np.asarray(column)[indices]
+        std = varied.get(name)
+        if name in varied and values.dtype.kind == "U":
+            values = _suffixed(values, rounds)
+        elif std:
+            values = values + rng.normal(0, std * NOISE_SCALE, len(values))
+
+        if name in data.na:
+            na[name] = np.asarray(data.na[name])[indices]
+        columns[name] = values
+
+    index = None
+    if data.index is not None:
+        index = np.asarray(data.index)[indices]
+        if index.dtype.kind == "U":
+            index = _suffixed(index, rounds)
+    return ColumnarData(columns, index, na)
+
+
+def _iter_synthesize(
+    data: ColumnarData,
+    factors: Mapping,
+    dtypes: Mapping[str, str],
+    n_rows: int,
+    seed: int | None,
+    chunksize: int,
+) -> Iterator[ColumnarData]:
+    """Generate the columns chunk by chunk"""
+    import numpy as np
+
+    varied = {
+        name: (
+            None if data.columns[name].dtype.kind == "U"
+            else float(np.nanstd(data.columns[name]))
+        )
+        for name in _varied_columns(data, factors, dtypes)
+    }
+    nchunks = -(-n_rows // chunksize)
+    seeds = np.random.SeedSequence(seed).spawn(nchunks)
+    for i, chunk_seed in enumerate(seeds):
+        start = i * chunksize
+        stop = min(start + chunksize, n_rows)
+        yield _synthesize_chunk(
+            data,
+            varied,
+            start,
+            stop,
+            np.random.default_rng(chunk_seed),
+        )
+
+
+def _synthesize(
+    name: str,
+    n_rows: int,
+    seed: int | None,
+    chunksize: int | None,
+) -> tuple:
+    """Generate the columnar data, or the chunks of it, and the factors"""
+    if n_rows < 0:
+        raise ValueError("`n_rows` must be a non-negative integer.")
+    if chunksize is not None and chunksize < 1:
+        raise ValueError("`chunksize` must be a positive integer.")
+
+    name = name.lower()
+    data = load_columns(name, metadata)
+    schema = _schema(name)
+    factors = _factors(schema, data)
+    chunks = _iter_synthesize(
+        data,
+        factors,
+        schema.dtypes if schema else {},
+        n_rows,
+        seed,
+        chunksize or n_rows or 1,
+    )
+    if chunksize is not None:
+        return chunks, factors
+
+    import numpy as np
+
+    # take the empty slices of the data for no rows
+    chunks = list(chunks) or [
+        ColumnarData(
+            {col: np.asarray(arr)[:0] for col, arr in data.columns.items()},
+            None if data.index is None else np.asarray(data.index)[:0],
+            {col: np.asarray(mask)[:0] for col, mask in data.na.items()},
+        )
+    ]
+    out = ColumnarData(
+        {
+            col: np.concatenate([chunk.columns[col] for chunk in chunks])
+            for col in data.columns
+        },
+        None if data.index is None
+        else np.concatenate([chunk.index for chunk in chunks]),
+        {
+            col: np.concatenate([chunk.na[col] for chunk in chunks])
+            for col in data.na
+        },
+    )
+    return out, factors
+
+
+def synthesize_columns(
+    name: str,
+    n_rows: int,
+    seed: int = None,
+    chunksize: int = None,
+) -> Dict[str, Any] | Iterator[Dict[str, Any]]:
+    """Generate a larger version of a dataset, as numpy arrays
+
+    The factors are string arrays with the values in their levels, and the
+    strings with missing values are object arrays with `None`. Use
+    `synthesize()` for the frames with the factors and the rownames.
+
+    Args:
+        name: The name of the dataset
+        n_rows: The number of rows to generate
+        seed: The random seed, for reproducible data
+        chunksize: If given, return an iterator of the chunks with at most
+            `chunksize` rows, to generate more rows than the memory holds.
+
+    Returns:
+        The columns (name => array), or an iterator of them
+    """
+    out, _ = _synthesize(name, n_rows, seed, chunksize)
+    if chunksize is not None:
+        return map(_with_na, out)
+    return _with_na(out)
+
+
+def synthesize(
+    name: str,
+    n_rows: int,
+    seed: int = None,
+    chunksize: int = None,
+    __backend: str = None,
+) -> Any:
+    """Generate a larger version of a dataset, as a data frame
+
+    The frames are constructed by `tibble()` of the backend, with the
+    `category` and `ordered` columns of the schema as factors (by
+    `factor()`), and the index of the dataset as the rownames (by
+    `column_to_rownames()`).
+
+    Args:
+        name: The name of the dataset
+        n_rows: The number of rows to generate
+        seed: The random seed, for reproducible data
+        chunksize: If given, return an iterator of frames with at most
+            `chunksize` rows.
+        __backend: The backend to construct the frames
+
+    Returns:
+        The data frame, or an iterator of them
+    """
+    out, factors = _synthesize(name, n_rows, seed, chunksize)
+    if chunksize is None:
+        return _to_frame(out, factors, __backend)
+    return (_to_frame(chunk, factors, __backend) for chunk in out)
@@ -1,11 +1,15 @@
 
 from .core.load_plugins import plugin as _plugin
 from .core.options import get_option as _get_option
+from .core.api_index import CONFLICT_NAMES as _CONFLICT_NAMES
 from .apis.dplyr import *
+from .apis.dplyr import _LAZY_VERBS
 
 locals().update(_plugin.hooks.dplyr_api())
 __all__ = [key for key in locals() if not key.startswith("_")]
-_conflict_names = {"filter", "slice"}
+# imported from datar.core.plan when they are used, see __getattr__
+__all__.extend(name for name in _LAZY_VERBS if name not in __all__)
+_conflict_names = _CONFLICT_NAMES["dplyr"]
 
 if _get_option("allow_conflict_names"):
     __all__.extend(_conflict_names)
@@ -16,6 +20,11 @@ if _get_option("allow_conflict_names"):
 def __getattr__(name):
     """Even when allow_conflict_names is False, datar.base.sum should be fine
     """
+    if name in _LAZY_VERBS:
+        from .core import plan
+
+        return getattr(plan, name)
+
     if name in _conflict_names:
         import sys
         import ast
@@ -1,6 +1,21 @@
+import os
+
+import pytest
 from datar import options
 
 
 def pytest_sessionstart(session):
     # Load no plugins
     options(backends=[None])
+
+
+@pytest.fixture(scope="session", autouse=True)
+def dataset_cache_dir(tmp_path_factory):
+    # Don't write the dataset cache into the home directory
+    old = os.environ.get("DATAR_CACHE_DIR")
+    os.environ["DATAR_CACHE_DIR"] = str(tmp_path_factory.mktemp("cache"))
+    yield
+    if old is None:
+        del os.environ["DATAR_CACHE_DIR"]
+    else:  # pragma: no cover
+        os.environ["DATAR_CACHE_DIR"] = old
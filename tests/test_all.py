@@ -0,0 +1,65 @@
+import sys
+import subprocess
+
+
+def _run(code):
+    p = subprocess.run([sys.executable, "-c", code], capture_output=True)
+    assert p.returncode == 0, p.stderr.decode()
+    return p.stdout.decode()
+
+
+def test_api_index_up_to_date():
+    out = _run(
+        "from datar.core.api_index import API_INDEX, build_index\n"
+        "from datar.core.options import get_option\n"
+        "assert build_index() == API_INDEX\n"
+        "assert get_option('backends') == []\n"
+    )
+    assert out == ""
+
+
+def test_import_only_needed_namespace():
+    _run(
+        "import sys\n"
+        "from datar.all import mutate\n"
+        "assert 'datar.dplyr' in sys.modules\n"
+        "for ns in ('forcats', 'tibble', 'tidyr', 'misc'):\n"
+        "    assert f'datar.{ns}' not in sys.modules, ns\n"
+    )
+
+
+def test_all_and_dir():
+    import datar.all as d
+
+    assert "mutate" in d.__all__
+    assert "f" in d.__all__
+    assert "sum" not in d.__all__
+    assert "mutate" in dir(d)
+
+
+def test_no_typing_names():
+    import datar.all as d
+    from datar.core.api_index import API_INDEX
+
+    for name in ("Any", "T"):
+        assert name not in API_INDEX
+        assert name not in d.__all__
+
+
+def test_backend_overrides_as_star_import():
+    out = _run(
+        "from datar.core.plugin import plugin\n"
+        "class Override:\n"
+        "    name = 'override'\n"
+        "    @plugin.impl\n"
+        "    def tidyr_api():\n"
+        "        return {'mutate': 'overridden'}\n"
+        "plugin.register(Override)\n"
+        "plugin.get_plugin('override').enable()\n"
+        "from datar.all import mutate, select\n"
+        "ns = {}\n"
+        "exec('from datar.all import *', ns)\n"
+        "assert mutate == ns['mutate'] == 'overridden', mutate\n"
+        "assert select is ns['select']\n"
+    )
+    assert out == ""
@@ -0,0 +1,279 @@
+import json
+
+import pytest
+from datar.bench.__main__ import main
+from datar.bench.startup import profile_startup
+from datar.bench.dispatch import check_budgets, run_dispatch_benchmarks
+from datar.bench.verbs import compare_results, run_benchmarks
+
+
+def test_profile_startup():
+    out = profile_startup(repeat=2, backends=["nosuch"])
+    names = [step["name"] for step in out["steps"]]
+    assert names[:5] == ["pipda", "executing", "simplug", "simpleconf", "datar"]
+    assert "load_plugins" in names
+    assert "dplyr_api" in names
+    for step in out["steps"]:
+        assert step["time"] >= 0
+        assert "memory" in step and "peak_memory" in step
+
+    assert out["total"]["time"] > 0
+
+
+def test_startup_cli(tmp_path):
+    outfile = tmp_path / "startup.json"
+    main(["startup", "--backends", "nosuch", "-o", str(outfile)])
+    out = json.loads(outfile.read_text())
+    assert out["repeat"] == 1
+    assert out["steps"][0]["kind"] == "dependency"
+
+
+@pytest.fixture
+def list_benchmark():
+    from datar.bench import verbs
+
+    @verbs.benchmark("testlist", setup=lambda size, backend: list(range(size)))
+    def run(data, backend):
+        return sorted(data, reverse=True)
+
+    yield "testlist"
+    del verbs.BENCHMARKS["testlist"]
+
+
+def test_run_benchmarks(list_benchmark):
+    out = run_benchmarks(
+        [list_benchmark, "mutate"],
+        sizes=[10, 1000],
+        backends=["nosuch"],
+        repeat=2,
+    )
+    assert out["repeat"] == 2
+    results = out["results"]
+    assert [(res["benchmark"], res["size"]) for res in results] == [
+        ("testlist", 10),
+        ("mutate", 10),
+        ("testlist", 1000),
+        ("mutate", 1000),
+    ]
+    assert results[2]["time"] > 0
+    assert results[2]["peak_memory"] > results[0]["peak_memory"]
+    # no backend to construct the data
+    assert "error" in results[1] and "time" not in results[1]
+
+    with pytest.raises(ValueError):
+        run_benchmarks(["nosuch"], backends=[])
+
+
+def test_run_benchmarks_with_backend():
+    from datar.bench import verbs
+    from datar.core.backends import current_backend
+
+    @verbs.benchmark("testbackend", setup=lambda size, backend: backend)
+    def run(data, backend):
+        seen.append((data, backend, current_backend("operator")))
+
+    seen = []
+    try:
+        out = run_benchmarks(
+            ["testbackend"],
+            sizes=[1],
+            backends=["nosuch1", "nosuch2"],
+            repeat=1,
+        )
+    finally:
+        del verbs.BENCHMARKS["testbackend"]
+
+    assert all("error" not in res for res in out["results"])
+    assert set(seen) == {
+        ("nosuch1", "nosuch1", "nosuch1"),
+        ("nosuch2", "nosuch2", "nosuch2"),
+    }
+
+
+def test_compare_results():
+    def results(time, memory):
+        return {
+            "results": [
+                {
+                    "benchmark": "mutate",
+                    "backend": "pandas",
+                    "size": 10,
+                    "time": time,
+                    "peak_memory": memory,
+                },
+                {
+                    "benchmark": "nest",
+                    "backend": "pandas",
+                    "size": 10,
+                    "error": "failed",
+                },
+            ]
+        }
+
+    assert compare_results(results(1.0, 100), results(1.2, 120)) == []
+    regressions = compare_results(results(1.0, 100), results(2.0, 120))
+    assert len(regressions) == 1
+    assert regressions[0]["metric"] == "time"
+    assert regressions[0]["ratio"] == 2.0
+    assert len(compare_results(results(1.0, 100), results(1.2, 120), 1.1)) == 2
+
+    # starts failing
+    failing = results(1.0, 100)
+    failing["results"][0] = {
+        "benchmark": "mutate",
+        "backend": "pandas",
+        "size": 10,
+        "error": "KeyError: 'x'",
+    }
+    regressions = compare_results(results(1.0, 100), failing)
+    assert [reg["metric"] for reg in regressions] == ["time", "peak_memory"]
+    assert regressions[0]["current"] is None
+    assert regressions[0]["ratio"] == float("inf")
+    assert regressions[0]["error"] == "KeyError: 'x'"
+
+
+def test_verbs_cli(tmp_path, list_benchmark):
+    outfile = tmp_path / "verbs.json"
+    argv = [
+        "verbs",
+        "--benchmarks",
+        list_benchmark,
+        "--sizes",
+        "10",
+        "--backends",
+        "nosuch",
+        "-o",
+        str(outfile),
+    ]
+    assert main(argv) == 0
+    out = json.loads(outfile.read_text())
+    assert out["results"][0]["size"] == 10
+
+    out["results"][0]["time"] = 1e-12
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(out))
+    assert main([*argv, "--baseline", str(baseline)]) == 1
+    out = json.loads(outfile.read_text())
+    assert out["regressions"][0]["metric"] == "time"
+
+
+def test_run_dispatch_benchmarks():
+    from datar.bench.dispatch import BUDGETS
+    from datar.core.plugin import plugin
+
+    out = run_dispatch_benchmarks(repeat=1, number=10)
+    assert [res["case"] for res in out["results"]] == list(BUDGETS)
+    assert all(res["time"] > 0 for res in out["results"])
+    assert out["total"] == sum(res["time"] for res in out["results"])
+    # the private backend is only enabled while running
+    assert "_benchdispatch" not in plugin.get_enabled_plugin_names()
+
+    with pytest.raises(ValueError):
+        run_dispatch_benchmarks(["nosuch"])
+
+
+def test_check_budgets():
+    results = {
+        "results": [
+            {"case": "operator", "time": 100.0},
+            {"case": "c_getitem", "time": 300.0},
+        ]
+    }
+    assert check_budgets(results) == []
+    over = check_budgets(results, {"c_getitem": 200, "other": 1})
+    assert over == [{"case": "c_getitem", "time": 300.0, "budget": 200}]
+
+
+def test_dispatch_cli(tmp_path):
+    # The default budgets are checked by CI, not here, where the timing
+    # can be distorted, e.g. by coverage
+    outfile = tmp_path / "dispatch.json"
+    generous = tmp_path / "generous.json"
+    generous.write_text(json.dumps({"operator": 1e12}))
+    budget = tmp_path / "budget.json"
+    budget.write_text(json.dumps({"operator": 1e-3}))
+    argv = ["dispatch", "--cases", "operator", "--repeat", "1"]
+
+    assert main([*argv, "--budget", str(generous), "-o", str(outfile)]) == 0
+    assert json.loads(outfile.read_text())["over_budget"] == []
+
+    assert main([*argv, "--budget", str(budget), "-o", str(outfile)]) == 1
+    out = json.loads(outfile.read_text())
+    assert out["over_budget"][0]["case"] == "operator"
+
+
+def test_run_thread_scaling():
+    from datar.bench.dispatch import run_thread_scaling
+
+    out = run_thread_scaling(threads=(1, 2), calls=5, cases=["operator"])
+    assert [res["threads"] for res in out["results"]] == [1, 2]
+    assert out["results"][0]["speedup"] == 1.0
+    assert out["results"][1]["throughput"] > 0
+    assert isinstance(out["gil_enabled"], bool)
+
+
+def test_thread_scaling_cli(tmp_path):
+    outfile = tmp_path / "threads.json"
+    argv = ["dispatch", "--cases", "c_getitem", "--threads", "1", "2"]
+    assert main([*argv, "-o", str(outfile)]) == 0
+    assert len(json.loads(outfile.read_text())["results"]) == 2
+
+    # can't scale that much
+    assert main([*argv, "--scaling", "100", "-o", str(outfile)]) == 1
+    out = json.loads(outfile.read_text())
+    assert out["not_scaling"][0]["threads"] == 2
+
+
+def test_check_scaling():
+    from datar.bench.dispatch import check_scaling
+
+    def results(*speedups):
+        return {
+            "results": [
+                {"threads": 2 ** i, "speedup": speedup}
+                for i, speedup in enumerate(speedups)
+            ]
+        }
+
+    assert check_scaling(results(1.0, 1.5, 2.5)) == []
+    assert check_scaling(results(1.0, 1.2, 3.0)) == [
+        {"threads": 2, "speedup": 1.2, "expected": 1.25}
+    ]
+    assert check_scaling(results(1.0, 1.5, 2.5), efficiency=0.8) == [
+        {"threads": 2, "speedup": 1.5, "expected": 1.6},
+        {"threads": 4, "speedup": 2.5, "expected": 3.2},
+    ]
+
+
+def test_dispatch_backend_removed_after_run():
+    import warnings
+    from datar.bench.dispatch import BACKEND
+    from datar.core.plugin import plugin
+
+    class OtherOperatePlugin:
+        name = "testotheroperate"
+
+        @plugin.impl
+        def operate(op, x, y=None):
+            return None
+
+    # not warned for multiple operate() implementations
+    with plugin.plugins_context([OtherOperatePlugin]):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            run_dispatch_benchmarks(
+                cases=["operator", "operator_hook"],
+                repeat=1,
+                number=10,
+            )
+    assert BACKEND not in plugin.get_all_plugin_names()
+
+    from datar.bench.dispatch import _identity, _touch
+    from datar.core.backends import current_backend
+    from datar.core.operator import DatarOperator
+
+    # the implementations are removed, and the backend is not selected
+    assert BACKEND not in _touch.registry
+    assert BACKEND not in _identity.registry
+    assert all(BACKEND not in impls for impls in DatarOperator._table.values())
+    assert current_backend("operator") is None
@@ -0,0 +1,199 @@
+import copy
+
+import pytest
+from pipda import Context, evaluate_expr, register_func, register_verb
+from pipda.context import ContextError
+
+from datar import f
+from datar.core import compiled
+from datar.core.compiled import (
+    column_deps,
+    compile_expr,
+    evaluate_assignments,
+    evaluate_compiled,
+    evaluate_exprs,
+)
+from datar.core.expr import expr_key
+from datar.core.operator import DatarOperator
+from datar.core.plugin import plugin
+
+
+class TestCompiledPlugin:
+
+    name = "testcompiled"
+
+
+@register_func(cls=object, dispatchable="args")
+def double(x):
+    return x * 2
+
+
+@register_func(plain=True)
+def add(x, y=0):
+    return x + y
+
+
+@pytest.fixture(scope="module", autouse=True)
+def int_operators():
+    plugin.register(TestCompiledPlugin)
+    plugin.get_plugin("testcompiled").enable()
+    table = copy.deepcopy(DatarOperator._table)
+    for op in ("add", "mul", "sub", "neg"):
+        DatarOperator.register(op, int, object, backend="testcompiled")(
+            getattr(int, f"__{op}__")
+        )
+    yield
+    DatarOperator._table = table
+    plugin.get_plugin("testcompiled").disable()
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        f["x"] * 2 + 1,
+        -f["x"] - f["y"],
+        1 - f["x"],
+        double(f["x"]) + add(f["y"], y=3),
+        [f["x"], f["y"] * 2, 3],
+        (f["x"],),
+        {"a": f["x"]},
+        f[f["z"]],
+        f,
+        5,
+    ],
+)
+def test_compiled_same_as_evaluated(expr):
+    data = {"x": 2, "y": 3, "z": "x"}
+    assert evaluate_compiled(expr, data, Context.EVAL) == evaluate_expr(
+        expr, data, Context.EVAL
+    )
+
+
+def test_compiled_cached_by_structure():
+    assert compile_expr(f["x"] * 2 + 1) is compile_expr(f["x"] * 2 + 1)
+    assert compile_expr(f["x"] * 2 + 1) is not compile_expr(f["x"] * 2 + 2)
+    # unhashable, not cached
+    assert compile_expr({"a": f["x"]}) is not compile_expr({"a": f["x"]})
+
+
+def test_compiled_cache_bounded(monkeypatch):
+    monkeypatch.setattr(compiled, "COMPILED_CACHE_SIZE", 2)
+    compiled._COMPILED_CACHE.clear()
+    first = compile_expr(f["a"] + 1)
+    compile_expr(f["b"] + 1)
+    assert compile_expr(f["a"] + 1) is first
+    compile_expr(f["c"] + 1)
+    assert len(compiled._COMPILED_CACHE) == 2
+    # f["b"] + 1 is the least recently used one
+    assert expr_key(f["b"] + 1) not in compiled._COMPILED_CACHE
+    assert compile_expr(f["a"] + 1) is first
+
+
+def test_compiled_reference_needs_context():
+    with pytest.raises(ContextError):
+        evaluate_compiled(f["x"], {"x": 1})
+
+
+def test_evaluate_exprs_shares_common_subexprs():
+    calls = []
+
+    @register_func
+    def mean(x):
+        calls.append(x)
+        return x
+
+    data = {"x": 2}
+    exprs = [(f["x"] - mean(f["x"])) * 3, -(f["x"] - mean(f["x"])), 1]
+    out = evaluate_exprs(exprs, data, [Context.EVAL] * 3)
+    assert out == [0, 0, 1]
+    assert len(calls) == 1
+
+    # memo is not kept between evaluations
+    evaluate_exprs(exprs, data, [Context.EVAL] * 3)
+    assert len(calls) == 2
+    # nor used outside
+    evaluate_compiled(exprs[0], data, Context.EVAL)
+    assert len(calls) == 3
+
+
+def test_evaluate_exprs_volatile():
+    calls = []
+
+    @register_func
+    def rand(x):
+        calls.append(x)
+        return len(calls)
+
+    rand.volatile = True
+    out = evaluate_exprs(
+        [rand(f["x"]) + 0, rand(f["x"]) + 0],
+        {"x": 1},
+        [Context.EVAL] * 2,
+    )
+    assert out == [1, 2]
+
+
+def test_evaluate_assignments_sequential():
+    calls = []
+
+    @register_func
+    def mean(x):
+        calls.append(x)
+        return x
+
+    @register_verb(dict, context=Context.PENDING)
+    def mutate(_data, **kwargs):
+        data, _ = evaluate_assignments(
+            kwargs,
+            _data,
+            [Context.EVAL] * len(kwargs),
+            lambda data, name, value: {**data, name: value},
+        )
+        return data
+
+    data = {"x": 2}
+    out = data >> mutate(y=f["x"] * 2, z=f["y"] + 1)
+    assert out == {"x": 2, "y": 4, "z": 5}
+
+    out = data >> mutate(x=f["x"] + 1, y=f["x"])
+    assert out == {"x": 3, "y": 3}
+
+    # shared while x is not reassigned
+    out = data >> mutate(a=mean(f["x"]) + 0, b=mean(f["x"]) + 0)
+    assert out == {"x": 2, "a": 2, "b": 2}
+    assert len(calls) == 1
+
+    # evaluated again after x is reassigned
+    out = data >> mutate(
+        a=mean(f["x"]) + 0,
+        x=f["x"] * 10,
+        b=mean(f["x"]) + 0,
+    )
+    assert out == {"x": 20, "a": 2, "b": 20}
+    assert len(calls) == 3
+
+
+def test_column_deps():
+    assert column_deps(f["x"] + f.y) == {"x", "y"}
+    assert column_deps(add(f["x"], y=[f["z"], 1])) == {"x", "z"}
+    assert column_deps(f[0]) is None
+    assert column_deps(f) is None
+    assert column_deps(1) == frozenset()
+
+
+def test_expr_key_float_constants():
+    assert expr_key(f["x"] * 0.0) != expr_key(f["x"] * -0.0)
+    assert expr_key(f["x"] * float("nan")) == expr_key(
+        f["x"] * float("nan")
+    )
+    assert expr_key(f["x"] * 1.0) != expr_key(f["x"] * 1)
+
+    @register_func
+    def plus(x, y):
+        return x + y
+
+    data = {"x": -0.0}
+    out = evaluate_compiled(plus(f["x"], 0.0), data, Context.EVAL)
+    assert str(out) == "0.0"
+    out = evaluate_compiled(plus(f["x"], -0.0), data, Context.EVAL)
+    assert str(out) == "-0.0"
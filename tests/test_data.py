@@ -26,3 +26,397 @@ def test_load_dataset():
 def test_no_such():
     with pytest.raises(NotImplementedByCurrentBackendError):
         from datar.data import nosuch  # noqa: F401
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATAR_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def test_load_columns_cached(cache_dir):
+    import numpy as np
+    from datar.data.cache import load_columns
+    from datar.data.metadata import metadata
+
+    data = load_columns("mtcars", metadata)
+    assert len(list(cache_dir.glob("mtcars-*"))) == 1
+    assert isinstance(data.columns["mpg"], np.memmap)
+    assert data.columns["cyl"].dtype == np.int64
+    assert data.index[0] == "Mazda RX4"
+
+    again = load_columns("mtcars", metadata)
+    assert list(again.columns) == list(data.columns)
+    assert (again.columns["mpg"] == data.columns["mpg"]).all()
+
+    sw = load_columns("starwars", metadata)
+    assert sw.na["hair_color"][1]
+    assert np.isnan(sw.columns["birth_year"]).any()
+
+
+def test_load_columns_source_changed(cache_dir, tmp_path):
+    from datar.data.cache import load_columns
+    from datar.data.metadata import Metadata
+
+    source = tmp_path / "test.csv"
+    source.write_text("a,b,c\n1,x,TRUE\n2,NA,FALSE\n")
+    metadata = {"test": Metadata("", "", False, source)}
+    data = load_columns("test", metadata)
+    assert list(data.columns["a"]) == [1, 2]
+    assert list(data.columns["c"]) == [True, False]
+    assert list(data.na["b"]) == [False, True]
+
+    source.write_text("a,b\n1.5,x\n")
+    data = load_columns("test", metadata)
+    assert list(data.columns["a"]) == [1.5]
+    assert len(list(cache_dir.glob("test-*"))) == 2
+
+
+def test_load_columns_no_cache(cache_dir):
+    from datar.core.options import options_context
+    from datar.data.cache import load_columns
+    from datar.data.metadata import metadata
+
+    with options_context(dataset_cache=False):
+        data = load_columns("iris", metadata)
+    assert data.columns["Species"][0] == "setosa"
+    assert not cache_dir.exists()
+
+
+def test_schemas_up_to_date():
+    from datar.data.schemas import SCHEMAS, build_schemas
+
+    assert build_schemas() == SCHEMAS
+
+
+def test_metadata_schema(cache_dir):
+    import numpy as np
+    from datar.data.cache import load_columns
+    from datar.data.metadata import Metadata, metadata
+
+    schema = metadata["diamonds"].schema
+    assert schema.dtypes["cut"] == "ordered"
+    assert schema.levels["cut"][0] == "Fair"
+    assert Metadata("", "", False, "x.csv").schema is None
+
+    data = load_columns("billboard", metadata)
+    assert data.columns["date.entered"].dtype == np.dtype("datetime64[D]")
+    assert metadata["billboard"].schema.dtypes["wk1"] == "int"
+
+
+def test_dataset_store():
+    from datar.data.store import DatasetStore, sizeof
+
+    loaded = []
+
+    def loader(name, size):
+        def load():
+            loaded.append(name)
+            return [name] * size
+
+        return load
+
+    store = DatasetStore(sizeof([0] * 200))
+    a = store.get("a", loader("a", 100))
+    a.append("x")
+    assert store.get("a", loader("a", 100)) == ["a"] * 100
+    assert loaded == ["a"]
+
+    store.get("b", loader("b", 80))
+    assert len(store) == 2
+    assert store.size <= store.limit
+    # a is evicted
+    store.get("c", loader("c", 100))
+    assert "a" not in store and "b" in store and "c" in store
+    # too large to be cached
+    store.get("d", loader("d", 500))
+    assert "d" not in store and len(store) == 2
+    store.clear()
+    assert len(store) == 0 and store.size == 0
+
+
+def test_dataset_store_shallow_copy():
+    from datar.data.store import DatasetStore
+
+    class Frame(dict):
+        def copy(self, deep=True):
+            copied.append(deep)
+            return Frame(self)
+
+    copied = []
+    store = DatasetStore(1 << 20)
+    store.get("a", lambda: Frame(x=[1]))
+    assert copied == [False]
+
+
+def test_dataset_store_copy_hook():
+    from datar.core.plugin import plugin
+    from datar.data.store import DatasetStore
+
+    class TestCopyPlugin:
+        name = "testcopy"
+
+        @plugin.impl
+        def copy_dataset(data):
+            return tuple(data)
+
+    plugin.register(TestCopyPlugin)
+    plugin.get_plugin("testcopy").enable()
+    try:
+        store = DatasetStore(1 << 20)
+        assert store.get("a", lambda: [1, 2]) == (1, 2)
+    finally:
+        plugin.get_plugin("testcopy").disable()
+
+
+def test_synthesize_columns(cache_dir):
+    import numpy as np
+    from datar.data.synthetic import synthesize_columns
+
+    out = synthesize_columns("billboard", 1000, seed=1)
+    assert len(out["artist"]) == 1000
+    assert out["date.entered"].dtype == np.dtype("datetime64[D]")
+    # categories kept, mostly unique strings varied
+    mpg = synthesize_columns("mpg", 1000, seed=1)
+    assert len(np.unique(mpg["manufacturer"])) <= 15
+    assert len(np.unique(mpg["model"])) <= 38
+    assert any(track.endswith("_3") for track in out["track"])
+    # missing values kept
+    starwars = synthesize_columns("starwars", 500, seed=1)
+    assert any(val is None for val in starwars["hair_color"])
+    assert np.isnan(starwars["height"]).any()
+
+    again = synthesize_columns("billboard", 1000, seed=1)
+    assert all((again[name] == out[name]).all() for name in ("artist", "wk1"))
+
+    chunks = list(synthesize_columns("iris", 25, seed=1, chunksize=10))
+    assert [len(chunk["Species"]) for chunk in chunks] == [10, 10, 5]
+    assert len(synthesize_columns("iris", 0)["Species"]) == 0
+
+    with pytest.raises(ValueError):
+        synthesize_columns("iris", -1)
+    with pytest.raises(ValueError):
+        synthesize_columns("iris", 1, chunksize=0)
+
+
+def test_synthesize_keeps_schema(cache_dir):
+    import numpy as np
+    from datar.data.synthetic import _synthesize, synthesize_columns
+
+    diamonds = synthesize_columns("diamonds", 200_000, seed=1)
+    # factors are not suffixed
+    assert set(diamonds["cut"]) == {
+        "Fair", "Good", "Very Good", "Premium", "Ideal"
+    }
+    assert diamonds["price"].dtype == np.int64
+
+    data, factors = _synthesize("diamonds", 10, 1, None)
+    assert factors["cut"] == (
+        ["Fair", "Good", "Very Good", "Premium", "Ideal"],
+        True,
+    )
+    # levels from the data when not in the schema
+    _, factors = _synthesize("gss_cat", 10, 1, None)
+    assert factors["race"] == (["Black", "Other", "White"], False)
+
+    data, _ = _synthesize("mtcars", 100, 1, None)
+    assert len(data.index) == 100
+    assert any(name.endswith("_3") for name in data.index)
+
+
+def test_synthesize_keeps_na_ints(cache_dir):
+    import numpy as np
+    from datar.data.metadata import metadata
+    from datar.data.synthetic import synthesize_columns
+
+    for name, n_rows in (
+        ("airquality", 1000),
+        ("starwars", 1000),
+        ("us_rent_income", 1000),
+    ):
+        dtypes = metadata[name].schema.dtypes
+        out = synthesize_columns(name, n_rows, seed=1)
+        for col, dtype in dtypes.items():
+            values = out[col]
+            if dtype == "float":
+                assert values.dtype.kind == "f"
+            elif dtype in ("int", "bool"):
+                assert values.dtype.kind in "iubf"
+                present = values[~np.isnan(values.astype(float))]
+                assert (present == np.round(present)).all(), (name, col)
+
+    solar = synthesize_columns("airquality", 1000, seed=1)["Solar_R"]
+    assert np.isnan(solar).any()
+
+
+def test_synthesize_to_frame(cache_dir, monkeypatch):
+    from datar.apis import base, tibble
+    from datar.data import synthesize
+
+    monkeypatch.setattr(
+        base,
+        "factor",
+        lambda x, levels, ordered, __backend: ("factor", levels, ordered),
+    )
+    monkeypatch.setattr(
+        tibble,
+        "tibble",
+        lambda __backend=None, **columns: columns,
+    )
+    monkeypatch.setattr(
+        tibble,
+        "column_to_rownames",
+        lambda frame, var, __ast_fallback, __backend: (
+            frame.pop(var),
+            frame,
+        ),
+    )
+
+    frame = synthesize("iris", 10, seed=1)
+    assert frame["Species"] == (
+        "factor",
+        ["setosa", "versicolor", "virginica"],
+        False,
+    )
+    rownames, frame = synthesize("mtcars", 10, seed=1)
+    assert len(rownames) == 10
+    assert "_rownames" not in frame
+
+
+def test_load_dataset_from_cache(cache_dir, monkeypatch):
+    from datar.apis import base, tibble
+    from datar.core.plugin import plugin
+    from datar.data import _store, cache, load_dataset
+
+    monkeypatch.setattr(
+        base,
+        "factor",
+        lambda x, levels, ordered, __backend: ("factor", levels, ordered),
+    )
+    monkeypatch.setattr(
+        tibble,
+        "tibble",
+        lambda __backend=None, **columns: columns,
+    )
+    monkeypatch.setattr(
+        tibble,
+        "column_to_rownames",
+        lambda frame, var, __ast_fallback, __backend: (
+            frame.pop(var),
+            frame,
+        ),
+    )
+    read_csv = cache._read_csv
+    parsed = []
+    monkeypatch.setattr(
+        cache,
+        "_read_csv",
+        lambda source, *args: parsed.append(source) or read_csv(source, *args),
+    )
+
+    class TestNoLoadPlugin:
+        name = "testnoload"
+
+        @plugin.impl
+        def load_dataset(name, metadata):
+            raise AssertionError("not loaded from the cache")
+
+    plugin.register(TestNoLoadPlugin)
+    plugin.get_plugin("testnoload").enable()
+    try:
+        iris = load_dataset("iris")
+        _store.clear()
+        again = load_dataset("iris")
+        rownames, mtcars = load_dataset("mtcars")
+    finally:
+        _store.clear()
+        plugin.get_plugin("testnoload").disable()
+
+    # parsed once, then loaded from the cache
+    assert len(parsed) == 2
+    assert iris["Species"][0] == "factor"
+    assert list(again["Sepal_Length"]) == list(iris["Sepal_Length"])
+    assert rownames[0] == "Mazda RX4"
+    assert "_rownames" not in mtcars
+
+
+def test_synthesize_no_backend(cache_dir):
+    from datar.data import synthesize
+
+    with pytest.raises(NotImplementedByCurrentBackendError):
+        synthesize("iris", 10)
+
+
+def test_preload(cache_dir):
+    import threading
+    from datar.core.plugin import plugin
+    from datar.data import _store, load_dataset, preload
+
+    # Both loads must be running at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=10)
+    loaded = []
+
+    class TestPreloadPlugin:
+        name = "testpreload"
+
+        @plugin.impl
+        def load_dataset(name, metadata):
+            barrier.wait()
+            loaded.append(name)
+            return [name]
+
+    plugin.register(TestPreloadPlugin)
+    plugin.get_plugin("testpreload").enable()
+    try:
+        assert preload(
+            "Iris",
+            "mtcars",
+            workers=2,
+            __backend="testpreload",
+        ) == ["iris", "mtcars"]
+        assert sorted(loaded) == ["iris", "mtcars"]
+        assert load_dataset("iris", "testpreload") == ["iris"]
+        assert len(loaded) == 2
+    finally:
+        _store.clear()
+        plugin.get_plugin("testpreload").disable()
+
+
+def test_preload_all(cache_dir):
+    from datar.core.plugin import plugin
+    from datar.data import _store, preload
+
+    loaded = []
+
+    class TestPreloadAllPlugin:
+        name = "testpreloadall"
+
+        @plugin.impl
+        def load_dataset(name, metadata):
+            # the backends read the source files
+            assert metadata[name].source.is_file()
+            loaded.append(name)
+            return [name]
+
+    plugin.register(TestPreloadAllPlugin)
+    plugin.get_plugin("testpreloadall").enable()
+    try:
+        names = preload(__backend="testpreloadall")
+    finally:
+        _store.clear()
+        plugin.get_plugin("testpreloadall").disable()
+
+    assert sorted(loaded) == sorted(names)
+    assert "iris" in names
+    # no source files bundled
+    assert "flights" not in names
+    assert "smith" not in names
+
+
+def test_preload_processes(cache_dir):
+    from datar.data import preload
+
+    with pytest.raises(NotImplementedByCurrentBackendError):
+        preload("iris", workers=1, processes=True)
+    # parsed into the columnar cache by the worker process
+    assert any(cache_dir.glob("iris-*/columns.json"))
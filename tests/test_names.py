@@ -170,3 +170,40 @@ def test_custom_repair():
 
     out = repair_names(["a", "b", "c"], repair=["x", "y", "z"])
     assert out == ["x", "y", "z"]
+
+
+def test_wide_names(caplog):
+    names = [f"x{i % 1000}" for i in range(100_000)]
+    out = repair_names(names, repair="unique")
+    assert len(set(out)) == len(out)
+    assert out[:2] == ["x0__0", "x1__1"]
+    assert out[-1] == "x999__99999"
+    # summarized in one record
+    records = [rec for rec in caplog.records if "New names" in rec.message]
+    assert len(records) == 1
+    assert "and 99990 more" in records[0].message
+
+    with pytest.raises(NameNonUniqueError, match="x0"):
+        repair_names(names, repair="check_unique")
+    distinct = [f"x{i}" for i in range(100_000)]
+    assert repair_names(distinct, repair="check_unique") == distinct
+
+
+def test_repair_names_cached(caplog):
+    from datar.core.names import _repair_names_cached
+
+    _repair_names_cached.cache_clear()
+    out = repair_names(["a", "a", "b"], repair="unique")
+    out.append("c")
+    assert repair_names(["a", "a", "b"], repair="unique") == [
+        "a__0",
+        "a__1",
+        "b",
+    ]
+    assert _repair_names_cached.cache_info().hits == 1
+    # logged for each call
+    assert caplog.text.count("New names") == 2
+
+    # not cached, 1 == True but the names are different
+    assert repair_names([1, True], repair="unique") == ["1", "True"]
+    assert _repair_names_cached.cache_info().currsize == 1
@@ -45,3 +45,106 @@ def test_options_context():
         assert not get_option("x_y_z")
 
     assert get_option("x_y_z")
+
+
+def test_options_context_nested_and_options_inside():
+    with options_context(x_y_z=False):
+        with options_context(**{"x.y.z": 1}):
+            assert get_option("x_y_z") == 1
+            assert get_option("x.y.z") == 1
+        assert get_option("x_y_z") is False
+        # set for the context only
+        options(x_y_z=2)
+        assert get_option("x_y_z") == 2
+        assert options()["x_y_z"] == 2
+        assert options("x_y_z") == {"x_y_z": 2}
+
+    assert get_option("x_y_z") is True
+
+
+def test_options_context_thread_local():
+    import threading
+
+    entered = threading.Event()
+    checked = threading.Event()
+    seen = []
+
+    def worker():
+        with options_context(x_y_z="worker"):
+            entered.set()
+            checked.wait(5)
+            seen.append(get_option("x_y_z"))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    entered.wait(5)
+    # not leaked from the worker
+    assert get_option("x_y_z") is True
+    with options_context(x_y_z="main"):
+        checked.set()
+        thread.join()
+        assert get_option("x_y_z") == "main"
+
+    assert seen == ["worker"]
+
+
+def test_options_context_asyncio():
+    import asyncio
+
+    async def task(value):
+        with options_context(x_y_z=value):
+            await asyncio.sleep(0.01)
+            return get_option("x_y_z")
+
+    async def main():
+        return await asyncio.gather(task(1), task(2))
+
+    assert asyncio.run(main()) == [1, 2]
+    assert get_option("x_y_z") is True
+
+
+def test_parallel_options_checked():
+    from concurrent.futures import ThreadPoolExecutor
+
+    assert get_option("executor") == "thread"
+    with pytest.raises(ValueError):
+        options(n_threads=0)
+    with pytest.raises(ValueError):
+        options(chunk_size=1.5)
+    with pytest.raises(ValueError):
+        options(executor="gpu")
+    with pytest.raises(ValueError):
+        with options_context(n_threads=True):
+            pass
+
+    with ThreadPoolExecutor(1) as executor:
+        options(n_threads=2, chunk_size=None, executor=executor)
+        assert get_option("executor") is executor
+
+
+def test_options_changed_pushed_to_backends():
+    from datar.core.plugin import plugin
+
+    pushed = []
+
+    class TestOptionsPlugin:
+        name = "testoptions"
+
+        @plugin.impl
+        def options_changed(changes):
+            pushed.append(changes)
+
+    plugin.register(TestOptionsPlugin)
+    plugin.get_plugin("testoptions").enable()
+    try:
+        options(n_threads=3, x_y_z=True)
+        # only the changed ones
+        assert pushed == [{"n_threads": 3}]
+        options(n_threads=3)
+        assert len(pushed) == 1
+        # not pushed for the context only
+        with options_context(n_threads=4):
+            assert get_option("n_threads") == 4
+        assert len(pushed) == 1
+    finally:
+        plugin.get_plugin("testoptions").disable()
@@ -0,0 +1,246 @@
+import os
+import time
+import threading
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+import numpy as np
+import pytest
+
+from datar.apis.dplyr import group_map
+from datar.core.backends import current_backend, use_backend
+from datar.core.options import get_option, options_context
+from datar.core.parallel import (
+    SharedArray,
+    _share,
+    _unshare,
+    _release,
+    _run_shared,
+    executor_context,
+    map_groups,
+)
+
+
+def _summarise(x, key, scale=1):
+    # module-level, so that it's picklable for the process pools
+    return key, float(x.sum()) * scale, os.getpid()
+
+
+def _unpack_summarise(group, scale):
+    return _summarise(*group, scale=scale)
+
+
+def _columns(columns, key):
+    return key, {name: col.tolist() for name, col in columns.items()}
+
+
+def _fail(x):
+    if x == 3:
+        raise ValueError("group 3")
+    return x
+
+
+def _shm_names():
+    try:
+        return set(os.listdir("/dev/shm"))
+    except FileNotFoundError:  # pragma: no cover
+        return set()
+
+
+def test_map_groups_serial_by_default():
+    out = map_groups(
+        lambda x, y: (x, y, threading.get_ident()),
+        [(1,), (2,)],
+        3,
+    )
+    assert out == [
+        (1, 3, threading.get_ident()),
+        (2, 3, threading.get_ident()),
+    ]
+
+
+def test_map_groups_threads_ordered():
+    def func(x):
+        # the earlier groups finish later
+        time.sleep(0.01 * (10 - x))
+        return x, threading.get_ident()
+
+    out = map_groups(func, [(i,) for i in range(10)], _n_jobs=4)
+    assert [x for x, _ in out] == list(range(10))
+    assert len({ident for _, ident in out}) > 1
+
+
+def test_map_groups_threads_with_context():
+    def func(x):
+        return x, get_option("x_y_z_parallel"), current_backend("c")
+
+    with options_context(x_y_z_parallel=1), use_backend("numpy"):
+        out = map_groups(func, [(i,) for i in range(4)], _n_jobs=2)
+    assert out == [(i, 1, "numpy") for i in range(4)]
+
+
+def test_map_groups_options():
+    with ThreadPoolExecutor(2) as executor:
+        with options_context(executor=executor):
+            # not used without _n_jobs
+            with executor_context() as (used, n_jobs):
+                assert used is None
+            with executor_context(n_jobs=2) as (used, n_jobs):
+                assert used is executor
+            assert map_groups(lambda x: x * 2, [(1,), (2,)], _n_jobs=2) == [
+                2,
+                4,
+            ]
+        # not shut down
+        assert executor.submit(lambda: 1).result() == 1
+
+    # n_threads is for the backends, not for the groups
+    with options_context(n_threads=2, executor="process"):
+        with executor_context() as (used, n_jobs):
+            assert used is None
+        with executor_context(n_jobs=2) as (used, n_jobs):
+            assert isinstance(used, ProcessPoolExecutor)
+            assert n_jobs == 2
+        with executor_context(n_jobs=1) as (used, n_jobs):
+            assert used is None
+
+
+def test_map_groups_other_executors():
+    class OtherExecutor(Executor):
+        """Not a thread pool, e.g. loky"""
+
+        def __init__(self):
+            self.submitted = []
+            self.pool = ProcessPoolExecutor(2)
+
+        def submit(self, fn, *args, **kwargs):
+            self.submitted.append(fn)
+            return self.pool.submit(fn, *args, **kwargs)
+
+    executor = OtherExecutor()
+    try:
+        out = map_groups(
+            _summarise,
+            [(np.arange(3.0), "a"), (np.ones(2), "b")],
+            _executor=executor,
+        )
+    finally:
+        executor.pool.shutdown()
+    assert [(key, total) for key, total, _ in out] == [("a", 3.0), ("b", 2.0)]
+    assert executor.submitted == [_run_shared, _run_shared]
+
+
+def test_map_groups_invalid():
+    with pytest.raises(ValueError, match="_n_jobs"):
+        map_groups(_fail, [(1,)], _n_jobs=0)
+    with pytest.raises(ValueError, match="_executor"):
+        map_groups(_fail, [(1,)], _executor="gpu", _n_jobs=2)
+
+
+def test_map_groups_error_cancels_the_rest():
+    with pytest.raises(ValueError, match="group 3"):
+        map_groups(_fail, [(i,) for i in range(20)], _n_jobs=2)
+
+
+def test_share_and_unshare():
+    blocks = []
+    arr = np.arange(12.0).reshape(3, 4)[:, 1]
+    group = (
+        {"a": arr, "b": np.array(["x", "y"]), "c": np.array([None, 1])},
+        [np.array([], dtype=int)],
+        "key",
+    )
+    shared = _share(group, blocks)
+    assert len(blocks) == 2
+    assert isinstance(shared[0]["a"], SharedArray)
+    assert isinstance(shared[0]["b"], SharedArray)
+    # object arrays and empty arrays are pickled as usual
+    assert shared[0]["c"] is group[0]["c"]
+    assert shared[1][0] is group[1][0]
+    assert shared[2] == "key"
+
+    attached = []
+    out = _unshare(shared, attached)
+    assert out[0]["a"].tolist() == [1.0, 5.0, 9.0]
+    assert out[0]["b"].tolist() == ["x", "y"]
+    out = None
+    _release(attached, unlink=False)
+    _release(blocks, unlink=True)
+    assert blocks == []
+
+
+def test_map_groups_processes_shared_memory():
+    before = _shm_names()
+    groups = [(np.arange(i + 1.0), i) for i in range(6)]
+    out = map_groups(
+        _summarise,
+        groups,
+        scale=2,
+        _executor="process",
+        _n_jobs=2,
+    )
+    assert [(key, total) for key, total, _ in out] == [
+        (i, (i + 1) * i * 1.0) for i in range(6)
+    ]
+    assert {pid for _, _, pid in out} - {os.getpid()}
+
+    out = map_groups(
+        _columns,
+        [({"x": np.array([1, 2]), "y": np.array(["a", "b"])}, "g")],
+        _executor="process",
+        _n_jobs=2,
+    )
+    assert out == [("g", {"x": [1, 2], "y": ["a", "b"]})]
+    # all the blocks are unlinked
+    assert _shm_names() <= before
+
+
+class _Groups(list):
+    """The groups of a frame, by a test backend"""
+
+
+@group_map.register(_Groups, backend="testparallel")
+def _group_map(
+    _data,
+    _f,
+    *args,
+    _keep=False,
+    _executor=None,
+    _n_jobs=None,
+    **kwargs,
+):
+    return map_groups(
+        _f,
+        ((group,) for group in _data),
+        *args,
+        _executor=_executor,
+        _n_jobs=_n_jobs,
+        **kwargs,
+    )
+
+
+def test_group_map_through_verb():
+    groups = _Groups((np.arange(i + 1.0), i) for i in range(5))
+
+    def summarise(group):
+        return group[1], float(group[0].sum()), threading.get_ident()
+
+    out = groups >> group_map(summarise)
+    assert [x[:2] for x in out] == [(i, (i + 1) * i / 2) for i in range(5)]
+    assert {x[2] for x in out} == {threading.get_ident()}
+
+    out = groups >> group_map(summarise, _n_jobs=2)
+    assert [x[:2] for x in out] == [(i, (i + 1) * i / 2) for i in range(5)]
+
+    out = group_map(
+        groups,
+        _unpack_summarise,
+        scale=2,
+        _executor="process",
+        _n_jobs=2,
+        __ast_fallback="normal",
+    )
+    assert [x[:2] for x in out] == [(i, (i + 1) * i) for i in range(5)]
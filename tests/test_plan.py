@@ -0,0 +1,266 @@
+import copy
+
+import numpy as np
+import pytest
+from pipda import Context
+
+from datar import f
+from datar.apis.dplyr import (
+    arrange,
+    collect,
+    filter_,
+    group_by,
+    lazy,
+    mutate,
+    rename,
+    select,
+    summarise,
+)
+from datar.core.backends import unregister_backend
+from datar.core.plugin import plugin, dispatch_last_avail
+from datar.core.operator import DatarOperator
+from datar.core.plan import LazyFrame, LogicalPlan
+
+BACKEND = "testplan"
+
+
+class Frame(dict):
+    """A minimal data frame: column name => numpy array"""
+
+
+class NativeFrame(Frame):
+    """A frame that the backend runs the plans for"""
+
+
+class TestPlanPlugin:
+
+    name = BACKEND
+
+    @plugin.impl
+    def execute_plan(plan):
+        if not isinstance(plan.data, NativeFrame):
+            return None
+        return [step._pipda_func.__name__ for step in plan.steps]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def frame_backend():
+    plugin.register(TestPlanPlugin)
+    plugin.get_plugin(BACKEND).enable()
+    table = copy.deepcopy(DatarOperator._table)
+    calls = []
+
+    for op in ("add", "gt", "lt", "mul"):
+        DatarOperator.register(op, np.ndarray, object, backend=BACKEND)(
+            getattr(np.ndarray, f"__{op}__")
+        )
+
+    @filter_.register(Frame, backend=BACKEND, context=Context.EVAL)
+    def _filter(_data, *conditions, _preserve=False):
+        calls.append(("filter", len(next(iter(_data.values())))))
+        mask = np.logical_and.reduce(conditions)
+        return Frame((key, val[mask]) for key, val in _data.items())
+
+    @mutate.register(Frame, backend=BACKEND, context=Context.EVAL)
+    def _mutate(_data, **kwargs):
+        calls.append(("mutate", sorted(_data)))
+        return Frame(_data, **kwargs)
+
+    @arrange.register(Frame, backend=BACKEND, context=Context.EVAL)
+    def _arrange(_data, *args, _by_group=False):
+        calls.append(("arrange", len(next(iter(_data.values())))))
+        order = np.lexsort(args[::-1])
+        return Frame((key, val[order]) for key, val in _data.items())
+
+    @select.register(Frame, backend=BACKEND, context=Context.EVAL)
+    def _select(_data, *args):
+        calls.append(("select", list(args)))
+        return Frame((key, _data[key]) for key in args)
+
+    @rename.register(Frame, backend=BACKEND, context=Context.EVAL)
+    def _rename(_data, **kwargs):
+        calls.append(("rename", kwargs))
+        olds = {old: new for new, old in kwargs.items()}
+        return Frame((olds.get(key, key), val) for key, val in _data.items())
+
+    yield calls
+
+    for verb in (filter_, mutate, arrange, select, rename):
+        unregister_backend(verb, BACKEND)
+    DatarOperator._table = table
+    plugin.get_plugin(BACKEND).disable()
+
+
+@pytest.fixture
+def calls(frame_backend):
+    frame_backend.clear()
+    return frame_backend
+
+
+@pytest.fixture
+def df():
+    return Frame(
+        x=np.array([3, 1, 2, 5]),
+        y=np.array([4, 3, 2, 1]),
+        z=np.array([0, 0, 1, 1]),
+    )
+
+
+def _steps(lf):
+    return [str(step) for step in lf.plan.optimize().steps]
+
+
+def test_lazy_records(df, calls):
+    out = lazy(df) >> filter_(f["x"] > 1)
+    assert isinstance(out, LazyFrame)
+    assert isinstance(out.plan, LogicalPlan)
+    assert len(out.plan.steps) == 1
+    assert calls == []
+    assert repr(out) == "<LazyFrame: 1 step(s) recorded>"
+
+
+def test_collect_non_lazy():
+    assert collect(1) == 1
+
+
+def test_plan_imported_on_access():
+    import sys
+    import subprocess
+
+    code = (
+        "import sys, datar.dplyr as d\n"
+        "assert 'datar.core.plan' not in sys.modules\n"
+        "from datar.all import lazy\n"
+        "assert 'datar.core.plan' in sys.modules\n"
+        "from datar.core.plan import collect\n"
+        "assert lazy is d.lazy and collect is d.collect\n"
+        "assert 'lazy' in d.__all__ and 'collect' in d.__all__\n"
+    )
+    p = subprocess.run([sys.executable, "-c", code], capture_output=True)
+    assert p.returncode == 0, p.stderr.decode()
+
+
+def test_predicate_pushdown(df, calls):
+    out = (
+        lazy(df)
+        >> mutate(w=f["x"] + 1)
+        >> arrange(f["y"])
+        >> filter_(f["z"] > 0)
+        >> collect()
+    )
+    assert [call[0] for call in calls] == ["filter", "mutate", "arrange"]
+    assert calls[0] == ("filter", 4)
+    assert list(out["w"]) == [6, 3]
+    assert list(out["y"]) == [1, 2]
+
+
+def test_filter_not_pushed_past_dependency(df):
+    lf = lazy(df) >> mutate(w=f["x"] + 1) >> filter_(f["w"] > 2)
+    steps = _steps(lf)
+    assert steps[0].startswith("mutate")
+    assert steps[1].startswith("filter_")
+
+
+def test_filters_merged(df, calls):
+    out = (
+        lazy(df)
+        >> filter_(f["x"] > 1)
+        >> filter_(f["y"] > 1)
+        >> collect()
+    )
+    assert calls == [("filter", 4)]
+    assert list(out["x"]) == [3, 2]
+
+
+def test_redundant_arrange_removed(df, calls):
+    out = (
+        lazy(df)
+        >> arrange(f["z"])
+        >> filter_(f["x"] > 1)
+        >> arrange(f["z"], f["y"])
+        >> collect()
+    )
+    assert [call[0] for call in calls] == ["filter", "arrange"]
+    assert list(out["y"]) == [4, 1, 2]
+
+
+def test_arrange_kept_with_different_keys(df):
+    lf = lazy(df) >> arrange(f["y"]) >> arrange(f["z"])
+    assert len(_steps(lf)) == 2
+
+
+def test_projection_pruning(df, calls):
+    out = (
+        lazy(df)
+        >> mutate(w=f["x"] + 1, v=f["y"] * 2)
+        >> filter_(f["z"] > 0)
+        >> select("w", "z")
+        >> collect()
+    )
+    assert calls[0] == ("select", ["x", "z"])
+    assert ("mutate", ["x", "z"]) in calls
+    assert list(out) == ["w", "z"]
+    assert list(out["w"]) == [3, 6]
+
+
+def test_mutate_removed_when_unused(df, calls):
+    lazy(df) >> mutate(w=f["x"] + 1) >> select("y") >> collect()
+    assert calls == [("select", ["y"])]
+
+
+def test_unknown_steps_stop_pruning(df):
+    lf = (
+        lazy(df)
+        >> summarise(m=f["x"])
+        >> select("m")
+    )
+    assert _steps(lf)[0].startswith("select")
+    lf = lazy(df) >> group_by(f.x * 2) >> select("x")
+    assert not _steps(lf)[0].startswith("select")
+
+
+def test_select_rename_merged(df, calls):
+    out = (
+        lazy(df)
+        >> select("x", "y", "z")
+        >> select("x", "y")
+        >> rename(a="x")
+        >> rename(b="a", c="y")
+        >> collect()
+    )
+    assert calls == [("select", ["x", "y"]), ("rename", {"b": "x", "c": "y"})]
+    assert list(out) == ["b", "c"]
+
+
+def test_rename_chain_conflict_kept(df):
+    lf = lazy(df) >> rename(a="x") >> rename(x="y")
+    assert len(_steps(lf)) == 2
+
+
+def test_explain(df):
+    lf = lazy(df) >> mutate(w=f["x"] + 1) >> filter_(f["z"] > 0)
+    assert lf.explain().splitlines()[1].lstrip().startswith(">> filter_")
+    assert lf.explain(optimize=False).splitlines()[1].lstrip().startswith(
+        ">> mutate"
+    )
+
+
+def test_execute_plan_hook(df, calls):
+    out = (
+        lazy(NativeFrame(df))
+        >> mutate(w=f["x"] + 1)
+        >> filter_(f["y"] > 1)
+        >> collect()
+    )
+    assert out == ["filter_", "mutate"]
+    assert calls == []
+
+
+def test_execute_plan_other_backend(df):
+    plan = LogicalPlan(NativeFrame(df), [filter_(f["y"] > 1)])
+    assert dispatch_last_avail("execute_plan", plan) == ["filter_"]
+    assert (
+        dispatch_last_avail("execute_plan", plan, __plugin=BACKEND)
+        == ["filter_"]
+    )
+    assert dispatch_last_avail("execute_plan", plan, __plugin="nosuch") is None
@@ -1,3 +1,5 @@
+import copy
+
 import pytest
 
 import numpy as np
@@ -125,6 +127,32 @@ def test_load_dataset(with_test_plugin1, with_test_plugin2):
     assert load_dataset("iris", __backend="testplugin1") == "irisiris"
 
 
+def test_load_dataset_chunks(with_test_plugin1):
+    from datar.data import load_dataset
+
+    # not implemented by the backend, sliced
+    chunks = load_dataset("iris", __backend="testplugin1", chunksize=3)
+    assert list(chunks) == ["iri", "sir", "is"]
+
+    with pytest.raises(ValueError):
+        load_dataset("iris", chunksize=0)
+
+    class TestChunksPlugin:
+        name = "testchunks"
+
+        @plugin.impl
+        def load_dataset_chunks(name, metadata, chunksize):
+            return iter([name[:chunksize]])
+
+    plugin.register(TestChunksPlugin)
+    plugin.get_plugin("testchunks").enable()
+    try:
+        chunks = load_dataset("iris", __backend="testchunks", chunksize=2)
+        assert list(chunks) == ["ir"]
+    finally:
+        plugin.get_plugin("testchunks").disable()
+
+
 def test_operate(with_test_plugin1):
 
     expr = f[0] + f[1]
@@ -158,3 +186,213 @@ def test_c_getitem2(with_test_plugin1, with_test_plugin2):
 
     with pytest.warns(MultipleImplsForSingleResultHookWarning):
         assert c[11] == 44
+
+
+def test_dispatch_cache_invalidated(with_test_plugin1):
+    from datar.core.plugin import dispatch, _DISPATCH_CACHE
+
+    assert dispatch("c_getitem", 11) == 22
+    assert ("c_getitem", None) in _DISPATCH_CACHE
+
+    plugin.get_plugin("testplugin2").enable()
+    assert ("c_getitem", None) not in _DISPATCH_CACHE
+    with pytest.warns(MultipleImplsForSingleResultHookWarning):
+        assert dispatch("c_getitem", 11) == 44
+
+    plugin.get_plugin("testplugin2").disable()
+    assert dispatch("c_getitem", 11) == 22
+
+
+def test_dispatch_no_impl():
+    from simplug import ResultUnavailableError
+    from datar.core.plugin import dispatch
+
+    assert dispatch("load_dataset", "iris", {}) is None
+    with pytest.raises(ResultUnavailableError):
+        dispatch("c_getitem", 11)
+    with pytest.raises(ResultUnavailableError):
+        dispatch("c_getitem", 11, __plugin="testplugin1")
+
+
+def test_operator_table(with_test_plugin1):
+    table = copy.deepcopy(DatarOperator._table)
+    DatarOperator.register("add", int, int, backend="testplugin1")(
+        lambda x, y: x * y
+    )
+    DatarOperator.register("neg", int, backend="testplugin1")(
+        lambda x: x * 10
+    )
+    try:
+        assert (f[0] + f[1])._pipda_eval([3, 2], Context.EVAL) == 6
+        # radd falls back to add with operands swapped
+        assert (1 + f[0])._pipda_eval([3], Context.EVAL) == 3
+        assert (-f[0])._pipda_eval([3], Context.EVAL) == 30
+        # not registered for floats, goes to the operate hook
+        assert (f[0] + f[1])._pipda_eval([3.0, 2], Context.EVAL) == 11.0
+
+        plugin.get_plugin("testplugin1").disable()
+        plugin.get_plugin("testplugin2").enable()
+        assert (f[0] + f[1])._pipda_eval([3, 2], Context.EVAL) == 17
+        plugin.get_plugin("testplugin2").disable()
+        plugin.get_plugin("testplugin1").enable()
+    finally:
+        DatarOperator._table = table
+
+    with pytest.raises(ValueError, match="Unknown operator"):
+        DatarOperator.register("nosuch", int, backend="testplugin1")
+
+
+def test_operator_unregister(with_test_plugin1):
+    DatarOperator.register("add", int, int, backend="testplugin1")(
+        lambda x, y: x * y
+    )
+    assert (f[0] + f[1])._pipda_eval([3, 2], Context.EVAL) == 6
+    DatarOperator.unregister("add", int, int, backend="testplugin1")
+    # back to the operate() hook
+    assert (f[0] + f[1])._pipda_eval([3, 2], Context.EVAL) == 11
+    assert ("add", int, int) not in DatarOperator._table
+    # not registered
+    DatarOperator.unregister("add", int, int, backend="testplugin1")
+
+
+def test_operator_table_plugin_order(with_test_plugin1, with_test_plugin2):
+    table = copy.deepcopy(DatarOperator._table)
+    DatarOperator.register("add", int, int, backend="testplugin1")(
+        lambda x, y: x * y
+    )
+    try:
+        # testplugin2 is enabled later, its operate() hook wins
+        with pytest.warns(MultipleImplsForSingleResultHookWarning):
+            assert (f[0] + f[1])._pipda_eval([3, 2], Context.EVAL) == 17
+
+        DatarOperator.register("add", object, object, backend="testplugin2")(
+            lambda x, y: x - y
+        )
+        # even less specific
+        assert (f[0] + f[1])._pipda_eval([3, 2], Context.EVAL) == 1
+        # but the backend selected wins
+        with DatarOperator.with_backend("testplugin1"):
+            assert (f[0] + f[1])._pipda_eval([3, 2], Context.EVAL) == 6
+    finally:
+        DatarOperator._table = table
+
+    # the registrations are gone with the table restored
+    assert "testplugin1" not in DatarOperator._table.get(
+        ("add", int, int),
+        {},
+    )
+
+
+def test_operator_table_plugin_priority(with_test_plugin1):
+    from datar.core.plugin import _DISPATCH_CACHE
+
+    class TestPluginFirst:
+        # sorted before the other plugins, although registered later
+        priority = -1
+
+        @plugin.impl
+        def c_getitem(item):
+            return item
+
+    table = copy.deepcopy(DatarOperator._table)
+    plugin.register(TestPluginFirst)
+    plugin.get_plugin("testpluginfirst").enable()
+    DatarOperator.register("add", int, int, backend="testpluginfirst")(
+        lambda x, y: x - y
+    )
+    try:
+        plugin.hooks._registry_sorted = False
+        _DISPATCH_CACHE.clear()
+        # testplugin1 comes later after sorting, its operate() hook wins
+        assert (f[0] + f[1])._pipda_eval([3, 2], Context.EVAL) == 11
+    finally:
+        DatarOperator._table = table
+        plugin.get_plugin("testpluginfirst").disable()
+
+
+def test_namespaces_loaded_on_access():
+    import sys
+    import subprocess
+
+    code = (
+        "import sys, datar\n"
+        "assert 'datar.core.load_plugins' not in sys.modules\n"
+        "datar.tibble.tibble\n"
+        "loaded = [mod for mod in sys.modules if mod.startswith('datar.')]\n"
+        "assert 'datar.tibble' in loaded, loaded\n"
+        "assert 'datar.dplyr' not in loaded, loaded\n"
+        "assert 'datar.base' not in loaded, loaded\n"
+    )
+    p = subprocess.run([sys.executable, "-c", code], capture_output=True)
+    assert p.returncode == 0, p.stderr.decode()
+
+
+def test_with_backend_thread_local(with_test_plugin1, with_test_plugin2):
+    import threading
+    from datar.base import c
+
+    barrier = threading.Barrier(2, timeout=5)
+    results = {}
+
+    def worker(backend):
+        with c.with_backend(backend), DatarOperator.with_backend(backend):
+            # both threads have entered their contexts
+            barrier.wait()
+            expr = f[0] + f[1]
+            results[backend] = (c[11], expr._pipda_eval([3, 2], Context.EVAL))
+            barrier.wait()
+
+    threads = [
+        threading.Thread(target=worker, args=(backend,))
+        for backend in ("testplugin1", "testplugin2")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {"testplugin1": (22, 11), "testplugin2": (44, 17)}
+
+
+def test_use_backend(with_test_plugin1, with_test_plugin2):
+    from datar.base import c
+    from datar.core.backends import current_backend, use_backend
+
+    with use_backend("testplugin1"):
+        assert c[11] == 22
+        assert (f[0] + f[1])._pipda_eval([3, 2], Context.EVAL) == 11
+        with c.with_backend("testplugin2"):
+            assert c[11] == 44
+            assert current_backend("operator") == "testplugin1"
+        assert current_backend("array_ufunc") == "testplugin1"
+
+    assert current_backend("c", "default") == "default"
+    with pytest.raises(ValueError):
+        with use_backend("testplugin1", "nosuch"):
+            pass
+
+
+def test_unregister_backend():
+    from pipda import register_func, register_verb
+    from datar.core.backends import unregister_backend
+
+    @register_verb(context=Context.EVAL)
+    def verb(_data):
+        ...
+
+    @register_func(dispatchable="args")
+    def func(x):
+        ...
+
+    verb.register(list, backend="testunreg", context=Context.SELECT)(len)
+    func.register(int, backend="testunreg", favored=True)(str)
+    assert verb([1, 2], __ast_fallback="normal") == 2
+    assert func(1) == "1"
+
+    unregister_backend(verb, "testunreg")
+    unregister_backend(func, "testunreg")
+    # not registered
+    unregister_backend(verb, "testunreg")
+    assert list(verb.registry) == list(func.registry) == ["_default"]
+    assert "testunreg" not in func.favorables
+    assert verb.get_context(len) == (Context.EVAL, None)
@@ -0,0 +1,137 @@
+import pytest
+from pipda import register_verb
+
+from datar.apis.dplyr import collect, lazy
+from datar.core.options import options_context
+from datar.core.plugin import plugin
+from datar.core.routing import route, route_backend
+
+
+@register_verb(object)
+def which_backend(_data):
+    return None
+
+
+@which_backend.register(list, backend="testsmall")
+def _which_backend_small(_data):
+    return "testsmall"
+
+
+@which_backend.register(list, backend="testbig")
+def _which_backend_big(_data):
+    return "testbig"
+
+
+class TestSmallPlugin:
+
+    name = "testsmall"
+
+    @plugin.impl
+    def verb_cost(verb, data):
+        return len(data) * 10
+
+
+class TestBigPlugin:
+
+    name = "testbig"
+
+    @plugin.impl
+    def verb_cost(verb, data):
+        return 100 + len(data)
+
+
+class ConvFrame(tuple):
+    pass
+
+
+@which_backend.register(ConvFrame, backend="testconv")
+def _which_backend_conv(_data):
+    return "testconv"
+
+
+class TestConvPlugin:
+
+    name = "testconv"
+
+    @plugin.impl
+    def verb_cost(verb, data):
+        return 1
+
+    @plugin.impl
+    def convert_cost(data):
+        return None if isinstance(data, tuple) else len(data) * 2
+
+    @plugin.impl
+    def convert_data(data):
+        return ConvFrame(data)
+
+
+class TestNoCostPlugin:
+
+    name = "testnocost"
+
+    @plugin.impl
+    def verb_cost(verb, data):
+        return None
+
+
+@pytest.fixture(autouse=True)
+def with_cost_plugins():
+    for plg in (TestSmallPlugin, TestBigPlugin, TestNoCostPlugin):
+        plugin.register(plg)
+        plugin.get_plugin(plg.name).enable()
+    yield
+    for plg in (TestSmallPlugin, TestBigPlugin, TestNoCostPlugin):
+        plugin.get_plugin(plg.name).disable()
+
+
+def test_route_backend():
+    assert route_backend(which_backend, [1] * 5) == "testsmall"
+    assert route_backend(which_backend, [1] * 100) == "testbig"
+
+
+def test_route_backend_not_implemented_for_type():
+    # only the default backend implements it for tuple
+    assert route_backend(which_backend, (1,) * 5) is None
+
+
+def test_route_backend_disabled():
+    with options_context(lazy_routing=False):
+        assert route_backend(which_backend, [1] * 5) is None
+
+
+def test_route_backend_single_candidate():
+    plugin.get_plugin("testbig").disable()
+    assert route_backend(which_backend, [1] * 100) is None
+
+
+def test_routing_in_lazy_pipeline():
+    assert lazy([1] * 5) >> which_backend() >> collect() == "testsmall"
+    assert lazy([1] * 100) >> which_backend() >> collect() == "testbig"
+    out = (
+        lazy([1] * 5)
+        >> which_backend(__backend="testbig")
+        >> collect()
+    )
+    assert out == "testbig"
+
+
+def test_route_with_conversion():
+    plugin.register(TestConvPlugin)
+    plugin.get_plugin("testconv").enable()
+    try:
+        # 1 + 5 * 2 < 5 * 10
+        backend, data = route(which_backend, [1] * 5)
+        assert backend == "testconv"
+        assert isinstance(data, ConvFrame)
+        assert route_backend(which_backend, [1] * 5) == "testconv"
+        # the conversion doesn't pay off: 1 + 100 * 2 > 100 + 100
+        backend, data = route(which_backend, [1] * 100)
+        assert backend == "testbig"
+        assert type(data) is list
+        # can't convert
+        assert route(which_backend, (1, ) * 5) == (None, (1, ) * 5)
+
+        assert lazy([1] * 5) >> which_backend() >> collect() == "testconv"
+    finally:
+        plugin.get_plugin("testconv").disable()
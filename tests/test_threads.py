@@ -0,0 +1,125 @@
+"""Stress tests of the shared registries and caches under threads"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pipda import Context
+
+from datar import f
+from datar.core import compiled
+from datar.core.compiled import compile_expr, evaluate_compiled
+from datar.core.options import add_option, get_option, options_context
+from datar.core.plugin import (
+    _resolve,
+    dispatch,
+    plugin,
+    resolve_cached,
+)
+from datar.data.store import DatasetStore
+
+NTHREADS = 8
+
+
+def _run(func, n=NTHREADS):
+    """Run func(i) in n threads at the same time, and get the results"""
+    barrier = threading.Barrier(n, timeout=10)
+
+    def worker(i):
+        barrier.wait()
+        return func(i)
+
+    with ThreadPoolExecutor(n) as executor:
+        return list(executor.map(worker, range(n)))
+
+
+class ThreadsAPlugin:
+    name = "threadsa"
+
+    @plugin.impl
+    def c_getitem(item):
+        return "a"
+
+
+class ThreadsBPlugin:
+    name = "threadsb"
+
+    @plugin.impl
+    def c_getitem(item):
+        return "b"
+
+
+@pytest.fixture(scope="module")
+def threads_plugins():
+    plugin.register(ThreadsAPlugin, ThreadsBPlugin)
+    yield
+    plugin.get_plugin("threadsa").disable()
+    plugin.get_plugin("threadsb").disable()
+
+
+def test_dispatch_while_toggling_plugins(threads_plugins):
+    plugin.get_plugin("threadsa").enable()
+
+    def work(i):
+        if i == 0:
+            for _ in range(300):
+                plugin.get_plugin("threadsb").enable()
+                plugin.get_plugin("threadsb").disable()
+            return None
+        return {
+            dispatch("c_getitem", 0, __plugin="threadsa") for _ in range(300)
+        }
+
+    results = _run(work)
+    assert all(result == {"a"} for result in results[1:])
+    # no resolution made with threadsb enabled is left in the cache
+    assert resolve_cached(
+        ("c_getitem", "threadsb"),
+        _resolve,
+        "c_getitem",
+        "threadsb",
+    ) is None
+    plugin.get_plugin("threadsa").disable()
+
+
+def test_compiled_cache(monkeypatch):
+    monkeypatch.setattr(compiled, "COMPILED_CACHE_SIZE", 16)
+
+    data = {f"x{j}": j for j in range(50)}
+
+    def work(i):
+        return [
+            evaluate_compiled((f[f"x{j}"], i), data, Context.EVAL)
+            for j in range(50)
+        ]
+
+    results = _run(work)
+    assert results == [[(j, i) for j in range(50)] for i in range(NTHREADS)]
+    assert len(compiled._COMPILED_CACHE) <= 16
+    assert compile_expr(f["x"]) is compile_expr(f["x"])
+
+
+def test_options_context():
+    add_option("threads_test", -1)
+
+    def work(i):
+        seen = set()
+        for _ in range(200):
+            with options_context(threads_test=i):
+                seen.add(get_option("threads_test"))
+        return seen
+
+    assert _run(work) == [{i} for i in range(NTHREADS)]
+    assert get_option("threads_test") == -1
+
+
+def test_dataset_store_loads_once():
+    store = DatasetStore(1 << 20)
+    loaded = []
+
+    def loader():
+        loaded.append(1)
+        return [1, 2, 3]
+
+    results = _run(lambda i: store.get("a", loader))
+    assert results == [[1, 2, 3]] * NTHREADS
+    assert len(loaded) == 1
@@ -0,0 +1,125 @@
+import pytest
+
+from datar.core import tidyselect
+from datar.core.tidyselect import ColumnIndex, column_index, compile_regex
+
+COLUMNS = ["Sepal_Length", "Sepal_Width", "Petal_Length", "petal_width", "x"]
+
+
+def _naive(columns, match, ignore_case, func):
+    if isinstance(match, str):
+        match = [match]
+    out = []
+    for mat in match:
+        for col in columns:
+            if col in out:
+                continue
+            if func(
+                mat.lower() if ignore_case else mat,
+                col.lower() if ignore_case else col,
+            ):
+                out.append(col)
+    return out
+
+
+@pytest.mark.parametrize(
+    "method,func",
+    [
+        ("starts_with", lambda mat, col: col.startswith(mat)),
+        ("ends_with", lambda mat, col: col.endswith(mat)),
+        ("contains", lambda mat, col: mat in col),
+    ],
+)
+@pytest.mark.parametrize(
+    "match",
+    ["sepal", "Petal", "_width", "th", ["width", "Sepal"], "", "nosuch"],
+)
+@pytest.mark.parametrize("ignore_case", [True, False])
+def test_same_as_scanning(method, func, match, ignore_case):
+    index = ColumnIndex(COLUMNS)
+    expected = _naive(COLUMNS, match, ignore_case, func)
+    assert getattr(index, method)(match, ignore_case) == expected
+    # cached
+    assert getattr(index, method)(match, ignore_case) == expected
+
+
+def test_matches():
+    index = ColumnIndex(COLUMNS)
+    assert index.matches(r"^s.+h$") == ["Sepal_Length", "Sepal_Width"]
+    assert index.matches(r"^s.+h$", ignore_case=False) == []
+    assert index.matches([r"^x$", r"length"]) == [
+        "x",
+        "Sepal_Length",
+        "Petal_Length",
+    ]
+    assert compile_regex("a", True) is compile_regex("a", True)
+
+
+def test_select():
+    index = ColumnIndex(COLUMNS + ["x"])
+    assert index.select(["x", "Sepal_Width"]) == ["x", "Sepal_Width"]
+    assert index.select("x") == ["x"]
+    assert index.locate(["x", "y"]) == [4, -1]
+    with pytest.raises(KeyError):
+        index.select(["x", "y"])
+    assert index.select(["x", "y"], strict=False) == ["x"]
+
+
+def test_results_not_shared():
+    index = ColumnIndex(COLUMNS)
+    out = index.starts_with("sepal")
+    out.append("x")
+    assert index.starts_with("sepal") == ["Sepal_Length", "Sepal_Width"]
+
+
+def test_selector_cache_bounded(monkeypatch):
+    monkeypatch.setattr(tidyselect, "SELECTOR_CACHE_SIZE", 2)
+    index = ColumnIndex(COLUMNS)
+    for mat in ("a", "b", "c"):
+        index.contains(mat)
+    assert len(index._results) == 2
+
+
+def test_column_index_cached(monkeypatch):
+    monkeypatch.setattr(tidyselect, "COLUMN_INDEX_CACHE_SIZE", 2)
+    columns = tuple(COLUMNS)
+    index = column_index(columns)
+    assert column_index(columns) is index
+    # equal but not the same object
+    assert column_index(tuple(list(columns))) is not index
+
+    assert column_index(COLUMNS) is column_index(list(COLUMNS))
+    assert len(tidyselect._INDEXES) == 2
+
+
+def test_column_index_mutable_containers():
+    import numpy as np
+
+    columns = np.array(["a", "b"], dtype=object)
+    assert column_index(columns).starts_with("a") == ["a"]
+    columns[0] = "x"
+    assert column_index(columns).starts_with("a") == []
+    assert column_index(columns).starts_with("x") == ["x"]
+
+
+def test_num_range():
+    index = ColumnIndex(["x01", "x02", "x3", "y"])
+    assert index.num_range("x", range(1, 4), width=2) == ["x01", "x02"]
+    assert index.num_range("x", [3, 1]) == ["x3"]
+
+
+def test_non_str_names():
+    index = ColumnIndex([1, "a1", 10, "B"])
+    assert index.starts_with("1") == [1, 10]
+    assert index.ends_with("1", ignore_case=False) == [1, "a1"]
+    assert index.contains("b") == ["B"]
+    assert index.matches(r"^\d+$") == [1, 10]
+    assert index.select([10, "B"]) == [10, "B"]
+
+
+def test_wide_frame():
+    columns = tuple(f"x{i}" for i in range(50_000)) + ("y1", "y2")
+    index = column_index(columns)
+    assert index.starts_with("y") == ["y1", "y2"]
+    assert index.ends_with("49999") == ["x49999"]
+    assert len(index.starts_with("x1")) == 11_111